@@ -0,0 +1,179 @@
+"""Running-sum aggregates of every dataset per province, kept up to date by ``ingest``.
+
+For every province the store keeps, per tahun, the sum and count of each
+measure and, per kabupaten/kota (``daerah`` for ``persentase_daerah``),
+the least-squares sums ``n, Σx, Σy, Σx², Σxy, Σy²`` (x = tahun - X_REF).
+Yearly totals and means, region rankings and linear trend coefficients
+are all derived from these sums (``yearly``, ``ranking``,
+``region_sums``), so adding a year of data only touches the new rows:
+``append_rows`` adds them to the sums of the provinces they belong to.
+
+The store is persisted to ``.snapshots/aggregates.json`` and rebuilt
+from the full dataset only when a source CSV changes outside ``ingest``.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASETS, GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH, load_dataset
+from provinces import PROVINCE, REGION, province_of_rows
+from snapshot import SNAPSHOT_DIR, compact, source_signature
+
+STORE_PATH = os.path.join(SNAPSHOT_DIR, 'aggregates.json')
+# Bumped whenever the stored layout changes so older files are rebuilt
+STORE_FORMAT = 2
+
+# Fixed origin for x so running sums can be extended without re-centring
+X_REF = 2000
+
+# dataset -> (region column, measures)
+SPECS = {
+    PENDUDUK: (REGION, ['bps_jumlah_penduduk', 'persentase_jumlah_penduduk_miskin']),
+    PERSENTASE_DAERAH: ('daerah', ['persentase_penduduk_miskin']),
+    INDEKS: (REGION, ['indeks_kedalaman', 'indeks_keparahan_kemiskinan']),
+    GARIS_KEMISKINAN: (REGION, ['garis_kemiskinan']),
+}
+
+# dataset -> {'version': source signature, 'provinces': {provinsi: {'years': ..., 'regions': ...}}}
+_states = None
+_lock = threading.Lock()
+
+
+def accumulate(state, name, df, provinces):
+    """Add the rows of ``df`` (of the given ``provinces``) to ``state`` in place; cost is O(len(df))."""
+    region_col, measures = SPECS[name]
+    x = df['tahun'].to_numpy(dtype=float) - X_REF
+    for measure in measures:
+        rows = pd.DataFrame({
+            'provinsi': provinces.to_numpy(),
+            'tahun': df['tahun'].to_numpy(),
+            'region': df[region_col].astype(str).to_numpy(),
+            'x': x,
+            'y': df[measure].to_numpy(dtype=float),
+        }).dropna(subset=['provinsi', 'y'])
+        rows['xx'] = rows['x'] * rows['x']
+        rows['xy'] = rows['x'] * rows['y']
+        rows['yy'] = rows['y'] * rows['y']
+
+        by_year = rows.groupby(['provinsi', 'tahun'])['y'].agg(['sum', 'count'])
+        for (provinsi, tahun), total, count in by_year.itertuples():
+            years = state['provinces'].setdefault(provinsi, {'years': {}, 'regions': {}})['years']
+            entry = years.setdefault(str(tahun), {}).setdefault(measure, [0.0, 0])
+            entry[0] += float(total)
+            entry[1] += int(count)
+
+        by_region = rows.groupby(['provinsi', 'region']).agg(
+            n=('y', 'size'), sx=('x', 'sum'), sy=('y', 'sum'), sxx=('xx', 'sum'), sxy=('xy', 'sum'),
+            syy=('yy', 'sum'))
+        for (provinsi, region), *sums in by_region.itertuples():
+            regions = state['provinces'][provinsi]['regions']
+            entry = regions.setdefault(region, {}).setdefault(measure, [0, 0.0, 0.0, 0.0, 0.0, 0.0])
+            for i, value in enumerate(sums):
+                entry[i] += value.item() if hasattr(value, 'item') else value
+    return state
+
+
+def _build_state(name):
+    region_col, measures = SPECS[name]
+    columns = ['tahun', region_col, *measures] + ([PROVINCE] if PROVINCE in DATASETS[name]['dtype'] else [])
+    df = load_dataset(name, columns=columns)
+    state = {'version': source_signature(name), 'provinces': {}}
+    return accumulate(state, name, df, province_of_rows(name, df))
+
+
+def _read_store():
+    try:
+        with open(STORE_PATH, encoding='utf-8') as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if store.get('format') != STORE_FORMAT:
+        return {}
+    return store.get('datasets', {})
+
+
+def _save():
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp_path = f'{STORE_PATH}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'format': STORE_FORMAT, 'datasets': _states}))
+        os.replace(tmp_path, STORE_PATH)
+    except OSError:
+        # Read-only deployment: keep the in-memory copy only
+        pass
+
+
+def _state(name, version):
+    """State of ``name`` at ``version``, from memory or the store file (None if neither has it). Callers hold ``_lock``."""
+    global _states
+    if _states is None:
+        _states = _read_store()
+    state = _states.get(name)
+    if state is None or state['version'] != version:
+        # Another process may have updated the store
+        state = _read_store().get(name)
+        if state is None or state['version'] != version:
+            return None
+        _states[name] = state
+    return state
+
+
+def get_state(name):
+    """Aggregate state of dataset ``name``, rebuilt in full only if its CSV changed outside ``ingest``."""
+    version = source_signature(name)
+    with _lock:
+        state = _state(name, version)
+        if state is None:
+            state = _build_state(name)
+            _states[name] = state
+            _save()
+        return state
+
+
+def append_rows(name, rows, previous):
+    """Add clean ``rows``, just appended to the CSV of ``name``, to the sums of their provinces.
+
+    ``previous`` is the CSV's signature before the append; a state not
+    kept at that version is rebuilt in full instead.
+    """
+    # Sum the values as the snapshots store them, as a rebuild would
+    rows = compact(rows, {})[0]
+    with _lock:
+        state = _state(name, previous)
+        if state is not None:
+            accumulate(state, name, rows, province_of_rows(name, rows))
+            state['version'] = source_signature(name)
+            _save()
+    return get_state(name)
+
+
+def province(name, provinsi):
+    """``{'years': {tahun: {measure: [sum, count]}}, 'regions': {region: {measure: sums}}}`` of one province."""
+    return get_state(name)['provinces'].get(provinsi, {'years': {}, 'regions': {}})
+
+
+def yearly(name, provinsi, measure, how):
+    """``measure`` per tahun of one province as a Series: the total (``how='sum'``) or the mean."""
+    years = province(name, provinsi)['years']
+    values = {int(tahun): total if how == 'sum' else total / count
+              for tahun, sums in years.items() if measure in sums for total, count in [sums[measure]] if count}
+    return pd.Series(values, dtype=float).sort_index()
+
+
+def region_sums(name, provinsi, measure):
+    """``(regions, [n, Σx, Σy, Σx², Σxy, Σy²])`` of one province, regions sorted, each sum an array."""
+    regions = province(name, provinsi)['regions']
+    names = sorted(region for region, sums in regions.items() if measure in sums)
+    sums = np.array([regions[region][measure] for region in names], dtype=float).reshape(len(names), 6)
+    return names, list(sums.T)
+
+
+def ranking(name, provinsi, measure, how):
+    """Regions of one province by their total (``how='sum'``) or mean ``measure``, highest first."""
+    names, (n, _, sy, _, _, _) = region_sums(name, provinsi, measure)
+    values = sy if how == 'sum' else sy / n
+    return pd.Series(values, index=names).sort_values(ascending=False, kind='stable')
@@ -0,0 +1,195 @@
+"""Read-only JSON API over the materialized views, for bulk consumers.
+
+Usage::
+
+    python api.py --host 127.0.0.1 --port 8600
+
+Runs beside Streamlit on plain asyncio (no extra dependencies):
+
+    GET /                              data version, provinces and views
+    GET /views/<name>?provinsi=<nama>  rows of one view as a JSON array of records
+                                       (provinsi defaults to DEFAULT_PROVINCE)
+    GET /panel?provinsi=<nama>         region x year x indicator cube (``panel.py``),
+                                       null where a dataset has no row
+    GET /panel/korelasi?provinsi=<nama>  correlation between the panel's indicators
+
+Every response body is serialized once per province and data version (also gzipped)
+and carries an ETag; a request whose ``If-None-Match`` matches gets a 304
+without a body. Load-test it with ``benchmarks/api_load.py``.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import materialize
+import panel
+from provinces import DEFAULT_PROVINCE, list_provinces
+from snapshot import data_version
+
+MAX_HEADER_BYTES = 16 * 1024
+
+# provinsi -> (data version, {path: response entry})
+_responses = {}
+_provinces = None
+_build_lock = asyncio.Lock()
+
+
+def _entry(body):
+    # Weak: the identity and gzip bodies share one tag
+    etag = 'W/"%s"' % hashlib.sha1(body).hexdigest()[:20]
+    return {'body': body, 'gzip': gzip.compress(body, 6), 'etag': etag}
+
+
+def _shortest(values):
+    # float32 as its shortest decimal (18.62, not 18.6200008392)
+    return values.astype(str).astype(np.float64) if values.dtype == np.float32 else values
+
+
+def _records(frame):
+    narrow = [column for column in frame.columns if frame[column].dtype == np.float32]
+    if narrow:
+        frame = frame.assign(**{column: _shortest(frame[column]) for column in narrow})
+    return frame.to_json(orient='records', force_ascii=False).encode()
+
+
+def build_responses(provinsi):
+    """Serialized body, gzipped body and ETag for every path of one province."""
+    views = materialize.get_views(provinsi)
+    responses = {
+        f'/views/{name}': _entry(_records(frame))
+        for name, frame in views.items()
+    }
+    cube = panel.get_panel(provinsi)
+    responses['/panel'] = _entry(json.dumps({
+        'wilayah': cube.regions, 'tahun': cube.years.tolist(), 'indikator': cube.indicators,
+        'nilai': np.where(cube.mask, _shortest(cube.values), None).tolist(),
+    }, ensure_ascii=False).encode())
+    korelasi = cube.correlation()
+    responses['/panel/korelasi'] = _entry(korelasi.astype(object).where(korelasi.notna(), None)
+                                          .to_json(orient='index').encode())
+    index = {'version': data_version(), 'provinsi': list_provinces(), 'views': sorted(views)}
+    responses['/'] = _entry(json.dumps(index).encode())
+    return responses
+
+
+async def _data_version():
+    # Even the version check stats files: it runs in the executor
+    return await asyncio.get_running_loop().run_in_executor(None, data_version)
+
+
+async def get_responses(provinsi=DEFAULT_PROVINCE, version=None):
+    """Responses of one province for the data ``version`` (the current one when None).
+
+    Rebuilt off the event loop when the version changed.
+    """
+    loop = asyncio.get_running_loop()
+    if version is None:
+        version = await _data_version()
+    cached = _responses.get(provinsi)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    async with _build_lock:
+        cached = _responses.get(provinsi)
+        if cached is None or cached[0] != version:
+            responses = await loop.run_in_executor(None, build_responses, provinsi)
+            cached = (version, responses)
+            _responses[provinsi] = cached
+        return cached[1]
+
+
+async def _known_provinces(version):
+    global _provinces
+    if _provinces is None or _provinces[0] != version:
+        # list_provinces may rebuild the partitions
+        _provinces = (version, set(await asyncio.get_running_loop().run_in_executor(None, list_provinces)))
+    return _provinces[1]
+
+
+def _response(status, reason, headers, body=b'', send_body=True):
+    head = [f'HTTP/1.1 {status} {reason}']
+    head += [f'{name}: {value}' for name, value in headers.items()]
+    head.append(f'Content-Length: {len(body)}')
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (body if send_body else b'')
+
+
+async def _handle_request(method, path, headers):
+    if method not in ('GET', 'HEAD'):
+        return _response(405, 'Method Not Allowed', {'Allow': 'GET, HEAD'})
+    url = urlsplit(path)
+    provinsi = parse_qs(url.query).get('provinsi', [DEFAULT_PROVINCE])[0]
+    # One version per request, for the province check and the body alike
+    version = await _data_version()
+    if provinsi not in await _known_provinces(version):
+        return _response(404, 'Not Found', {'Content-Type': 'application/json'}, b'{"error": "unknown provinsi"}')
+    entry = (await get_responses(provinsi, version)).get(url.path.rstrip('/') or '/')
+    if entry is None:
+        return _response(404, 'Not Found', {'Content-Type': 'application/json'}, b'{"error": "not found"}')
+
+    common = {'ETag': entry['etag'], 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    if entry['etag'] in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+        return _response(304, 'Not Modified', common)
+
+    body = entry['body']
+    common['Content-Type'] = 'application/json; charset=utf-8'
+    if 'gzip' in headers.get('accept-encoding', ''):
+        body = entry['gzip']
+        common['Content-Encoding'] = 'gzip'
+    # HEAD gets the same headers as GET, without the body
+    return _response(200, 'OK', common, body, send_body=method == 'GET')
+
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, path, version = lines[0].split(' ', 2)
+            except ValueError:
+                writer.write(_response(400, 'Bad Request', {'Connection': 'close'}))
+                break
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            writer.write(await _handle_request(method, path, headers))
+            await writer.drain()
+            keep_alive = (headers.get('connection', '').lower() != 'close'
+                          and version == 'HTTP/1.1')
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(host, port):
+    await get_responses()
+    server = await asyncio.start_server(handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    print(f'Serving on http://{host}:{port}/')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard aggregates and forecasts as JSON.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Local load generator for api.py.
+
+Usage::
+
+    python api.py &
+    python benchmarks/api_load.py --connections 32 --requests 200
+
+Each connection keeps one HTTP/1.1 connection open and requests the
+paths in turn. With ``--conditional`` it sends the ETag of the previous
+response back in ``If-None-Match``, as a polling consumer would. Prints
+throughput, latency percentiles and the status counts.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+DEFAULT_PATHS = [
+    '/views/penduduk_tahunan',
+    '/views/persentase_daerah_rata2',
+    '/views/indeks_per_wilayah',
+    '/views/garis_prediksi',
+]
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers
+
+
+async def _client(host, port, paths, n_requests, conditional, gzip, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        for i in range(n_requests):
+            path = paths[i % len(paths)]
+            request = [f'GET {path} HTTP/1.1', f'Host: {host}']
+            if gzip:
+                request.append('Accept-Encoding: gzip')
+            if conditional and path in etags:
+                request.append(f'If-None-Match: {etags[path]}')
+            start = time.perf_counter()
+            writer.write(('\r\n'.join(request) + '\r\n\r\n').encode('latin-1'))
+            status, headers = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if 'etag' in headers:
+                etags[path] = headers['etag']
+    finally:
+        writer.close()
+
+
+async def run(host, port, connections, n_requests, paths, conditional, gzip):
+    latencies = []
+    statuses = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, paths, n_requests, conditional, gzip, latencies, statuses)
+        for _ in range(connections)
+    ))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help='requests per connection')
+    parser.add_argument('--path', action='append', dest='paths', help='path to request (repeatable)')
+    parser.add_argument('--conditional', action='store_true', help='send If-None-Match with the last ETag')
+    parser.add_argument('--gzip', action='store_true', help='send Accept-Encoding: gzip')
+    args = parser.parse_args()
+
+    elapsed, latencies, statuses = asyncio.run(run(
+        args.host, args.port, args.connections, args.requests,
+        args.paths or DEFAULT_PATHS, args.conditional, args.gzip))
+
+    latencies.sort()
+    total = len(latencies)
+    print(f'{total} requests in {elapsed:.2f}s: {total / elapsed:.0f} req/s')
+    for label, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+        print(f'{label}: {latencies[min(total - 1, int(q * total))] * 1000:.2f} ms')
+    print('status:', dict(sorted(statuses.items())))
+
+
+if __name__ == '__main__':
+    main()
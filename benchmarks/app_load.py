@@ -0,0 +1,158 @@
+"""Local load test of the multi-worker deployment (``deploy.py``).
+
+Usage::
+
+    python benchmarks/app_load.py --workers 1,2,4 --connections 16 --duration 20
+
+For each worker count a deployment is started on ``--port``, and
+``--connections`` clients connect through its balancer as browser tabs
+would: each opens the Streamlit websocket (one session) and reruns the
+app script back to back, switching to the next page on every run, until
+``--duration`` seconds have passed. A run counts when its
+``script_finished`` message arrives. Prints reruns/s, latency
+percentiles and the speedup over the first worker count; throughput
+grows with workers until they outnumber the cores. ``--url`` measures a
+deployment that is already running instead.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from tornado.websocket import websocket_connect  # noqa: E402
+
+from deploy import prepare, wait_healthy  # noqa: E402
+from views import PAGES  # noqa: E402
+
+
+def _rerun_message(page_widget=None, page=0):
+    msg = BackMsg()
+    msg.rerun_script.widget_states.SetInParent()
+    if page_widget is not None:
+        widget = msg.rerun_script.widget_states.widgets.add()
+        widget.id = page_widget
+        widget.int_value = page
+    return msg.SerializeToString()
+
+
+async def _run_script(ws, message):
+    """Send one rerun and wait for it to finish; returns the page selectbox id if seen."""
+    await ws.write_message(message, binary=True)
+    page_widget = None
+    while True:
+        raw = await ws.read_message()
+        if raw is None:
+            raise ConnectionError('websocket closed')
+        msg = ForwardMsg()
+        msg.ParseFromString(raw)
+        kind = msg.WhichOneof('type')
+        if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            element = msg.delta.new_element
+            if element.WhichOneof('type') == 'selectbox' and list(element.selectbox.options) == list(PAGES):
+                page_widget = element.selectbox.id
+        elif kind == 'script_finished':
+            return page_widget
+
+
+async def _client(url, deadline, latencies, errors):
+    try:
+        ws = await websocket_connect(url, subprotocols=['streamlit'])
+    except OSError:
+        errors.append('connect')
+        return
+    try:
+        # The first run creates the session and is not counted
+        page_widget = await _run_script(ws, _rerun_message())
+        page = 0
+        while time.perf_counter() < deadline:
+            page = (page + 1) % len(PAGES)
+            start = time.perf_counter()
+            await _run_script(ws, _rerun_message(page_widget, page))
+            latencies.append(time.perf_counter() - start)
+    except ConnectionError as exc:
+        errors.append(str(exc))
+    finally:
+        ws.close()
+
+
+async def measure(host, port, connections, duration):
+    url = f'ws://{host}:{port}/_stcore/stream'
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(url, start + duration, latencies, errors) for _ in range(connections)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def _report(label, elapsed, latencies, errors, baseline=None):
+    total = len(latencies)
+    rate = total / elapsed if elapsed else 0.0
+    line = f'{label:>10}  {total:6d} runs  {rate:7.1f} runs/s'
+    if total:
+        line += ''.join(f'  {name} {latencies[min(total - 1, int(q * total))] * 1000:6.0f} ms'
+                        for name, q in (('p50', 0.50), ('p95', 0.95)))
+    if baseline:
+        line += f'  x{rate / baseline:.2f}'
+    if errors:
+        line += f'  errors {len(errors)}'
+    print(line, flush=True)
+    return rate
+
+
+def _start(workers, port):
+    process = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, 'deploy.py'), '--workers', str(workers),
+                                '--port', str(port), '--no-prepare'], cwd=BASE_DIR, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_healthy([port]))
+    except RuntimeError:
+        process.terminate()
+        raise
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the multi-worker deployment.')
+    parser.add_argument('--workers', default=None,
+                        help='comma-separated worker counts (default: 1, 2, 4, ... up to the cores)')
+    parser.add_argument('--connections', type=int, default=16, help='concurrent sessions')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per worker count')
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--url', help='measure a running deployment, e.g. http://127.0.0.1:8501')
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} cores, {args.connections} sessions, {args.duration:.0f}s per run', flush=True)
+    if args.url:
+        target = urlsplit(args.url)
+        _report('running', *asyncio.run(measure(target.hostname, target.port, args.connections, args.duration)))
+        return
+
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(',')]
+    else:
+        counts = [1]
+        while counts[-1] * 2 <= (os.cpu_count() or 1):
+            counts.append(counts[-1] * 2)
+    # Stores are built once here, as deploy.py would, so every run only attaches to them
+    prepare()
+
+    baseline = None
+    for workers in counts:
+        process = _start(workers, args.port)
+        try:
+            rate = _report(f'{workers} worker', *asyncio.run(
+                measure('127.0.0.1', args.port, args.connections, args.duration)), baseline=baseline)
+            baseline = baseline or rate
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
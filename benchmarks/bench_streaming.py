@@ -0,0 +1,153 @@
+"""Throughput and peak memory of the chunked loaders on every CSV layout.
+
+Usage::
+
+    python benchmarks/bench_streaming.py --rows 1000000
+
+For each dataset (comma- or semicolon-delimited, with or without a BOM)
+a synthetic export of about ``--rows`` rows is written to a temporary
+directory by repeating the bundled file, each repetition with one key
+column (``SHIFT``) moved by a multiple of its range so keys stay unique,
+as in a real national export. Each mode then runs in a fresh process:
+
+* ``stream``   ``streaming.stream_state``: running sums, chunk by chunk
+* ``full``     ``read_csv`` of the whole file, then the same sums
+* ``chunked``  ``snapshot.stream_snapshot``: validated and written to an
+               Arrow snapshot chunk by chunk (files over ``STREAM_BYTES``)
+* ``memory``   ``validation.validate`` of the whole file, then the snapshot
+
+Each run reports rows/s and the process's peak RSS; ``base`` is the RSS
+right after the imports, where the peak count is restarted on Linux.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from data_loader import DATASETS, GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH, dataset_path  # noqa: E402
+
+# Key column moved per repetition of the bundled rows
+SHIFT = {
+    PENDUDUK: 'bps_kode_kabupaten_kota',
+    PERSENTASE_DAERAH: 'bps_kode_provinsi',
+    INDEKS: 'tahun',
+    GARIS_KEMISKINAN: 'tahun',
+}
+MODES = ['stream', 'full', 'chunked', 'memory']
+
+
+def write_synthetic(name, rows, directory):
+    """Dataset ``name`` repeated to about ``rows`` rows, in its own delimiter and encoding."""
+    spec = DATASETS[name]
+    base = pd.read_csv(dataset_path(name), sep=spec['sep'], encoding=spec['encoding'], dtype=str,
+                       keep_default_na=False)
+    column = SHIFT[name]
+    values = base[column].astype(int)
+    stride = values.max() - values.min() + 1
+    repeat = max(1, rows // len(base))
+    path = os.path.join(directory, f'{name}.csv')
+    # Centred on the bundled values so int16 years stay in range
+    shifts = (pd.RangeIndex(repeat) - repeat // 2) * stride
+    for start in range(0, repeat, 500):
+        block = pd.concat([base.assign(**{column: (values + shift).astype(str)}) for shift in shifts[start:start + 500]])
+        block.to_csv(path, sep=spec['sep'], index=False, header=start == 0, mode='w' if start == 0 else 'a',
+                     encoding=spec['encoding'] if start == 0 else 'utf-8')
+    return path, repeat * len(base)
+
+
+def _reset_peak():
+    """Restart the peak-RSS count at the current RSS (Linux); returns False where unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and never goes down after the imports
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(name, path, mode, chunksize):
+    import aggregates
+    import snapshot
+    import streaming
+    import validation
+    from data_loader import read_csv
+    from provinces import PROVINCE, province_of_rows
+
+    _reset_peak()
+    base = _peak_rss_mb()
+    target = os.path.join(os.path.dirname(path), f'{name}.arrow')
+    start = time.perf_counter()
+    if mode == 'stream':
+        _, rows = streaming.stream_state(name, path, chunksize=chunksize)
+    elif mode == 'full':
+        region_col, measures = aggregates.SPECS[name]
+        columns = ['tahun', region_col, *measures] + ([PROVINCE] if PROVINCE in DATASETS[name]['dtype'] else [])
+        df = read_csv(name, columns=columns, path=path)
+        aggregates.accumulate({'version': None, 'provinces': {}}, name, df, province_of_rows(name, df))
+        rows = len(df)
+    elif mode == 'chunked':
+        rows = snapshot.stream_snapshot(name, target, None, path, chunksize)['rows_out']
+    else:
+        df, report = validation.validate(name, path, outliers=False)
+        snapshot.write_frame(target, snapshot.compact(df)[0], None)
+        rows = report['rows_out']
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'rows': rows, 'seconds': elapsed, 'peak_mb': _peak_rss_mb(), 'base_mb': base}))
+
+
+def run(name, path, mode, chunksize):
+    result = subprocess.run(
+        [sys.executable, __file__, '--child', name, path, mode, '--chunk-size', str(chunksize)],
+        capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the chunked CSV loaders.')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='approximate rows per synthetic file')
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--child', nargs=3, metavar=('DATASET', 'PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.chunk_size)
+        return
+
+    print(f'{"dataset":<20} {"layout":<14} {"mode":<8} {"rows":>10} {"rows/s":>12} {"peak MB":>9} {"base MB":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        for name in DATASETS:
+            path, _ = write_synthetic(name, args.rows, directory)
+            layout = 'comma' if DATASETS[name]['sep'] == ',' else 'semicolon'
+            with open(path, 'rb') as f:
+                layout += '+BOM' if f.read(3) == b'\xef\xbb\xbf' else ''
+            for mode in args.modes:
+                r = run(name, path, mode, args.chunk_size)
+                print(f'{name:<20} {layout:<14} {mode:<8} {r["rows"]:>10} {r["rows"] / r["seconds"]:>12,.0f} '
+                      f'{r["peak_mb"]:>9.1f} {r["base_mb"]:>9.1f}')
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Memory of each dataset as the pages hold it, before and after the compact snapshots.
+
+Usage::
+
+    python benchmarks/memory_report.py --sessions 20
+
+Per dataset, in MB (``memory_usage(deep=True)``):
+
+* ``read_csv``   a plain ``pd.read_csv`` (object strings, float64), the
+                 copy every session used to parse for itself
+* ``typed``      the CSV with the dataset's dtypes (categoricals, float64),
+                 which ``load_dataset`` shared before snapshots were compact
+* ``compact``    ``load_dataset`` now: float32/int32 measures, constant
+                 columns left out (see ``snapshot.compact``)
+
+``--sessions`` adds the total for that many sessions: one ``read_csv``
+copy each before, one shared ``compact`` frame after.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from data_loader import DATASETS, dataset_path, load_dataset, read_csv  # noqa: E402
+
+
+def _mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def measure():
+    rows = []
+    for name, spec in DATASETS.items():
+        plain = pd.read_csv(dataset_path(name), sep=spec['sep'], encoding=spec['encoding'])
+        compact = load_dataset(name)
+        rows.append({'dataset': name, 'rows': len(compact), 'read_csv': _mb(plain), 'typed': _mb(read_csv(name)),
+                     'compact': _mb(compact), 'columns': f'{plain.shape[1]} -> {compact.shape[1]}'})
+    return pd.DataFrame(rows).set_index('dataset')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the memory the compact snapshots save.')
+    parser.add_argument('--sessions', type=int, default=1, help='concurrent Streamlit sessions')
+    args = parser.parse_args()
+
+    report = measure()
+    report.loc['total'] = report[['rows', 'read_csv', 'typed', 'compact']].sum()
+    report['rows'] = report['rows'].astype(int)
+    report['saved'] = (1 - report['compact'] / report['read_csv']).map('{:.0%}'.format)
+    with pd.option_context('display.float_format', '{:.3f}'.format):
+        print(report.fillna(''))
+
+    before = args.sessions * report.loc['total', 'read_csv']
+    after = report.loc['total', 'compact']
+    print(f'{args.sessions} sessions: {before:.3f} MB before, {after:.3f} MB after '
+          f'({before - after:.3f} MB saved, {before / args.sessions - after / args.sessions:.3f} MB per session)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""Benchmark of every page's data path, compared with a stored baseline.
+
+Usage::
+
+    python benchmarks/suite.py                      # compare with baseline.json
+    python benchmarks/suite.py --scales 1,10 --save-baseline
+
+Each page is run headless, without ``streamlit run``, on the bundled
+CSVs (scale 1) and on synthetic copies with 10x, 100x and 1000x the
+kabupaten/kota and rows. Every kabupaten/kota is repeated under a
+numbered name and code; ``persentase_daerah`` has no regions, so its
+rows are repeated instead. A page runs in three stages, each starting
+from a cold process with no snapshots:
+
+* ``load``       read the page's datasets for the province
+                 (CSV, snapshot and partition)
+* ``aggregate``  the page's ``materialize`` builders (groupbys and fits)
+* ``render``     the page's ``render()`` on ready views and an empty
+                 figure cache (figures and chart serialization)
+
+Wall time comes from one child process per page. Peak traced memory and
+the blocks still allocated after each stage come from a second child
+run under ``tracemalloc``, so tracing does not slow the timed run. A
+stage regresses when its time or its peak is more than ``--tolerance``
+over the baseline. The exit status is then 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(BASE_DIR, 'benchmarks', 'baseline.json')
+
+SCALES = [1, 10, 100, 1000]
+STAGES = ['load', 'aggregate', 'render']
+# Differences below this are noise, whatever the ratio
+MIN_SECONDS = 0.02
+MIN_MB = 1.0
+
+
+def _page_paths():
+    from data_loader import GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH
+
+    # page label -> (datasets it reads, materialize builders behind its views)
+    return {
+        "Jumlah Penduduk Miskin": ([PENDUDUK, PERSENTASE_DAERAH], ['_build_penduduk', '_build_persentase_daerah']),
+        "Indeks Kedalaman dan Keparahan Kemiskinan": ([INDEKS], ['_build_indeks']),
+        "Garis Kemiskinan per Kabupaten/Kota pada Tahun Terpilih": ([GARIS_KEMISKINAN], ['_build_garis']),
+    }
+
+
+def write_scaled(name, scale, path):
+    """Copy of dataset ``name`` with ``scale`` times the kabupaten/kota (or rows)."""
+    import pandas as pd
+
+    from data_loader import DATASETS, dataset_path
+
+    spec = DATASETS[name]
+    df = pd.read_csv(dataset_path(name), sep=spec['sep'], encoding=spec['encoding'])
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        if k and 'bps_nama_kabupaten_kota' in copy:
+            copy['bps_nama_kabupaten_kota'] = copy['bps_nama_kabupaten_kota'] + f' {k}'
+            if 'bps_kode_kabupaten_kota' in copy:
+                copy['bps_kode_kabupaten_kota'] += k * 10000
+        copies.append(copy)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.concat(copies, ignore_index=True).to_csv(path, sep=spec['sep'], encoding=spec['encoding'], index=False)
+
+
+def make_tree(scale, directory):
+    """Directory laid out like the repo, with the code linked and the CSVs at ``scale``."""
+    from data_loader import DATASETS, dataset_path
+
+    tree = os.path.join(directory, f'x{scale}')
+    os.makedirs(tree)
+    for entry in os.listdir(BASE_DIR):
+        if entry.endswith('.py') or entry == 'views':
+            os.symlink(os.path.join(BASE_DIR, entry), os.path.join(tree, entry))
+    for name, spec in DATASETS.items():
+        path = os.path.join(tree, spec['path'])
+        if scale == 1:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.symlink(dataset_path(name), path)
+        else:
+            write_scaled(name, scale, path)
+    return tree
+
+
+def child(tree, page, mode):
+    sys.path.insert(0, tree)
+    import importlib
+    import logging
+    import tracemalloc
+
+    import figure_cache
+    import instrumentation
+    import materialize
+    from provinces import DEFAULT_PROVINCE, load_province
+    from views import PAGES
+
+    # Bare-mode warnings from streamlit ("missing ScriptRunContext")
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    datasets, builders = _page_paths()[page]
+    module = importlib.import_module(PAGES[page])
+
+    def run_stage(stage):
+        if stage == 'load':
+            for name in datasets:
+                load_province(name, DEFAULT_PROVINCE)
+        elif stage == 'aggregate':
+            for builder in builders:
+                getattr(materialize, builder)(DEFAULT_PROVINCE)
+        else:
+            with instrumentation.page_run(page):
+                module.render()
+
+    results = {}
+    if mode == 'memory':
+        tracemalloc.start()
+    for stage in STAGES:
+        if stage == 'render':
+            # Every view of the province, as a rerun of the live app finds them.
+            # One untimed render loads plotly's and streamlit's lazy imports;
+            # clearing the figure cache makes the timed one build every figure.
+            materialize.get_views(DEFAULT_PROVINCE)
+            module.render()
+            figure_cache.clear()
+        if mode == 'memory':
+            before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+            tracemalloc.reset_peak()
+            run_stage(stage)
+            peak = tracemalloc.get_traced_memory()[1]
+            after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+            results[stage] = {'peak_mb': peak / 2**20, 'blocks': after - before}
+        else:
+            start = time.perf_counter()
+            run_stage(stage)
+            results[stage] = {'seconds': time.perf_counter() - start}
+    print(json.dumps(results))
+
+
+def run_page(tree, page, mode):
+    # No snapshots left from the previous run: every stage starts cold
+    shutil.rmtree(os.path.join(tree, '.snapshots'), ignore_errors=True)
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', tree, page, mode],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def run_suite(scales, repeat):
+    """{'x<scale>/<page>/<stage>': {'seconds', 'peak_mb', 'blocks'}}; seconds is the best of ``repeat``."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            tree = make_tree(scale, directory)
+            for page in _page_paths():
+                timings = [run_page(tree, page, 'time') for _ in range(repeat)]
+                memory = run_page(tree, page, 'memory')
+                for stage in STAGES:
+                    results[f'x{scale}/{page}/{stage}'] = {
+                        'seconds': min(timing[stage]['seconds'] for timing in timings),
+                        **memory[stage],
+                    }
+            shutil.rmtree(tree)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print every stage against the baseline; returns the keys that regressed."""
+    regressions = []
+    print(f'{"stage":<75} {"seconds":>9} {"base":>9} {"peak MB":>9} {"base":>9} {"blocks":>9}')
+    for key, r in results.items():
+        base = baseline.get(key)
+        flag = ''
+        if base is not None:
+            slower = r['seconds'] > base['seconds'] * (1 + tolerance) and r['seconds'] - base['seconds'] > MIN_SECONDS
+            bigger = r['peak_mb'] > base['peak_mb'] * (1 + tolerance) and r['peak_mb'] - base['peak_mb'] > MIN_MB
+            if slower or bigger:
+                flag = '  REGRESSION'
+                regressions.append(key)
+        base = base or {'seconds': float('nan'), 'peak_mb': float('nan')}
+        print(f'{key:<75} {r["seconds"]:>9.3f} {base["seconds"]:>9.3f} '
+              f'{r["peak_mb"]:>9.1f} {base["peak_mb"]:>9.1f} {r["blocks"]:>9}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pages' data paths against a baseline.")
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)), help='comma-separated data scales')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per page (best is kept)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown/growth over the baseline')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--child', nargs=3, metavar=('TREE', 'PAGE', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    sys.path.insert(0, BASE_DIR)
+    results = run_suite([int(scale) for scale in args.scales.split(',')], args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': {**baseline, **results}}, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f'baseline written to {args.baseline}')
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import os
+import threading
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Dataset keys used throughout the app
+PENDUDUK = 'penduduk'
+PERSENTASE_DAERAH = 'persentase_daerah'
+INDEKS = 'indeks'
+GARIS_KEMISKINAN = 'garis_kemiskinan'
+
+# Every BPS CSV the dashboard reads, with its delimiter, encoding and dtypes.
+# 'utf-8-sig' strips the BOM in front of the first header ('﻿tahun').
+DATASETS = {
+    PENDUDUK: {
+        'path': 'Jumlah Penduduk Miskin Provinsi Aceh Menurut KabupatenKota/merged_jumlah_penduduk_miskin_aceh.csv',
+        'sep': ',',
+        'encoding': 'utf-8-sig',
+        'dtype': {
+            'tahun': 'int16',
+            'periode_bulan': 'category',
+            'bps_kode_provinsi': 'int16',
+            'bps_nama_provinsi': 'category',
+            'bps_kode_kabupaten_kota': 'int32',
+            'bps_nama_kabupaten_kota': 'category',
+            'bps_jumlah_penduduk': 'float64',
+            'satuan': 'category',
+            'persentase_jumlah_penduduk_miskin': 'float64',
+        },
+    },
+    PERSENTASE_DAERAH: {
+        'path': 'Jumlah Penduduk Miskin Provinsi Aceh Menurut KabupatenKota/persentase-penduduk-miskin-menurut-daerah-di-provinsi-aceh.csv',
+        'sep': ';',
+        'encoding': 'utf-8-sig',
+        'dtype': {
+            'bps_kode_provinsi': 'int16',
+            'bps_nama_provinsi': 'category',
+            'tahun': 'int16',
+            'bulan': 'category',
+            'daerah': 'category',
+            'persentase_penduduk_miskin': 'float64',
+            'satuan': 'category',
+        },
+    },
+    INDEKS: {
+        'path': 'Indeks Kedalaman dan Keparahan Kemiskinan Aceh/test keparahan dan kedalaman.csv',
+        'sep': ',',
+        'encoding': 'utf-8-sig',
+        'dtype': {
+            'bps_nama_kabupaten_kota': 'category',
+            'tahun': 'int16',
+            'indeks_kedalaman': 'float64',
+            'indeks_keparahan_kemiskinan': 'float64',
+        },
+    },
+    GARIS_KEMISKINAN: {
+        'path': 'Garis Kemiskinan (GK) Aceh/garis_kemiskinan_rupiah.csv',
+        'sep': ';',
+        'encoding': 'utf-8-sig',
+        'dtype': {
+            'tahun': 'int16',
+            'garis_kemiskinan': 'int64',
+            'bps_nama_kabupaten_kota': 'category',
+        },
+    },
+}
+
+# Process-wide cache shared by every Streamlit session:
+# (dataset name, columns) -> ((path, mtime_ns), DataFrame)
+_cache = {}
+# Re-entrant: validating a snapshot may load penduduk for its region table
+_lock = threading.RLock()
+
+
+def dataset_path(name):
+    return os.path.join(BASE_DIR, DATASETS[name]['path'])
+
+
+def read_csv(name, columns=None, path=None):
+    """Parse a CSV laid out like dataset ``name`` (its own file unless ``path`` is given)."""
+    spec = DATASETS[name]
+    return pd.read_csv(path or dataset_path(name), sep=spec['sep'], encoding=spec['encoding'],
+                       dtype=spec['dtype'], usecols=columns)
+
+
+def _read(name, columns):
+    # Imported here because snapshot builds on this module
+    from snapshot import load_snapshot
+
+    try:
+        return load_snapshot(name, columns)
+    except OSError:
+        # Snapshot directory not writable: validate the CSV in memory instead
+        from validation import validate
+
+        df = validate(name, outliers=False)[0]
+        return df[columns] if columns is not None else df
+
+
+def load_dataset(name, columns=None):
+    """Return the dataset (optionally only ``columns``), re-reading only when the CSV changes.
+
+    Data comes from the columnar snapshot, which is rebuilt automatically when
+    the source CSV is newer. The returned frame is shared between sessions and
+    must be treated as read-only.
+    """
+    path = dataset_path(name)
+    key = (path, os.stat(path).st_mtime_ns)
+    cache_key = (name, tuple(columns) if columns is not None else None)
+
+    cached = _cache.get(cache_key)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(cache_key)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        df = _read(name, list(columns) if columns is not None else None)
+        _cache[cache_key] = (key, df)
+        return df
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
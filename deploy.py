@@ -0,0 +1,219 @@
+"""Multi-worker deployment: several Streamlit processes behind a local load balancer.
+
+Usage::
+
+    python deploy.py --workers 4 --port 8501
+
+A single Streamlit process runs every session's script on threads that
+share one GIL. This mode starts ``--workers`` Streamlit processes on
+ports ``--port + 1`` upwards and a small asyncio TCP balancer on
+``--port`` that hands each incoming connection to the next live worker
+in turn. A browser tab keeps its websocket on one worker for its
+lifetime; Streamlit reconnects a dropped tab to whichever worker is next.
+
+Before the workers start, every store is built once: snapshots,
+province partitions, materialized views (with the forecast store) and
+panels. The workers then only attach to those files. Arrow files are
+memory-mapped with zero-copy numeric columns (``snapshot.to_frame``) and
+panel cubes are mapped ``.npy`` files, so the workers share one copy of
+the data through the OS page cache instead of loading one each. Figure
+caches remain per worker.
+
+A worker that exits is restarted; a worker that refuses connections is
+skipped for ``RETRY_SECONDS``. Media served by a worker (download
+buttons) is only known to that worker: with ``--sticky`` every
+connection from one client address goes to the same worker.
+Load-test it with ``benchmarks/app_load.py``.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import zlib
+
+from data_loader import BASE_DIR, DATASETS
+
+APP_PATH = os.path.join(BASE_DIR, 'app.py')
+RETRY_SECONDS = 5
+START_TIMEOUT = 120
+PIPE_CHUNK = 64 * 1024
+
+
+def prepare():
+    """Build every store the pages read, so workers never build them concurrently."""
+    import materialize
+    import panel
+    import snapshot
+    from provinces import build_partitions, list_provinces
+
+    for name in DATASETS:
+        snapshot.load_snapshot(name, columns=['tahun'])
+        build_partitions(name)
+    for provinsi in list_provinces():
+        materialize.get_views(provinsi)
+        panel.get_panel(provinsi)
+
+
+def worker_command(port):
+    return [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+            '--server.port', str(port), '--server.address', '127.0.0.1',
+            '--server.headless', 'true', '--server.fileWatcherType', 'none',
+            '--browser.gatherUsageStats', 'false']
+
+
+class Balancer:
+    def __init__(self, ports, sticky=False):
+        self.ports = list(ports)
+        self.sticky = sticky
+        self._next = 0
+        # port -> time before which it is skipped
+        self._down = {}
+
+    def _candidates(self, client):
+        if self.sticky and client:
+            first = zlib.crc32(client.encode()) % len(self.ports)
+        else:
+            first = self._next
+            self._next = (self._next + 1) % len(self.ports)
+        ordered = self.ports[first:] + self.ports[:first]
+        now = time.monotonic()
+        # Workers marked down are tried last, in case all of them are
+        return sorted(ordered, key=lambda port: self._down.get(port, 0) > now)
+
+    async def _connect(self, client):
+        for port in self._candidates(client):
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            except OSError:
+                self._down[port] = time.monotonic() + RETRY_SECONDS
+                continue
+            self._down.pop(port, None)
+            return reader, writer
+        return None
+
+    async def handle(self, client_reader, client_writer):
+        peer = client_writer.get_extra_info('peername')
+        backend = await self._connect(peer[0] if peer else None)
+        if backend is None:
+            client_writer.write(b'HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await client_writer.drain()
+            client_writer.close()
+            return
+        backend_reader, backend_writer = backend
+        await asyncio.gather(_pipe(client_reader, backend_writer), _pipe(backend_reader, client_writer))
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(PIPE_CHUNK)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _healthy(port):
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError:
+        return False
+    try:
+        writer.write(b'GET /_stcore/health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+        await writer.drain()
+        status = await reader.readline()
+        return b' 200 ' in status
+    except (OSError, asyncio.IncompleteReadError):
+        return False
+    finally:
+        writer.close()
+
+
+async def wait_healthy(ports, timeout=START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    pending = set(ports)
+    while pending:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'Workers on ports {sorted(pending)} did not start')
+        pending = {port for port in pending if not await _healthy(port)}
+        if pending:
+            await asyncio.sleep(0.5)
+
+
+class Workers:
+    def __init__(self, ports):
+        self.ports = list(ports)
+        self.processes = {}
+
+    def start(self, port):
+        env = dict(os.environ, KEMISKINAN_WORKER=str(self.ports.index(port)))
+        self.processes[port] = subprocess.Popen(worker_command(port), env=env, cwd=BASE_DIR,
+                                                stdout=subprocess.DEVNULL)
+
+    def start_all(self):
+        for port in self.ports:
+            self.start(port)
+
+    async def supervise(self):
+        while True:
+            await asyncio.sleep(1)
+            for port, process in self.processes.items():
+                if process.poll() is not None:
+                    print(f'worker :{port} exited with {process.returncode}, restarting', file=sys.stderr)
+                    self.start(port)
+
+    def stop(self):
+        for process in self.processes.values():
+            process.terminate()
+        for process in self.processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def serve(host, port, workers, sticky=False):
+    # SIGTERM stops the workers the same way Ctrl+C does
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    ports = [port + 1 + i for i in range(workers)]
+    pool = Workers(ports)
+    pool.start_all()
+    try:
+        await wait_healthy(ports)
+        balancer = Balancer(ports, sticky=sticky)
+        server = await asyncio.start_server(balancer.handle, host, port)
+        print(f'{workers} worker(s) on ports {ports[0]}-{ports[-1]}, serving http://{host}:{port}', flush=True)
+        async with server:
+            await asyncio.gather(server.serve_forever(), pool.supervise())
+    finally:
+        pool.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run several dashboard workers behind a local load balancer.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8501)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--sticky', action='store_true', help='send every connection of a client address to one worker')
+    parser.add_argument('--no-prepare', action='store_true', help='skip building the stores first')
+    args = parser.parse_args()
+
+    if not args.no_prepare:
+        started = time.perf_counter()
+        prepare()
+        print(f'stores ready in {time.perf_counter() - started:.1f}s', flush=True)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, sticky=args.sticky))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == '__main__':
+    main()
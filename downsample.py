@@ -0,0 +1,117 @@
+"""Downsampling of region-grouped line data before it is sent to the browser.
+
+Both methods work on every region at once, on rows grouped by region
+and ordered by x within each region:
+
+* ``lttb``    Largest-Triangle-Three-Buckets. It keeps the first and last
+              point and, per bucket, the point spanning the largest
+              triangle with the previously kept point and the next
+              bucket's mean. The loop runs over buckets, vectorized
+              across regions.
+* ``minmax``  the lowest and highest point of every bucket, plus the
+              first and last point. No loop at all.
+
+``reduce`` gives every region an equal share of ``POINT_BUDGET`` and
+leaves regions that already fit untouched. ``plotting.region_lines``
+applies it automatically above the budget.
+"""
+import numpy as np
+import pandas as pd
+
+POINT_BUDGET = 5000
+# Fewer than this per region and a line loses its shape
+MIN_POINTS = 3
+
+
+def _groups(codes):
+    """Start and length of each run of equal codes (codes must be grouped)."""
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.intp)
+    lengths = np.diff(np.r_[starts, len(codes)])
+    return starts, lengths
+
+
+def lttb_indices(codes, x, y, threshold):
+    """Positions of the rows LTTB keeps, ``threshold`` per group (all rows of shorter groups)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    starts, lengths = _groups(np.asarray(codes))
+    threshold = max(int(threshold), MIN_POINTS)
+    long = lengths > threshold
+    keep = [np.arange(s, s + n) for s, n in zip(starts[~long], lengths[~long])]
+    if long.any():
+        s, n = starts[long], lengths[long]
+        buckets = threshold - 2
+        # Bucket b covers local positions [edges[:, b], edges[:, b + 1]) of the inner points
+        every = (n - 2) / buckets
+        edges = (np.arange(buckets + 1)[None, :] * every[:, None]).astype(np.intp) + 1
+        edges[:, -1] = n - 1
+
+        # Mean of every bucket from cumulative sums; the last point stands in after the last bucket
+        cx = np.r_[0.0, np.cumsum(x)]
+        cy = np.r_[0.0, np.cumsum(y)]
+        lo, hi = s[:, None] + edges[:, :-1], s[:, None] + edges[:, 1:]
+        width = hi - lo
+        mean_x = (cx[hi] - cx[lo]) / width
+        mean_y = (cy[hi] - cy[lo]) / width
+        last = s + n - 1
+        next_x = np.c_[mean_x[:, 1:], x[last]]
+        next_y = np.c_[mean_y[:, 1:], y[last]]
+
+        chosen = np.empty((len(s), threshold), dtype=np.intp)
+        chosen[:, 0], chosen[:, -1] = s, last
+        a = s
+        span = np.arange(width.max())
+        for b in range(buckets):
+            candidates = lo[:, b, None] + span[None, :]
+            inside = candidates < hi[:, b, None]
+            candidates = np.where(inside, candidates, lo[:, b, None])
+            ax, ay = x[a][:, None], y[a][:, None]
+            area = np.abs((ax - next_x[:, b, None]) * (y[candidates] - ay)
+                          - (ax - x[candidates]) * (next_y[:, b, None] - ay))
+            area = np.where(inside, np.nan_to_num(area, nan=-1.0), -2.0)
+            a = candidates[np.arange(len(s)), area.argmax(axis=1)]
+            chosen[:, b + 1] = a
+        keep.append(chosen.ravel())
+    return np.sort(np.concatenate(keep)) if keep else np.array([], dtype=np.intp)
+
+
+def minmax_indices(codes, x, y, threshold):
+    """Positions of each bucket's min and max rows plus each group's ends, about ``threshold`` per group."""
+    y = np.asarray(y, dtype=float)
+    codes = np.asarray(codes)
+    starts, lengths = _groups(codes)
+    n_buckets = max(int(threshold) // 2, 1)
+    group = np.repeat(np.arange(len(starts)), lengths)
+    position = np.arange(len(codes)) - starts[group]
+    key = group * n_buckets + position * n_buckets // lengths[group]
+
+    # Sorted by bucket then y: the first row of a bucket is its min, the last its max
+    order = np.lexsort((np.nan_to_num(y, nan=np.inf), key))
+    sorted_key = key[order]
+    first = np.r_[True, sorted_key[1:] != sorted_key[:-1]]
+    last = np.r_[sorted_key[1:] != sorted_key[:-1], True]
+    keep = np.zeros(len(codes), dtype=bool)
+    keep[order[first | last]] = True
+    keep[starts] = keep[starts + lengths - 1] = True
+    # Groups that already fit keep every row
+    keep |= (lengths <= threshold)[group]
+    return np.flatnonzero(keep)
+
+
+METHODS = {'lttb': lttb_indices, 'minmax': minmax_indices}
+
+
+def reduce(df, x, y, group, budget=POINT_BUDGET, method='lttb'):
+    """Rows of ``df`` left after downsampling every ``group`` to its share of ``budget`` points.
+
+    Returned in region order, sorted by ``x`` within each region. A frame
+    already within the budget is returned as is.
+    """
+    if budget is None or len(df) <= budget:
+        return df
+    codes = pd.factorize(df[group].astype(str), sort=False)[0]
+    order = np.lexsort((df[x].to_numpy(), codes))
+    codes = codes[order]
+    n_groups = int(codes.max()) + 1 if len(codes) else 1
+    rows = METHODS[method](codes, df[x].to_numpy()[order], df[y].to_numpy()[order], budget // n_groups)
+    return df.iloc[order[rows]]
@@ -0,0 +1,193 @@
+"""Static export of every dashboard figure, for serving from a plain file server.
+
+Usage::
+
+    python export_static.py --out static_export
+
+Every page module lists the figures of all its finite widget states in
+``export_targets(provinsi)`` (top-N choices, every tahun, every single
+kabupaten/kota forecast and "Select All"). Each figure is written as its
+Plotly JSON spec and as a standalone HTML page, both named by a hash of
+their content::
+
+    static_export/
+        manifest.json                      figure id -> files, hash, widgets
+        index.html                         links to every HTML figure
+        plotly.min.<hash>.js               shared by every HTML figure
+        <provinsi>/<page>/<figure>.<hash>.json
+        <provinsi>/<page>/<figure>.<hash>.html
+
+Hashed files never change, so they can be cached forever; only
+``manifest.json`` and ``index.html`` need revalidation. Exports are
+incremental: a figure is rebuilt only when the datasets its page reads
+(``PAGE_DATASETS``) or ``EXPORT_FORMAT`` changed, and files no longer in
+the manifest are removed.
+"""
+import argparse
+import hashlib
+import html
+import importlib
+import json
+import os
+import posixpath
+import re
+import time
+
+import plotly
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from data_loader import BASE_DIR, GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH
+from provinces import list_provinces, slug
+from snapshot import data_version
+from views import PAGES
+
+DEFAULT_OUT = os.path.join(BASE_DIR, 'static_export')
+# Bumped whenever the figures or the file layout change so everything is re-exported
+EXPORT_FORMAT = 1
+
+# figure_cache page name -> datasets its figures are built from; indeks and
+# garis_kemiskinan rows take their province and names from penduduk
+PAGE_DATASETS = {
+    'penduduk': [PENDUDUK, PERSENTASE_DAERAH],
+    'indeks': [INDEKS, PENDUDUK],
+    'garis_kemiskinan': [GARIS_KEMISKINAN, PENDUDUK],
+}
+HASH_LENGTH = 16
+_HASHED = re.compile(r'\.[0-9a-f]{%d}\.(json|html|js)$' % HASH_LENGTH)
+# Longer figure names are cut and made unique with a hash of the widget values
+MAX_NAME = 60
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _figure_name(widgets):
+    """Readable file name of a figure from its widget values (without the province)."""
+    parts, unique = [], False
+    for value in widgets[1:]:
+        if isinstance(value, tuple) and len(value) > 1:
+            # Multiselect values are named by their size; the hash tells selections apart
+            parts.append(f'{len(value)}_wilayah')
+            unique = True
+        else:
+            parts.append(slug(str(value[0] if isinstance(value, tuple) else value)))
+    name = '-'.join(parts)
+    if unique or len(name) > MAX_NAME:
+        name = f'{name[:MAX_NAME].rstrip("_-")}-{_digest(repr(widgets).encode())[:8]}'
+    return name
+
+
+def _write_hashed(out, directory, name, suffix, data):
+    """Write ``data`` as ``<directory>/<name>.<hash><suffix>`` unless it exists; returns the relative path."""
+    relative = posixpath.join(directory, f'{name}.{_digest(data)}{suffix}')
+    path = os.path.join(out, relative)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(f'{path}.tmp', path)
+    return relative
+
+
+def _write_text(path, text):
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(f'{path}.tmp', path)
+
+
+def _read_manifest(out):
+    try:
+        with open(os.path.join(out, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _targets(provinsi):
+    for module_name in PAGES.values():
+        yield from importlib.import_module(module_name).export_targets(provinsi)
+
+
+def _index_html(figures):
+    rows = []
+    for figure_id, entry in sorted(figures.items()):
+        rows.append(f'<li><a href="{html.escape(entry["html"])}">{html.escape(figure_id)}</a></li>')
+    return ('<!DOCTYPE html>\n<html lang="id"><head><meta charset="utf-8">'
+            '<title>Dashboard Kemiskinan - Ekspor Statis</title></head>\n<body>\n'
+            f'<h1>Dashboard Kemiskinan</h1>\n<ul>\n{chr(10).join(rows)}\n</ul>\n</body></html>\n')
+
+
+def export(out=DEFAULT_OUT, provinces=None, force=False):
+    """Export the figures of ``provinces`` (all when None) into ``out``; returns counts."""
+    os.makedirs(out, exist_ok=True)
+    previous = _read_manifest(out)
+    if previous is None or previous.get('format') != EXPORT_FORMAT or previous.get('plotly') != plotly.__version__:
+        previous = {'figures': {}}
+
+    plotly_js = _write_hashed(out, '', 'plotly.min', '.js', get_plotlyjs().encode())
+    counts = {'built': 0, 'unchanged': 0, 'removed': 0}
+    figures = {}
+    for provinsi in provinces or list_provinces():
+        for page, widgets, build in _targets(provinsi):
+            directory = f'{slug(provinsi)}/{page}'
+            name = _figure_name(widgets)
+            figure_id = f'{directory}/{name}'
+            inputs = data_version(PAGE_DATASETS[page])
+            entry = previous['figures'].get(figure_id)
+            if (not force and entry is not None and entry['inputs'] == inputs
+                    and all(os.path.exists(os.path.join(out, entry[kind])) for kind in ('json', 'html'))):
+                figures[figure_id] = entry
+                counts['unchanged'] += 1
+                continue
+
+            fig = build()
+            spec = pio.to_json(fig, validate=False)
+            # A fixed div id keeps the HTML, and so its hash, the same for the same figure
+            page_html = pio.to_html(fig, include_plotlyjs='../' * (directory.count('/') + 1) + plotly_js,
+                                    full_html=True, validate=False, div_id=f'fig-{_digest(figure_id.encode())}')
+            figures[figure_id] = {
+                'provinsi': provinsi,
+                'page': page,
+                'widgets': json.loads(json.dumps(widgets[1:])),
+                'json': _write_hashed(out, directory, name, '.json', spec.encode()),
+                'html': _write_hashed(out, directory, name, '.html', page_html.encode()),
+                'hash': _digest(spec.encode()),
+                'inputs': inputs,
+            }
+            counts['built'] += 1
+
+    if provinces:
+        # A partial export keeps the other provinces' figures
+        figures = {**{k: v for k, v in previous['figures'].items() if v['provinsi'] not in provinces}, **figures}
+    manifest = {'format': EXPORT_FORMAT, 'plotly': plotly.__version__, 'plotly_js': plotly_js, 'figures': figures}
+    _write_text(os.path.join(out, 'manifest.json'), json.dumps(manifest, ensure_ascii=False, indent=1))
+    _write_text(os.path.join(out, 'index.html'), _index_html(figures))
+
+    # Hashed files no longer referenced belong to older data
+    keep = {plotly_js} | {entry[kind] for entry in figures.values() for kind in ('json', 'html')}
+    for root, _, filenames in os.walk(out):
+        for filename in filenames:
+            relative = os.path.relpath(os.path.join(root, filename), out).replace(os.sep, '/')
+            if _HASHED.search(filename) and relative not in keep:
+                os.remove(os.path.join(root, filename))
+                counts['removed'] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export every dashboard figure as static HTML/JSON.')
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    parser.add_argument('--provinsi', action='append', help='export only this province (repeatable)')
+    parser.add_argument('--force', action='store_true', help='rebuild every figure')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = export(args.out, args.provinsi, args.force)
+    print(f'{counts["built"]} dibuat, {counts["unchanged"]} tidak berubah, {counts["removed"]} dihapus '
+          f'-> {args.out} ({time.perf_counter() - started:.1f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Process-wide LRU cache of serialized Plotly figures.
+
+Figures are keyed by ``(page, widget values, data version)`` and stored
+as the JSON spec Plotly would send to the browser. A hit rebuilds a
+``go.Figure`` from that spec without validation, so it skips the pandas
+work and the Plotly construction in the page's builder. The cache is
+shared by every session of the server process; ``stats()`` reports the
+hit/miss counters. ``warm`` stores a figure ahead of time (see
+``prefetch.py``).
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from instrumentation import stage
+from snapshot import data_version
+
+MAX_ENTRIES = 128
+
+_figures = OrderedDict()
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+
+def _version_key():
+    return tuple((name, sig['mtime_ns'], sig['size']) for name, sig in data_version().items())
+
+
+def get_figure(page, widgets, build):
+    """Figure for ``page`` with the given widget values, calling ``build()`` on a miss.
+
+    ``widgets`` must be hashable (use tuples for multiselect values). The
+    returned figure is a fresh object and may be modified by the caller.
+    """
+    key = (page, widgets, _version_key())
+    with _lock:
+        spec = _figures.get(key)
+        if spec is not None:
+            _figures.move_to_end(key)
+            _counters['hits'] += 1
+        else:
+            _counters['misses'] += 1
+
+    if spec is None:
+        with stage('figure'):
+            fig = build()
+        with stage('serialize'):
+            spec = pio.to_json(fig, validate=False)
+        with _lock:
+            _figures[key] = spec
+            _figures.move_to_end(key)
+            while len(_figures) > MAX_ENTRIES:
+                _figures.popitem(last=False)
+    with stage('serialize'):
+        return go.Figure(json.loads(spec), _validate=False)
+
+
+def warm(page, widgets, build, max_bytes=None):
+    """Build and store a figure ahead of time, without evicting anything.
+
+    Skipped (returns False) when the figure is already cached, the cache is
+    full, or storing it would take the cached specs over ``max_bytes``.
+    """
+    key = (page, widgets, _version_key())
+    with _lock:
+        if key in _figures or len(_figures) >= MAX_ENTRIES:
+            return False
+    spec = pio.to_json(build(), validate=False)
+    with _lock:
+        if key in _figures or len(_figures) >= MAX_ENTRIES:
+            return False
+        if max_bytes is not None and _nbytes() + len(spec) > max_bytes:
+            return False
+        # Oldest end: a prefetched figure is the first to go if nobody opens it
+        _figures[key] = spec
+        _figures.move_to_end(key, last=False)
+    return True
+
+
+def _nbytes():
+    return sum(len(spec) for spec in _figures.values())
+
+
+def stats():
+    with _lock:
+        return {**_counters, 'entries': len(_figures), 'max_entries': MAX_ENTRIES, 'bytes': _nbytes()}
+
+
+def clear():
+    with _lock:
+        _figures.clear()
+        _counters['hits'] = _counters['misses'] = 0
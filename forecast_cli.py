@@ -0,0 +1,180 @@
+"""Headless batch forecasting for every indicator and region.
+
+Usage::
+
+    python forecast_cli.py --horizon 5 --workers 4
+
+Each indicator is fitted, for every province, at province level
+(yearly sum/mean) and for every kabupaten/kota (or daerah). The work is
+split into tasks of one province and at most ``--chunk-size`` regions,
+each reading only that province's partition, and fanned out over a
+process pool. All results go to one zstd-compressed Arrow file (default
+``.snapshots/forecast_batch.arrow``) in long format::
+
+    provinsi, indikator, level, wilayah, model, slope, intercept,
+    sigma, n, x_mean, sxx, tahun, nilai, bawah, atas
+
+``--model`` picks the forecasting model (see ``forecasting.py``);
+``auto`` backtests every model and keeps the best one per region.
+``bawah``/``atas`` are the 95% prediction bounds. The linear-trend
+parameters (slope to sxx) are only filled for the linear model.
+
+The source data version is stored in the file's metadata; the forecast
+store serves its coefficients instead of fitting when the version matches.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from data_loader import GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH
+from forecasting import MODELS, backtest, best_models, get_model, series_matrix
+from provinces import list_provinces, load_province
+from snapshot import SNAPSHOT_DIR, data_version
+
+OUTPUT_PATH = os.path.join(SNAPSHOT_DIR, 'forecast_batch.arrow')
+PROVINSI = 'provinsi'
+KABUPATEN_KOTA = 'kabupaten_kota'
+_META_KEY = b'kemiskinan_version'
+
+REGION = 'bps_nama_kabupaten_kota'
+
+# Linear-trend parameters written per row (the last four give the intervals)
+LINEAR_PARAMS = ['slope', 'intercept', 'sigma', 'n', 'x_mean', 'sxx']
+
+# indicator -> (dataset, column, region column, province-level yearly aggregation)
+INDICATORS = {
+    'jumlah_penduduk': (PENDUDUK, 'bps_jumlah_penduduk', REGION, 'sum'),
+    'persentase_penduduk_miskin': (PENDUDUK, 'persentase_jumlah_penduduk_miskin', REGION, 'mean'),
+    'persentase_daerah': (PERSENTASE_DAERAH, 'persentase_penduduk_miskin', 'daerah', 'mean'),
+    'indeks_kedalaman': (INDEKS, 'indeks_kedalaman', REGION, 'mean'),
+    'indeks_keparahan': (INDEKS, 'indeks_keparahan_kemiskinan', REGION, 'mean'),
+    'garis_kemiskinan': (GARIS_KEMISKINAN, 'garis_kemiskinan', REGION, 'mean'),
+}
+
+
+def _forecast_rows(provinsi, indikator, level, wilayah, years, Y, model_name, horizon):
+    """Fit ``model_name`` (or the best backtested model per row for 'auto') and forecast."""
+    future = np.arange(years.max() + 1, years.max() + 1 + horizon)
+    if model_name == 'auto':
+        chosen = best_models(backtest(years, Y)).reindex(range(len(wilayah))).fillna('linear').to_numpy()
+    else:
+        chosen = np.full(len(wilayah), model_name, dtype=object)
+
+    parts = []
+    for name in pd.unique(chosen):
+        rows = np.flatnonzero(chosen == name)
+        model = get_model(name)
+        params = model.fit(years, Y[rows])
+        values = model.forecast(params, future)
+        lower, upper = model.interval(params, future)
+        linear = name == 'linear'
+        parts.append(pd.DataFrame({
+            'provinsi': provinsi,
+            'indikator': indikator,
+            'level': level,
+            'wilayah': np.repeat(np.asarray(wilayah, dtype=object)[rows], horizon),
+            'model': name,
+            **{key: np.repeat(params[key] if linear else np.full(len(rows), np.nan), horizon)
+               for key in LINEAR_PARAMS},
+            'tahun': np.tile(future, len(rows)).astype(np.int16),
+            'nilai': values.ravel(),
+            'bawah': lower.ravel(),
+            'atas': upper.ravel(),
+        }))
+    result = pd.concat(parts, ignore_index=True)
+    return result[result['nilai'].notna()]
+
+
+def _run_task(task):
+    """Forecast one indicator of one province, at province level (regions=None) or for a chunk of regions."""
+    provinsi, indikator, regions, horizon, model_name = task
+    dataset, column, region_col, how = INDICATORS[indikator]
+    data = load_province(dataset, provinsi, columns=['tahun', region_col, column])
+
+    if regions is None:
+        yearly = data.groupby('tahun')[column].agg(how)
+        Y = yearly.to_numpy(dtype=float)[None, :]
+        return _forecast_rows(provinsi, indikator, PROVINSI, [provinsi], yearly.index.to_numpy(dtype=float), Y,
+                              model_name, horizon)
+
+    subset = data[data[region_col].isin(regions)]
+    wilayah, years, Y = series_matrix(subset, region_col, 'tahun', column)
+    return _forecast_rows(provinsi, indikator, KABUPATEN_KOTA, [str(w) for w in wilayah], years, Y,
+                          model_name, horizon)
+
+
+def plan_tasks(horizon, chunk_size, model_name='linear'):
+    tasks = []
+    for provinsi in list_provinces():
+        for indikator, (dataset, _, region_col, _) in INDICATORS.items():
+            regions = load_province(dataset, provinsi, columns=[region_col])[region_col].dropna().unique()
+            if not len(regions):
+                continue
+            tasks.append((provinsi, indikator, None, horizon, model_name))
+            for start in range(0, len(regions), chunk_size):
+                tasks.append((provinsi, indikator, [str(r) for r in regions[start:start + chunk_size]],
+                              horizon, model_name))
+    return tasks
+
+
+def run(horizon=5, workers=None, chunk_size=64, output=OUTPUT_PATH, model_name='linear'):
+    """Compute every forecast and write them to ``output``; returns the result frame."""
+    tasks = plan_tasks(horizon, chunk_size, model_name)
+    if workers == 1:
+        parts = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_task, tasks))
+
+    result = pd.concat(parts, ignore_index=True)
+    for column in ('provinsi', 'indikator', 'level', 'wilayah', 'model'):
+        result[column] = result[column].astype('category')
+
+    table = pa.Table.from_pandas(result, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_META_KEY] = json.dumps(data_version()).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tmp_path = f'{output}.tmp'
+    feather.write_feather(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, output)
+    return result
+
+
+def read_batch(path=OUTPUT_PATH):
+    """Return ``(version, frame)`` from a batch file, or ``(None, None)`` if absent."""
+    try:
+        table = feather.read_table(path)
+    except (OSError, pa.ArrowInvalid):
+        return None, None
+    raw = (table.schema.metadata or {}).get(_META_KEY)
+    return (json.loads(raw) if raw else None), table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute trend forecasts for every indicator and region.')
+    parser.add_argument('--horizon', type=int, default=5, help='number of years after the last observed year')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='regions per task')
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--model', default='linear', choices=[*MODELS, 'auto'],
+                        help="forecasting model; 'auto' picks the best backtested model per region")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run(args.horizon, args.workers, args.chunk_size, args.output, args.model)
+    elapsed = time.perf_counter() - start
+    print(f'{len(result)} forecasts for {result["indikator"].nunique()} indicators in '
+          f'{result["provinsi"].nunique()} provinces written to {args.output} in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Forecast parameters for the yearly and per-region series of each province.
+
+Each series uses the model named in ``SERIES_MODELS`` (linear trend by
+default). A province's parameters are fitted the first time it is asked
+for after its rows changed (``province_version``), persisted to
+``.snapshots/forecasts.json`` and kept in memory, so page renders only
+evaluate the fitted model. Linear trends are solved from the running
+sums in ``aggregates.py``, which ``ingest`` extends with the new rows
+only; other models are fitted on the province's own partition (see
+``provinces.py``).
+When a ``forecast_cli.py`` batch file for the same version has linear
+coefficients for every series and kabupaten/kota of the province, they
+are used and nothing is fitted at all.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+from data_loader import GARIS_KEMISKINAN, INDEKS, PENDUDUK
+from forecasting import get_model, series_matrix
+from provinces import DEFAULT_PROVINCE, REGION, load_province, province_version
+from snapshot import SNAPSHOT_DIR, data_version as source_version
+
+STORE_PATH = os.path.join(SNAPSHOT_DIR, 'forecasts.json')
+# Bumped whenever the stored layout changes so older files are refitted
+STORE_FORMAT = 6
+
+# series name -> (dataset, column, yearly aggregation)
+SERIES = {
+    'jumlah_penduduk': (PENDUDUK, 'bps_jumlah_penduduk', 'sum'),
+    'persentase_penduduk_miskin': (PENDUDUK, 'persentase_jumlah_penduduk_miskin', 'mean'),
+    'indeks_kedalaman': (INDEKS, 'indeks_kedalaman', 'mean'),
+    'indeks_keparahan': (INDEKS, 'indeks_keparahan_kemiskinan', 'mean'),
+}
+
+# per-region series name -> (dataset, column), fitted for every kabupaten/kota
+REGIONAL_SERIES = {
+    'garis_kemiskinan': (GARIS_KEMISKINAN, 'garis_kemiskinan'),
+}
+
+# series name -> forecasting model (see forecasting.py)
+SERIES_MODELS = {
+    'jumlah_penduduk': 'linear',
+    'persentase_penduduk_miskin': 'linear',
+    'indeks_kedalaman': 'linear',
+    'indeks_keparahan': 'linear',
+    'garis_kemiskinan': 'linear',
+}
+
+_store = None
+_lock = threading.Lock()
+
+
+# Datasets the series are fitted from
+DATASETS = sorted({spec[0] for spec in (*SERIES.values(), *REGIONAL_SERIES.values())})
+
+
+def data_version():
+    return source_version(DATASETS)
+
+
+def _entries(model_name, params, count):
+    """Split per-row parameter arrays into one JSON-able dict per row."""
+    return [{'model': model_name, **{key: float(np.asarray(value)[i]) for key, value in params.items()}}
+            for i in range(count)]
+
+
+def _fit_all(provinsi):
+    series = {}
+    for name, (dataset, column, how) in SERIES.items():
+        yearly = aggregates.yearly(dataset, provinsi, column, how)
+        if yearly.empty:
+            continue
+        model_name = SERIES_MODELS.get(name, 'linear')
+        params = get_model(model_name).fit(yearly.index.to_numpy(dtype=float), yearly.to_numpy(dtype=float)[None, :])
+        series[name] = _entries(model_name, params, 1)[0]
+
+    regions = {}
+    for name, (dataset, column) in REGIONAL_SERIES.items():
+        model_name = SERIES_MODELS.get(name, 'linear')
+        if model_name == 'linear':
+            labels, sums = aggregates.region_sums(dataset, provinsi, column)
+            params = get_model(model_name).fit_sums(*sums, x0=aggregates.X_REF)
+        else:
+            # Only the province's own partition is read
+            data = load_province(dataset, provinsi, columns=['tahun', REGION, column])
+            labels, years, Y = series_matrix(data, REGION, 'tahun', column)
+            params = get_model(model_name).fit(years, Y)
+        regions[name] = dict(zip(map(str, labels), _entries(model_name, params, len(labels))))
+    return {'series': series, 'regions': regions}
+
+
+def _store_from_batch(version, provinsi):
+    """Coefficients from the nightly forecast_cli output, if it matches ``version``."""
+    from forecast_cli import KABUPATEN_KOTA, LINEAR_PARAMS, PROVINSI, read_batch
+
+    if any(model_name != 'linear' for model_name in SERIES_MODELS.values()):
+        # The batch file only carries parameters for linear trends
+        return None
+    batch_version, batch = read_batch()
+    if batch_version is None or any(batch_version.get(name) != sig for name, sig in version.items()):
+        return None
+    if 'provinsi' not in batch or 'sigma' not in batch:
+        # Written before batches were split per province or carried intervals
+        return None
+    coef = batch[batch['provinsi'] == provinsi]
+    coef = coef.drop_duplicates(['indikator', 'level', 'wilayah'])
+
+    # A row fitted with another model (--model auto) has no linear parameters: refit instead
+    series = {}
+    for name in SERIES:
+        rows = coef[(coef['indikator'] == name) & (coef['level'] == PROVINSI)]
+        if rows.empty or rows.iloc[0]['model'] != 'linear':
+            return None
+        row = rows.iloc[0]
+        series[name] = {'model': 'linear', **{key: float(row[key]) for key in LINEAR_PARAMS}}
+
+    regions = {}
+    for name, (dataset, column) in REGIONAL_SERIES.items():
+        rows = coef[(coef['indikator'] == name) & (coef['level'] == KABUPATEN_KOTA)]
+        expected = set(aggregates.region_sums(dataset, provinsi, column)[0])
+        if (rows['model'] != 'linear').any() or not expected <= set(rows['wilayah'].astype(str)):
+            return None
+        regions[name] = {str(row['wilayah']): {'model': 'linear', **{key: float(row[key]) for key in LINEAR_PARAMS}}
+                         for row in rows.to_dict('records')}
+    return {'series': series, 'regions': regions}
+
+
+def _read_store():
+    try:
+        with open(STORE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_store(store):
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp_path = f'{STORE_PATH}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # One-shot dumps without indent is what runs json's C encoder (json.dump streams in Python)
+            f.write(json.dumps(store))
+        os.replace(tmp_path, STORE_PATH)
+    except OSError:
+        # Read-only deployment: keep the in-memory copy only
+        pass
+
+
+def get_store(provinsi=DEFAULT_PROVINCE):
+    """Parameters of one province for its current rows, fitting only when they changed."""
+    global _store
+    version = province_version(provinsi, DATASETS)
+    entry = _store['provinces'].get(provinsi) if _store is not None else None
+    if entry is not None and entry['version'] == version:
+        return entry
+
+    with _lock:
+        if _store is None:
+            _store = {'format': STORE_FORMAT, 'provinces': {}}
+        entry = _store['provinces'].get(provinsi)
+        if entry is None or entry['version'] != version:
+            # Another process may have fitted it already
+            store = _read_store()
+            if store is not None and store.get('format') == STORE_FORMAT:
+                _store['provinces'].update(store['provinces'])
+                entry = _store['provinces'].get(provinsi)
+        if entry is None or entry['version'] != version:
+            params = _store_from_batch(data_version(), provinsi) or _fit_all(provinsi)
+            entry = {'version': version, **params}
+            _store['provinces'][provinsi] = entry
+            _write_store(_store)
+        return entry
+
+
+def _forecast(entries, years):
+    """Forecasts and 95% lower/upper bounds (each len(entries) x len(years)) for stored entries."""
+    values, lower, upper = (np.full((len(entries), len(years)), np.nan) for _ in range(3))
+    by_model = {}
+    for i, entry in enumerate(entries):
+        by_model.setdefault(entry['model'], []).append(i)
+    for model_name, rows in by_model.items():
+        params = {key: np.array([entries[i][key] for i in rows])
+                  for key in entries[rows[0]] if key != 'model'}
+        model = get_model(model_name)
+        values[rows] = model.forecast(params, years)
+        lower[rows], upper[rows] = model.interval(params, years)
+    return values, lower, upper
+
+
+def predict(series, years, provinsi=DEFAULT_PROVINCE):
+    """Forecast of ``series`` for each year in ``years`` (NaN if the province has no data)."""
+    return predict_interval(series, years, provinsi)[0]
+
+
+def predict_interval(series, years, provinsi=DEFAULT_PROVINCE):
+    """``(forecast, lower, upper)`` of ``series`` for each year, with 95% prediction bounds."""
+    entry = get_store(provinsi)['series'].get(series)
+    if entry is None:
+        return tuple(np.full(len(years), np.nan) for _ in range(3))
+    return tuple(values[0] for values in _forecast([entry], np.asarray(years, dtype=float)))
+
+
+def predict_regions(series, regions, years, provinsi=DEFAULT_PROVINCE):
+    """Long-format forecasts of a per-region ``series`` for each region and year.
+
+    ``<series>_bawah`` and ``<series>_atas`` hold the 95% prediction
+    bounds. Regions without fitted parameters are left out.
+    """
+    coef = get_store(provinsi)['regions'][series]
+    regions = [region for region in regions if region in coef]
+    years = np.asarray(years)
+    values, lower, upper = _forecast([coef[region] for region in regions], years.astype(float))
+    return pd.DataFrame({
+        'bps_nama_kabupaten_kota': np.repeat(regions, len(years)),
+        'tahun': np.tile(years, len(regions)),
+        series: values.ravel(),
+        f'{series}_bawah': lower.ravel(),
+        f'{series}_atas': upper.ravel(),
+    })
@@ -0,0 +1,265 @@
+"""Pure-NumPy forecasting models and a vectorized rolling-origin backtest.
+
+Every model works on a dense ``regions x years`` matrix (NaN where a
+region has no value for a year), so one call fits, forecasts or
+backtests all regions together. Models are looked up by name with
+``get_model``:
+
+* ``linear``      ordinary least-squares trend on tahun
+* ``log_linear``  least-squares trend on log(y), i.e. constant growth
+                  rate (meant for Rupiah series such as garis kemiskinan)
+* ``damped``      Holt's linear method with a damped trend
+
+``interval`` gives 95% prediction bounds: closed-form OLS intervals for
+the trend models, computed for all regions in one pass.
+
+Run ``python forecasting.py`` to backtest every model on every
+indicator and region.
+"""
+import numpy as np
+import pandas as pd
+
+from trend import line_spread, prediction_interval, solve_lines
+
+
+def series_matrix(df, region_col, year_col, value_col):
+    """Pivot long rows into ``(regions, years, Y)`` with Y[region, year] (NaN if missing).
+
+    Several rows in one cell (``persentase_daerah`` has Maret and
+    September) are averaged.
+    """
+    keys = df[region_col]
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.cat.remove_unused_categories()
+        codes = keys.cat.codes.to_numpy()
+        regions = keys.cat.categories
+    else:
+        codes, regions = pd.factorize(keys, sort=True)
+    year_codes, years = pd.factorize(df[year_col], sort=True)
+
+    values = df[value_col].to_numpy(dtype=float)
+    valid = (codes >= 0) & ~np.isnan(values)
+    cells = codes[valid].astype(np.int64) * len(years) + year_codes[valid]
+    size = len(regions) * len(years)
+    total = np.bincount(cells, weights=values[valid], minlength=size)
+    count = np.bincount(cells, minlength=size)
+    with np.errstate(invalid='ignore'):
+        Y = np.where(count > 0, total / count, np.nan).reshape(len(regions), len(years))
+    return list(regions), np.asarray(years, dtype=float), Y
+
+
+def _cumulative_line_sums(years, Y):
+    """Least-squares sums over columns [0, t) for every origin t (shape G x T+1)."""
+    x0 = years.mean()
+    xc = np.broadcast_to(years - x0, Y.shape)
+    mask = ~np.isnan(Y)
+    y = np.where(mask, Y, 0.0)
+    x = np.where(mask, xc, 0.0)
+    sums = [mask.astype(float), x, y, x * x, x * y]
+    pad = np.zeros((Y.shape[0], 1))
+    return [np.concatenate([pad, np.cumsum(s, axis=1)], axis=1) for s in sums], x0
+
+
+class LinearTrend:
+    name = 'linear'
+
+    def _transform(self, Y):
+        return Y
+
+    def _inverse(self, values):
+        return values
+
+    def fit(self, years, Y):
+        """Per-region ``slope`` and ``intercept`` arrays, plus the residual
+        spread (``sigma``, ``n``, ``x_mean``, ``sxx``) the intervals need."""
+        Y = self._transform(np.atleast_2d(np.asarray(Y, dtype=float)))
+        years = np.asarray(years, dtype=float)
+        sums, x0 = _cumulative_line_sums(years, Y)
+        totals = [s[:, -1] for s in sums]
+        return self.fit_sums(*totals, np.nansum(Y * Y, axis=1), x0=x0)
+
+    def fit_sums(self, n, sx, sy, sxx, sxy, syy, x0=0.0):
+        """Same parameters as ``fit``, from least-squares sums over ``x - x0``
+        already taken on the fitted scale (e.g. the running sums in ``aggregates``)."""
+        slope, intercept = solve_lines(n, sx, sy, sxx, sxy, x0=x0)
+        sigma, x_mean, sxx_c = line_spread(n, sx, sy, sxx, sxy, syy, slope, x0=x0)
+        return {'slope': slope, 'intercept': intercept, 'sigma': sigma, 'n': np.asarray(n, dtype=float),
+                'x_mean': x_mean, 'sxx': sxx_c}
+
+    def forecast(self, params, future_years):
+        future_years = np.asarray(future_years, dtype=float)
+        values = (np.asarray(params['intercept'], dtype=float)[:, None]
+                  + np.asarray(params['slope'], dtype=float)[:, None] * future_years[None, :])
+        return self._inverse(values)
+
+    def interval(self, params, future_years):
+        """``(lower, upper)`` 95% prediction bounds, shaped like ``forecast``."""
+        future_years = np.asarray(future_years, dtype=float)
+        center = (np.asarray(params['intercept'], dtype=float)[:, None]
+                  + np.asarray(params['slope'], dtype=float)[:, None] * future_years[None, :])
+        half = prediction_interval(future_years, params['n'], params['sigma'], params['x_mean'], params['sxx'])
+        # Bounds are taken on the fitted scale, so log-linear bands are asymmetric
+        return self._inverse(center - half), self._inverse(center + half)
+
+    def rolling(self, years, Y, horizon):
+        """F[g, t, h]: forecast of Y[g, t + h] from data before column t."""
+        Y = self._transform(np.atleast_2d(np.asarray(Y, dtype=float)))
+        years = np.asarray(years, dtype=float)
+        sums, x0 = _cumulative_line_sums(years, Y)
+        # Coefficients for every origin t in one shot: shape G x T
+        slope, intercept = solve_lines(*(s[:, :-1] for s in sums), x0=x0)
+
+        T = len(years)
+        F = np.full(Y.shape + (horizon,), np.nan)
+        for h in range(horizon):
+            target = years[h:]
+            F[:, :T - h, h] = intercept[:, :T - h] + slope[:, :T - h] * target[None, :]
+        return self._inverse(F)
+
+
+class LogLinearTrend(LinearTrend):
+    name = 'log_linear'
+
+    def _transform(self, Y):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(Y > 0, np.log(Y), np.nan)
+
+    def _inverse(self, values):
+        return np.exp(values)
+
+
+class DampedTrend:
+    """Holt's method with damped trend, run over all regions at once."""
+    name = 'damped'
+
+    def __init__(self, alpha=0.8, beta=0.2, phi=0.9):
+        self.alpha = alpha
+        self.beta = beta
+        self.phi = phi
+
+    def _steps(self, horizon):
+        # phi + phi^2 + ... + phi^h for h = 1..horizon
+        return np.cumsum(self.phi ** np.arange(1, horizon + 1))
+
+    def fit(self, years, Y):
+        Y = np.atleast_2d(np.asarray(Y, dtype=float))
+        level = np.full(Y.shape[0], np.nan)
+        trend = np.full(Y.shape[0], np.nan)
+        for t in range(Y.shape[1]):
+            level, trend = self._update(level, trend, Y[:, t])
+        return {'level': level, 'trend': np.nan_to_num(trend),
+                'tahun_akhir': np.full(Y.shape[0], float(np.max(years)))}
+
+    def forecast(self, params, future_years):
+        future_years = np.asarray(future_years, dtype=float)
+        h = future_years[None, :] - np.asarray(params['tahun_akhir'], dtype=float)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            phi = self.phi
+            cum = phi * (1 - phi ** h) / (1 - phi) if phi != 1 else h
+        return np.asarray(params['level'], dtype=float)[:, None] + cum * np.asarray(params['trend'], dtype=float)[:, None]
+
+    def interval(self, params, future_years):
+        # No closed form for the smoothing state: no bounds
+        shape = (len(np.asarray(params['level'])), len(np.asarray(future_years)))
+        return np.full(shape, np.nan), np.full(shape, np.nan)
+
+    def rolling(self, years, Y, horizon):
+        Y = np.atleast_2d(np.asarray(Y, dtype=float))
+        G, T = Y.shape
+        steps = self._steps(horizon)
+        level = np.full(G, np.nan)
+        trend = np.full(G, np.nan)
+        F = np.full((G, T, horizon), np.nan)
+        for t in range(T):
+            # State holds data before column t: its h-step forecast targets t + h
+            ahead = level[:, None] + steps[None, :] * np.nan_to_num(trend)[:, None]
+            F[:, t, :] = np.where(np.isnan(trend)[:, None], np.nan, ahead)
+            level, trend = self._update(level, trend, Y[:, t])
+        return F
+
+    def _update(self, level, trend, y):
+        seen = ~np.isnan(y)
+        first = seen & np.isnan(level)
+        second = seen & ~first & np.isnan(trend)
+        update = seen & ~first & ~second
+
+        damped = self.phi * np.nan_to_num(trend)
+        new_level = np.where(update, self.alpha * y + (1 - self.alpha) * (level + damped), level)
+        new_trend = np.where(update, self.beta * (new_level - level) + (1 - self.beta) * damped, trend)
+        new_trend = np.where(second, y - level, new_trend)
+        new_level = np.where(first | second, y, new_level)
+        return new_level, new_trend
+
+
+MODELS = {model.name: model for model in (LinearTrend(), LogLinearTrend(), DampedTrend())}
+
+
+def get_model(name):
+    return MODELS[name]
+
+
+def backtest(years, Y, models=None, horizon=1, min_train=3):
+    """Rolling-origin backtest of every model on every region.
+
+    Each origin t >= ``min_train`` forecasts the next ``horizon`` observed
+    values from the data before t. Returns a frame with one row per
+    (model, region index) and columns ``mae``, ``mape`` and ``n``.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    years = np.asarray(years, dtype=float)
+    G, T = Y.shape
+    # Actual values aligned with F[g, t, h] -> Y[g, t + h]
+    actual = np.full((G, T, horizon), np.nan)
+    for h in range(horizon):
+        actual[:, :T - h, h] = Y[:, h:]
+    # Only score origins with at least min_train observations before them
+    observed_before = np.concatenate([np.zeros((G, 1)), np.cumsum(~np.isnan(Y), axis=1)[:, :-1]], axis=1)
+    usable = (observed_before >= min_train)[:, :, None]
+
+    frames = []
+    for name in models or MODELS:
+        F = get_model(name).rolling(years, Y, horizon)
+        err = np.where(usable, F - actual, np.nan).reshape(G, -1)
+        scored = ~np.isnan(err)
+        n = scored.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.abs(err / actual.reshape(G, -1)) * 100
+            frames.append(pd.DataFrame({
+                'model': name,
+                'region': np.arange(G),
+                'mae': np.where(n > 0, np.nansum(np.abs(err), axis=1) / n, np.nan),
+                'mape': np.where(n > 0, np.nansum(pct, axis=1) / n, np.nan),
+                'n': n,
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def best_models(scores, metric='mae'):
+    """Name of the lowest-error model for each region in a ``backtest`` result."""
+    ranked = scores.dropna(subset=[metric]).sort_values(['region', metric], kind='stable')
+    return ranked.drop_duplicates('region').set_index('region')['model']
+
+
+def main():
+    import argparse
+
+    from data_loader import load_dataset
+    from forecast_cli import INDICATORS
+
+    parser = argparse.ArgumentParser(description='Backtest every forecasting model on every indicator.')
+    parser.add_argument('--horizon', type=int, default=1)
+    parser.add_argument('--min-train', type=int, default=3)
+    args = parser.parse_args()
+
+    for indikator, (dataset, column, region_col, _) in INDICATORS.items():
+        data = load_dataset(dataset, columns=['tahun', region_col, column])
+        regions, years, Y = series_matrix(data, region_col, 'tahun', column)
+        scores = backtest(years, Y, horizon=args.horizon, min_train=args.min_train)
+        summary = scores.groupby('model')[['mae', 'mape']].mean()
+        wins = best_models(scores).value_counts()
+        print(f'\n{indikator} ({len(regions)} wilayah)')
+        print(summary.assign(terbaik=wins.reindex(summary.index).fillna(0).astype(int)).round(3).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Check the import-time budget of the app shell and each page module.
+
+Usage::
+
+    python import_budget.py [--repeat 3]
+
+Each module is imported in a fresh interpreter with ``-X importtime``
+after ``streamlit`` (which the server has already loaded), and the best
+cumulative time over ``--repeat`` runs is compared with ``BUDGET_MS``.
+The exit status is 1 if any module is over budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import time allowed per module, in milliseconds
+BUDGET_MS = {
+    'views': 50,
+    'instrumentation': 50,
+    'prefetch': 50,
+    'views.penduduk': 900,
+    'views.indeks': 900,
+    'views.garis_kemiskinan': 900,
+}
+
+
+def measure(module):
+    """Cumulative import time of ``module`` in ms, with streamlit preloaded."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import streamlit; import {module}'],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f'{module} was not imported')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check import times against the budget.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    over = []
+    for module, budget in BUDGET_MS.items():
+        elapsed = min(measure(module) for _ in range(args.repeat))
+        status = 'OK' if elapsed <= budget else 'OVER'
+        print(f'{module:<28} {elapsed:8.1f} ms  (budget {budget} ms)  {status}')
+        if elapsed > budget:
+            over.append(module)
+    sys.exit(1 if over else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Append a newly published BPS year to a dataset without reprocessing history.
+
+Usage::
+
+    python ingest.py garis_kemiskinan garis_kemiskinan_2024.csv
+
+The new file must have the same columns as the dataset's CSV and may
+only contain years that are not loaded yet. It goes through the same
+validation as the snapshots (``validation.py``), checked against the
+years in the partition manifest and the kabupaten/kota table kept in the
+``penduduk`` snapshot, so none of the loaded rows are read. The cleaned
+rows are appended to the source CSV, as a segment to its snapshot and to
+the partitions of the provinces they belong to
+(``snapshot.append_snapshot``, ``provinces.append_partitions``), and
+added to the running sums (``aggregates.append_rows``), all in O(new
+rows). Views, panels and forecasts are keyed per province
+(``provinces.province_version``), so only the provinces that received
+rows are rebuilt, and their yearly series, rankings and trend
+coefficients come from the updated sums.
+"""
+import argparse
+import os
+
+import pandas as pd
+
+import aggregates
+import provinces
+import snapshot
+import validation
+from data_loader import DATASETS, dataset_path
+
+
+def _csv_columns(name):
+    spec = DATASETS[name]
+    return pd.read_csv(dataset_path(name), sep=spec['sep'], encoding=spec['encoding'], nrows=0).columns
+
+
+def _append_rows(name, new):
+    path = dataset_path(name)
+    # Some BPS exports end without a trailing newline
+    needs_newline = False
+    if os.path.getsize(path) > 0:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        new.to_csv(f, sep=DATASETS[name]['sep'], header=False, index=False, lineterminator='\n')
+
+
+def _known_spellings(name, new, report):
+    """``new`` with every known kabupaten/kota code spelled as in the snapshot, as a full validation would."""
+    code, region = validation.REGION_CODE, validation.REGION_NAME
+    if code not in new:
+        return new
+    known = pd.Series({int(key): spelling for key, (spelling, _) in snapshot.region_table(name).items()},
+                      dtype=object)
+    spelled = new[code].astype('int64').map(known).fillna(new[region].astype(str))
+    renamed = spelled != new[region].astype(str)
+    report['renamed_regions'].update(zip(new.loc[renamed, region].astype(str), spelled[renamed]))
+    return new.assign(**{region: spelled.astype('category')})
+
+
+def ingest_year(name, path):
+    """Append the rows in ``path`` to dataset ``name``, its snapshot, partitions and running sums.
+
+    Returns the list of years added and the validation report. Raises
+    ValueError when the file's columns do not match the dataset, it repeats
+    a key with different values, names an unknown region or contains a year
+    that is already loaded.
+    """
+    columns = _csv_columns(name)
+    new, report = validation.validate(name, path, outliers=False)
+    if list(new.columns) != list(columns):
+        raise ValueError(f'Columns of {path} do not match {name}: {list(new.columns)}')
+    # Conflicting rows or unknown regions would corrupt the history; dropped invalid rows are only reported
+    if report['duplicates_conflicting'] or report.get('unknown_regions'):
+        raise ValueError(f'{path} did not validate:\n{validation.summary(report)}')
+
+    # Bring the partitions and sums up to date with the current file first
+    previous = snapshot.source_signature(name)
+    years = sorted(int(tahun) for tahun in new['tahun'].unique())
+    loaded = sorted(set(years) & provinces.loaded_years(name))
+    if loaded:
+        raise ValueError(f'Tahun {loaded} already loaded for {name}')
+    aggregates.get_state(name)
+
+    new = _known_spellings(name, new, report)
+    _append_rows(name, new)
+    snapshot.append_snapshot(name, new, report, previous)
+    provinces.append_partitions(name, new, previous)
+    aggregates.append_rows(name, new, previous)
+    return years, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Append a new BPS year to a dataset.')
+    parser.add_argument('dataset', choices=sorted(DATASETS))
+    parser.add_argument('path', help='CSV with the new year, in the same layout as the dataset')
+    args = parser.parse_args()
+
+    years, report = ingest_year(args.dataset, args.path)
+    print(validation.summary(report))
+    print(f'{args.dataset}: added tahun {", ".join(map(str, years))}')
+
+
+if __name__ == '__main__':
+    main()
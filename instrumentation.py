@@ -0,0 +1,176 @@
+"""Per-page, per-stage timing of dashboard reruns.
+
+``app.py`` wraps every rerun in ``page_run(page)``; inside it, code marks
+stages with ``stage(name)``:
+
+* ``total``      the whole rerun of the page
+* ``data``       reading materialized views (rebuilding them when stale)
+* ``figure``     building a Plotly figure on a figure-cache miss
+* ``serialize``  Plotly figure -> JSON for the cache
+* ``chart``      ``st.plotly_chart`` (validation and protobuf)
+
+Durations are kept in a bounded window per (page, stage), shared by all
+sessions, and summarized as count, p50, p95 and max. ``BUDGET_MS`` sets
+the p95 budget of each page's ``total``; ``check`` enforces it on an
+exported file::
+
+    python instrumentation.py metrics.json
+
+The admin panel (sidebar, shown with ``?admin=1`` or
+``KEMISKINAN_ADMIN=1``) shows the table and exports it as JSON or
+Prometheus text; under ``deploy.py`` each worker's export is labelled
+with its ``KEMISKINAN_WORKER`` index. Only the standard library is imported here so the app
+shell stays light.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+WINDOW = 1000
+# Index of this worker under deploy.py, None when run on its own
+WORKER = os.environ.get('KEMISKINAN_WORKER')
+
+# p95 budget of a page's whole rerun, in milliseconds
+BUDGET_MS = {
+    "Jumlah Penduduk Miskin": 1500,
+    "Indeks Kedalaman dan Keparahan Kemiskinan": 1500,
+    "Garis Kemiskinan per Kabupaten/Kota pada Tahun Terpilih": 1500,
+}
+
+_page = contextvars.ContextVar('kemiskinan_page', default=None)
+# (page, stage) -> recent durations in seconds
+_timings = {}
+_lock = threading.Lock()
+
+
+def record(page, name, seconds):
+    with _lock:
+        _timings.setdefault((page, name), deque(maxlen=WINDOW)).append(seconds)
+
+
+@contextlib.contextmanager
+def page_run(page):
+    """Time one rerun of ``page``; stages inside are attributed to it."""
+    token = _page.set(page)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(page, 'total', time.perf_counter() - start)
+        _page.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time a stage of the current page run (not recorded outside one)."""
+    page = _page.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if page is not None:
+            record(page, name, time.perf_counter() - start)
+
+
+def _quantile(ordered, q):
+    # Nearest-rank quantile of a sorted list
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def summary():
+    """One row per (page, stage): count, p50/p95/max in ms and the page budget."""
+    with _lock:
+        items = [(key, sorted(values)) for key, values in _timings.items()]
+    rows = []
+    for (page, name), ordered in sorted(items):
+        budget = BUDGET_MS.get(page) if name == 'total' else None
+        p95 = _quantile(ordered, 0.95) * 1000
+        rows.append({
+            'page': page,
+            'stage': name,
+            'count': len(ordered),
+            'p50_ms': round(_quantile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(p95, 2),
+            'max_ms': round(ordered[-1] * 1000, 2),
+            'sum_ms': round(sum(ordered) * 1000, 2),
+            'budget_ms': budget,
+            'over_budget': budget is not None and p95 > budget,
+        })
+    return rows
+
+
+def to_json():
+    return json.dumps({'generated': time.time(), 'worker': WORKER, 'stages': summary()}, indent=1)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def to_prometheus():
+    """Summary metric in the Prometheus text exposition format."""
+    lines = ['# HELP kemiskinan_stage_seconds Time spent per dashboard page stage.',
+             '# TYPE kemiskinan_stage_seconds summary']
+    for row in summary():
+        labels = f'page="{_label(row["page"])}",stage="{_label(row["stage"])}"'
+        if WORKER is not None:
+            labels += f',worker="{_label(WORKER)}"'
+        lines.append(f'kemiskinan_stage_seconds{{{labels},quantile="0.5"}} {row["p50_ms"] / 1000:.6f}')
+        lines.append(f'kemiskinan_stage_seconds{{{labels},quantile="0.95"}} {row["p95_ms"] / 1000:.6f}')
+        lines.append(f'kemiskinan_stage_seconds_sum{{{labels}}} {row["sum_ms"] / 1000:.6f}')
+        lines.append(f'kemiskinan_stage_seconds_count{{{labels}}} {row["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path):
+    """Write the summary to ``path``: Prometheus text for ``.prom``/``.txt``, JSON otherwise."""
+    text = to_prometheus() if path.endswith(('.prom', '.txt')) else to_json()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+
+
+def admin_enabled():
+    import streamlit as st
+
+    return os.environ.get('KEMISKINAN_ADMIN') == '1' or st.query_params.get('admin') == '1'
+
+
+def render_panel():
+    """Admin sidebar panel with the timing table and export buttons."""
+    import streamlit as st
+
+    with st.sidebar.expander("Performa (admin)"):
+        rows = summary()
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.write("Belum ada data.")
+        st.download_button("Unduh JSON", to_json(), file_name='metrics.json', mime='application/json')
+        st.download_button("Unduh Prometheus", to_prometheus(), file_name='metrics.prom', mime='text/plain')
+        if st.button("Reset"):
+            reset()
+
+
+def check(path):
+    """Pages whose p95 in an exported JSON file is over budget."""
+    with open(path, encoding='utf-8') as f:
+        rows = json.load(f)['stages']
+    return [row for row in rows if row['stage'] == 'total' and row['budget_ms'] is not None
+            and row['p95_ms'] > row['budget_ms']]
+
+
+if __name__ == '__main__':
+    over = check(sys.argv[1])
+    for row in over:
+        print(f'{row["page"]}: p95 {row["p95_ms"]} ms > budget {row["budget_ms"]} ms')
+    sys.exit(1 if over else 0)
@@ -0,0 +1,231 @@
+"""Materialized views: every aggregate the dashboard charts draw, per province.
+
+A province's views are built together from its partitions (see
+``provinces.py``), the running sums in ``aggregates.py`` (yearly means
+and totals, region rankings) and the forecast store whenever that
+province's rows change (``province_version``), then written as
+uncompressed Arrow files under ``.snapshots/views/<provinsi>/`` and kept
+in memory. Pages only read views, so render cost does not grow with the
+raw rows or with the number of provinces.
+
+Views whose rows are ordered by ``rank`` (top-N charts) are sliced with
+``top_n``; ``*_per_tahun`` views are sorted by tahun and sliced with
+``for_year``. Build them ahead of time with::
+
+    python materialize.py
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+import aggregates
+import forecast_store
+from data_loader import GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH
+from instrumentation import stage
+from provinces import DEFAULT_PROVINCE, REGION, list_provinces, load_province, province_version, regions, slug
+from snapshot import SNAPSHOT_DIR, to_frame
+
+VIEW_DIR = os.path.join(SNAPSHOT_DIR, 'views')
+_META_KEY = b'kemiskinan_version'
+# Bumped whenever view columns change so stored views are rebuilt
+VIEW_FORMAT = 5
+
+# Forecast years drawn on the pages
+TAHUN_PREDIKSI_PENDUDUK = [2022, 2023, 2024, 2025, 2026]
+TAHUN_PREDIKSI_INDEKS = [2024, 2025, 2026, 2027, 2028]
+TAHUN_PREDIKSI_GARIS = [2024, 2025, 2026, 2027, 2028]
+
+# provinsi -> (province version, {view name: frame})
+_views = {}
+_lock = threading.Lock()
+
+
+def _yearly(name, provinsi, measures, dtypes):
+    """One row per tahun with each ``measures`` column (column -> 'sum' or 'mean'), typed as in ``dtypes``."""
+    frame = pd.DataFrame({column: aggregates.yearly(name, provinsi, column, how) for column, how in measures.items()})
+    frame = frame.rename_axis('tahun').reset_index()
+    return frame.astype(dtypes[['tahun', *measures]].to_dict())
+
+
+def _ranked_rows(frame, name, provinsi, measure, how):
+    """Region rows ordered by rank of ``measure`` (0 = highest) then tahun, with a ``rank`` column."""
+    ranked = aggregates.ranking(name, provinsi, measure, how).index
+    # Regions without any value rank last
+    unranked = pd.Index(frame[REGION].astype(str).unique()).difference(ranked)
+    rank = pd.Series(np.arange(len(ranked) + len(unranked)), index=ranked.append(unranked))
+    rows = frame.assign(rank=frame[REGION].astype(str).map(rank))
+    rows = rows.dropna(subset=['rank']).astype({'rank': 'int32'})
+    return rows.sort_values(['rank', 'tahun'], kind='stable').reset_index(drop=True)
+
+
+def _prediction_frame(years, provinsi, columns):
+    """Forecasts per tahun with ``<column>_bawah``/``<column>_atas`` 95% bounds; ``columns`` maps column -> series."""
+    frame = {'tahun': years}
+    for column, series in columns.items():
+        frame[column], frame[f'{column}_bawah'], frame[f'{column}_atas'] = \
+            forecast_store.predict_interval(series, years, provinsi)
+    return pd.DataFrame(frame)
+
+
+def _build_penduduk(provinsi):
+    penduduk_columns = ['tahun', REGION, 'bps_jumlah_penduduk', 'persentase_jumlah_penduduk_miskin']
+    data = load_province(PENDUDUK, provinsi, columns=penduduk_columns)
+    tahunan = _yearly(PENDUDUK, provinsi, {
+        'bps_jumlah_penduduk': 'sum',
+        'persentase_jumlah_penduduk_miskin': 'mean'
+    }, data.dtypes)
+    prediksi = _prediction_frame(TAHUN_PREDIKSI_PENDUDUK, provinsi, {
+        'bps_jumlah_penduduk': 'jumlah_penduduk',
+        'persentase_jumlah_penduduk_miskin': 'persentase_penduduk_miskin',
+    })
+    return {
+        'penduduk_tahunan': tahunan,
+        'penduduk_prediksi': prediksi,
+        'penduduk_per_wilayah': _ranked_rows(data, PENDUDUK, provinsi, 'bps_jumlah_penduduk', 'sum'),
+    }
+
+
+def _build_persentase_daerah(provinsi):
+    data3 = load_province(PERSENTASE_DAERAH, provinsi, columns=['tahun', 'daerah', 'persentase_penduduk_miskin'])
+    filtered_data3 = data3[(data3['tahun'] >= 2001) & (data3['tahun'] <= 2022)]
+    rata2 = filtered_data3.groupby('daerah', as_index=False, observed=True).agg({'persentase_penduduk_miskin': 'mean'})
+    return {'persentase_daerah_rata2': rata2}
+
+
+def _build_indeks(provinsi):
+    data = load_province(INDEKS, provinsi)
+    tahunan = _yearly(INDEKS, provinsi, {
+        'indeks_kedalaman': 'mean',
+        'indeks_keparahan_kemiskinan': 'mean'
+    }, data.dtypes)
+    # Percentage change from the previous year (0 for the first year)
+    tahunan['perc_change_kedalaman'] = tahunan['indeks_kedalaman'].pct_change() * 100
+    tahunan['perc_change_keparahan'] = tahunan['indeks_keparahan_kemiskinan'].pct_change() * 100
+    tahunan = tahunan.fillna(0)
+
+    prediksi = _prediction_frame(TAHUN_PREDIKSI_INDEKS, provinsi, {
+        'indeks_kedalaman': 'indeks_kedalaman',
+        'indeks_keparahan_kemiskinan': 'indeks_keparahan',
+    })
+    return {
+        'indeks_tahunan': tahunan,
+        'indeks_prediksi': prediksi,
+        'indeks_per_wilayah': _ranked_rows(data, INDEKS, provinsi, 'indeks_keparahan_kemiskinan', 'mean'),
+    }
+
+
+def _build_garis(provinsi):
+    data4 = load_province(GARIS_KEMISKINAN, provinsi, columns=['tahun', 'garis_kemiskinan', REGION])
+    per_tahun = data4.sort_values('tahun', kind='stable').reset_index(drop=True)
+    return {
+        'garis_per_tahun': per_tahun,
+        # Year choices in the order the selector shows them (latest first)
+        'garis_tahun': pd.DataFrame({'tahun': np.sort(data4['tahun'].unique())[::-1]}),
+        'garis_prediksi': forecast_store.predict_regions('garis_kemiskinan', regions(provinsi),
+                                                         TAHUN_PREDIKSI_GARIS, provinsi),
+    }
+
+
+BUILDERS = [_build_penduduk, _build_persentase_daerah, _build_indeks, _build_garis]
+VIEW_NAMES = [
+    'penduduk_tahunan', 'penduduk_prediksi', 'penduduk_per_wilayah', 'persentase_daerah_rata2',
+    'indeks_tahunan', 'indeks_prediksi', 'indeks_per_wilayah',
+    'garis_per_tahun', 'garis_tahun', 'garis_prediksi',
+]
+
+
+def build_views(provinsi=DEFAULT_PROVINCE):
+    views = {}
+    for builder in BUILDERS:
+        views.update(builder(provinsi))
+    return views
+
+
+def _view_dir(provinsi):
+    return os.path.join(VIEW_DIR, slug(provinsi))
+
+
+def _write_views(provinsi, views, version):
+    try:
+        os.makedirs(_view_dir(provinsi), exist_ok=True)
+        for name, frame in views.items():
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[_META_KEY] = json.dumps({'format': VIEW_FORMAT, 'version': version}).encode()
+            path = os.path.join(_view_dir(provinsi), f'{name}.arrow')
+            feather.write_feather(table.replace_schema_metadata(metadata), f'{path}.tmp',
+                                  compression='uncompressed')
+            os.replace(f'{path}.tmp', path)
+    except OSError:
+        # Read-only deployment: keep the in-memory copy only
+        pass
+
+
+def _read_views(provinsi, version):
+    views = {}
+    directory = _view_dir(provinsi)
+    for filename in os.listdir(directory) if os.path.isdir(directory) else []:
+        if not filename.endswith('.arrow'):
+            continue
+        table = feather.read_table(os.path.join(directory, filename), memory_map=True)
+        raw = (table.schema.metadata or {}).get(_META_KEY)
+        if raw is None or json.loads(raw) != {'format': VIEW_FORMAT, 'version': version}:
+            return None
+        views[filename[:-len('.arrow')]] = to_frame(table)
+    return views or None
+
+
+def get_views(provinsi=DEFAULT_PROVINCE):
+    """All views of one province for the current data version, built only when its rows changed."""
+    version = province_version(provinsi)
+    cached = _views.get(provinsi)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        cached = _views.get(provinsi)
+        if cached is None or cached[0] != version:
+            views = _read_views(provinsi, version)
+            if views is None or any(name not in views for name in VIEW_NAMES):
+                views = build_views(provinsi)
+                _write_views(provinsi, views, version)
+            cached = (version, views)
+            _views[provinsi] = cached
+        return cached[1]
+
+
+def view(name, provinsi=DEFAULT_PROVINCE):
+    """One materialized view; shared between sessions, treat as read-only."""
+    with stage('data'):
+        return get_views(provinsi)[name]
+
+
+def top_n(name, n, provinsi=DEFAULT_PROVINCE):
+    """Rows of the ``n`` highest-ranked regions from a rank-ordered view."""
+    rows = view(name, provinsi)
+    if n is None:
+        return rows
+    return rows.iloc[:np.searchsorted(rows['rank'].to_numpy(), n)]
+
+
+def for_year(name, tahun, provinsi=DEFAULT_PROVINCE):
+    """Rows of one tahun from a tahun-sorted view."""
+    rows = view(name, provinsi)
+    years = rows['tahun'].to_numpy()
+    return rows.iloc[np.searchsorted(years, tahun, 'left'):np.searchsorted(years, tahun, 'right')]
+
+
+def region_count(name, provinsi=DEFAULT_PROVINCE):
+    """Number of ranked regions in a rank-ordered view."""
+    rows = view(name, provinsi)
+    return int(rows['rank'].iloc[-1]) + 1 if len(rows) else 0
+
+
+if __name__ == '__main__':
+    for provinsi in list_provinces():
+        for name, frame in get_views(provinsi).items():
+            print(f'{provinsi} / {name}: {len(frame)} baris')
@@ -0,0 +1,211 @@
+"""Aligned region x year x indicator panel of one province.
+
+The region-level datasets share the (kabupaten/kota, tahun) grain. Their
+measures are placed, whenever the province's rows change
+(``provinces.province_version``), into a dense float32 cube (the snapshots' measure type)
+``values[region, year, indicator]`` with NaN where a dataset has no row,
+plus the boolean ``mask`` of present cells. Years form a contiguous
+range, so any cell, row or slice is plain array indexing: no merge or
+groupby happens per request.
+
+Cubes are written as ``.npy`` files under ``.snapshots/panel/`` (with a
+JSON sidecar for the axes and data version) and memory-mapped on load.
+Build them ahead of time with::
+
+    python panel.py
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_loader import GARIS_KEMISKINAN, INDEKS, PENDUDUK
+from provinces import DEFAULT_PROVINCE, REGION, list_provinces, load_province, province_version, slug
+from snapshot import SNAPSHOT_DIR
+
+PANEL_DIR = os.path.join(SNAPSHOT_DIR, 'panel')
+# Bumped whenever the indicators or the layout change
+PANEL_FORMAT = 2
+
+# indicator -> (dataset, column); persentase_daerah is per daerah, not per region
+INDICATORS = {
+    'jumlah_penduduk_miskin': (PENDUDUK, 'bps_jumlah_penduduk'),
+    'persentase_penduduk_miskin': (PENDUDUK, 'persentase_jumlah_penduduk_miskin'),
+    'indeks_kedalaman': (INDEKS, 'indeks_kedalaman'),
+    'indeks_keparahan': (INDEKS, 'indeks_keparahan_kemiskinan'),
+    'garis_kemiskinan': (GARIS_KEMISKINAN, 'garis_kemiskinan'),
+}
+DATASETS = sorted({dataset for dataset, _ in INDICATORS.values()})
+
+# provinsi -> (version, Panel)
+_panels = {}
+_lock = threading.Lock()
+
+
+class Panel:
+    def __init__(self, values, regions, first_year, indicators=tuple(INDICATORS)):
+        self.values = values
+        self.mask = ~np.isnan(values)
+        self.regions = list(regions)
+        self.years = np.arange(first_year, first_year + values.shape[1])
+        self.indicators = list(indicators)
+        self._region_pos = {name: i for i, name in enumerate(self.regions)}
+        self._indicator_pos = {name: i for i, name in enumerate(self.indicators)}
+
+    def _year_pos(self, tahun):
+        i = int(tahun) - int(self.years[0]) if len(self.years) else -1
+        if not 0 <= i < len(self.years):
+            raise KeyError(tahun)
+        return i
+
+    def get(self, region, tahun, indicator):
+        """One cell (NaN when the dataset has no row for it)."""
+        return self.values[self._region_pos[region], self._year_pos(tahun), self._indicator_pos[indicator]]
+
+    def region(self, name):
+        """Year x indicator array of one region."""
+        return self.values[self._region_pos[name]]
+
+    def year(self, tahun):
+        """Region x indicator array of one year."""
+        return self.values[:, self._year_pos(tahun)]
+
+    def indicator(self, name):
+        """Region x year array of one indicator."""
+        return self.values[:, :, self._indicator_pos[name]]
+
+    def frame(self, indicators=None, complete=False):
+        """Wide frame with one row per (region, tahun) and a column per indicator.
+
+        ``complete`` keeps only the rows where every requested indicator is present.
+        """
+        columns = [self._indicator_pos[name] for name in indicators or self.indicators]
+        flat = self.values[:, :, columns].reshape(-1, len(columns))
+        present = self.mask[:, :, columns].reshape(-1, len(columns))
+        keep = present.all(axis=1) if complete else present.any(axis=1)
+        df = pd.DataFrame(flat[keep], columns=[self.indicators[i] for i in columns])
+        df.insert(0, 'tahun', np.tile(self.years, len(self.regions))[keep])
+        df.insert(0, REGION, np.repeat(np.asarray(self.regions, dtype=object), len(self.years))[keep])
+        return df
+
+    def correlation(self, regions=None, years=None):
+        """Pearson correlation of every indicator pair over the cells where both are present.
+
+        ``regions`` and ``years`` restrict the cells (all when None).
+        """
+        values, mask = self.values, self.mask
+        if regions is not None:
+            rows = [self._region_pos[name] for name in regions]
+            values, mask = values[rows], mask[rows]
+        if years is not None:
+            cols = [self._year_pos(tahun) for tahun in years]
+            values, mask = values[:, cols], mask[:, cols]
+        # Sums in float64: the cube's float32 would lose digits
+        x = np.where(mask, values, 0.0).astype(np.float64).reshape(-1, values.shape[2])
+        m = mask.reshape(-1, values.shape[2]).astype(float)
+
+        # Pairwise-complete sums for every pair at once: entry [a, b] sums over cells with both present
+        n = m.T @ m
+        sum_x = x.T @ m
+        sum_xx = (x * x).T @ m
+        sum_xy = x.T @ x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = sum_xy - sum_x * sum_x.T / n
+            var = sum_xx - sum_x ** 2 / n
+            corr = cov / np.sqrt(var * var.T)
+        corr[n < 3] = np.nan
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.indicators, columns=self.indicators)
+
+
+def build_panel(provinsi=DEFAULT_PROVINCE):
+    """Cube, regions and first year of one province, from its partitions."""
+    frames = {}
+    for dataset in DATASETS:
+        columns = ['tahun', REGION] + [column for d, column in INDICATORS.values() if d == dataset]
+        frames[dataset] = load_province(dataset, provinsi, columns=columns)
+
+    regions = sorted(set().union(*(frame[REGION].astype(str).unique() for frame in frames.values())))
+    years = np.concatenate([frame['tahun'].to_numpy() for frame in frames.values()])
+    first_year = int(years.min()) if len(years) else 0
+    n_years = int(years.max()) - first_year + 1 if len(years) else 0
+
+    values = np.full((len(regions), n_years, len(INDICATORS)), np.nan, dtype=np.float32)
+    for k, (dataset, column) in enumerate(INDICATORS.values()):
+        frame = frames[dataset]
+        r = pd.Categorical(frame[REGION].astype(str), categories=regions).codes
+        y = frame['tahun'].to_numpy() - first_year
+        # One row per (region, tahun) after validation; otherwise the later row wins
+        values[r, y, k] = frame[column].to_numpy(dtype=np.float32)
+    return values, regions, first_year
+
+
+def _version(provinsi):
+    return {'format': PANEL_FORMAT, 'data': province_version(provinsi, DATASETS)}
+
+
+def _paths(provinsi):
+    base = os.path.join(PANEL_DIR, slug(provinsi))
+    return f'{base}.npy', f'{base}.json'
+
+
+def _write_panel(provinsi, values, regions, first_year, version):
+    cube_path, meta_path = _paths(provinsi)
+    os.makedirs(PANEL_DIR, exist_ok=True)
+    with open(f'{cube_path}.tmp', 'wb') as f:
+        np.save(f, values)
+    meta = {'version': version, 'regions': regions, 'first_year': first_year, 'indicators': list(INDICATORS)}
+    with open(f'{meta_path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    # The sidecar goes last: it is what marks the cube as current
+    os.replace(f'{cube_path}.tmp', cube_path)
+    os.replace(f'{meta_path}.tmp', meta_path)
+
+
+def _read_panel(provinsi, version):
+    cube_path, meta_path = _paths(provinsi)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != version or meta['indicators'] != list(INDICATORS):
+            return None
+        values = np.load(cube_path, mmap_mode='r')
+    except (OSError, ValueError, KeyError):
+        return None
+    return Panel(values, meta['regions'], meta['first_year'])
+
+
+def get_panel(provinsi=DEFAULT_PROVINCE):
+    """Panel of one province for the current data version, shared between sessions (read-only)."""
+    version = _version(provinsi)
+    cached = _panels.get(provinsi)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        cached = _panels.get(provinsi)
+        if cached is None or cached[0] != version:
+            panel = _read_panel(provinsi, version)
+            if panel is None:
+                values, regions, first_year = build_panel(provinsi)
+                try:
+                    _write_panel(provinsi, values, regions, first_year, version)
+                except OSError:
+                    # Snapshot directory not writable: keep the panel in memory only
+                    pass
+                panel = Panel(values, regions, first_year)
+            cached = (version, panel)
+            _panels[provinsi] = cached
+        return cached[1]
+
+
+def build_all():
+    for provinsi in list_provinces():
+        panel = get_panel(provinsi)
+        print(f'{provinsi}: {len(panel.regions)} wilayah x {len(panel.years)} tahun x '
+              f'{len(panel.indicators)} indikator, {int(panel.mask.sum())} sel terisi')
+
+
+if __name__ == '__main__':
+    build_all()
+    print(get_panel().correlation().round(2).to_string())
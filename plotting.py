@@ -0,0 +1,154 @@
+"""Multi-region line charts built from one long-format frame.
+
+``region_lines`` draws one line per region without a Python loop over
+rows. Up to ``MAX_LEGEND_TRACES`` regions get a trace each (so the legend
+still names them); above that the regions are split into
+``MAX_LEGEND_TRACES`` groups of consecutive regions, one trace (colour
+and legend entry, named by its first and last region) per group, whose
+lines are separated by NaN gaps. Above ``GL_POINTS`` points those traces
+are WebGL (``Scattergl``). In both modes the values are sent as float32
+and the hovertemplate is sent once, not once per trace.
+
+``interval_band`` draws prediction bounds as one filled trace: every
+region's band is a closed polygon (upper bound forward, lower bound back)
+and the polygons are separated by NaN gaps.
+
+Frames above ``downsample.POINT_BUDGET`` rows are downsampled first, so
+the payload stays bounded however many regions and periods are loaded.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import downsample
+
+MAX_LEGEND_TRACES = 10
+GL_POINTS = 2000
+BAND_NAME = 'Interval Prediksi 95%'
+BAND_COLOR = 'rgba(128, 128, 128, 0.25)'
+
+
+def _segmented(values, codes, fill=np.nan):
+    """Values of each group followed by a ``fill`` gap; rows must be grouped by code."""
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    out = np.full((len(values) + n_groups,) + values.shape[1:], fill, dtype=values.dtype)
+    # Row i of group g moves down by g gap slots
+    out[np.arange(len(values)) + codes] = values
+    return out[:-1]
+
+
+def _shared_hover_template(hovertemplate):
+    """The default template with ``hovertemplate`` set for every scatter (and WebGL scatter) trace."""
+    template = go.layout.Template(pio.templates[pio.templates.default])
+    scatter = template.data.scatter[0] if template.data.scatter else go.Scatter()
+    scatter.hovertemplate = hovertemplate
+    template.data.scatter = [scatter]
+    scattergl = template.data.scattergl[0] if template.data.scattergl else go.Scattergl()
+    scattergl.hovertemplate = hovertemplate
+    template.data.scattergl = [scattergl]
+    return template
+
+
+def interval_band(df, x, lower, upper, group=None, name=BAND_NAME, color=BAND_COLOR):
+    """Filled trace between the ``lower`` and ``upper`` columns, one polygon per ``group`` value.
+
+    Rows of each group must be ordered by ``x``; rows with a missing bound are dropped.
+    """
+    df = df[df[lower].notna() & df[upper].notna()]
+    if group is None:
+        codes = np.zeros(len(df), dtype=np.intp)
+    else:
+        codes = pd.factorize(df[group].astype(str), sort=False)[0]
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    xs = df[x].to_numpy(dtype=np.float32)[order]
+
+    # Position of each row when its group is walked backwards
+    first = np.searchsorted(codes, codes, 'left')
+    last = np.searchsorted(codes, codes, 'right') - 1
+    back = first + last - np.arange(len(codes))
+
+    # Upper bound forward then lower bound back; the stable sort keeps that order per group
+    ring_codes = np.concatenate([codes, codes])
+    ring = np.argsort(ring_codes, kind='stable')
+    ring_x = np.concatenate([xs, xs[back]])[ring]
+    ring_y = np.concatenate([df[upper].to_numpy(dtype=np.float32)[order],
+                             df[lower].to_numpy(dtype=np.float32)[order][back]])[ring]
+    ring_codes = ring_codes[ring]
+
+    trace = go.Scattergl if len(ring_x) > GL_POINTS else go.Scatter
+    return trace(
+        x=_segmented(ring_x, ring_codes),
+        y=_segmented(ring_y, ring_codes),
+        mode='lines',
+        fill='toself',
+        fillcolor=color,
+        line=dict(width=0),
+        name=name,
+        hoverinfo='skip',
+    )
+
+
+def region_lines(df, x, y, group, hovertemplate, customdata=None, mode='lines+markers', batched=None, band=None,
+                 max_points=downsample.POINT_BUDGET):
+    """Figure with one line per ``group`` value of ``df``.
+
+    ``hovertemplate`` may use ``{wilayah}`` for the region name and
+    ``%{customdata[i]}`` for the columns listed in ``customdata``.
+    ``batched`` forces (True) or disables (False) the grouped mode (one
+    trace per colour group of regions); by default it is used above
+    ``MAX_LEGEND_TRACES`` regions.
+    ``band`` names the ``(lower, upper)`` columns drawn under the lines.
+    Above ``max_points`` rows every region is downsampled with LTTB (see
+    ``downsample.py``; None draws every point).
+    """
+    df = downsample.reduce(df, x, y, group, max_points)
+    codes, names = pd.factorize(df[group].astype(str), sort=False)
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    if batched is None:
+        batched = len(names) > MAX_LEGEND_TRACES
+
+    xs = df[x].to_numpy(dtype=np.float32)[order]
+    ys = df[y].to_numpy(dtype=np.float32)[order]
+    extra = df[customdata].to_numpy(dtype=np.float32)[order] if customdata else None
+
+    fig = go.Figure()
+    if band is not None:
+        fig.add_trace(interval_band(df, x, *band, group=group))
+    if batched:
+        trace = go.Scattergl if len(xs) > GL_POINTS else go.Scatter
+        labels = np.asarray(names, dtype=object)[codes]
+        # Consecutive regions share a colour group, so the legend stays MAX_LEGEND_TRACES long
+        buckets = codes * MAX_LEGEND_TRACES // len(names)
+        bounds = np.flatnonzero(np.diff(buckets)) + 1
+        for rows in np.split(np.arange(len(codes)), bounds):
+            # Region codes of the group from 0, as _segmented expects
+            local = codes[rows] - codes[rows[0]]
+            first, last = names[codes[rows[0]]], names[codes[rows[-1]]]
+            fig.add_trace(trace(
+                x=_segmented(xs[rows], local),
+                y=_segmented(ys[rows], local),
+                text=_segmented(labels[rows], local, fill=None),
+                customdata=_segmented(extra[rows], local) if extra is not None else None,
+                mode=mode,
+                marker=dict(size=5),
+                line=dict(width=1),
+                name=first if first == last else f'{first} – {last}',
+                legendgroup=f'{first} – {last}',
+            ))
+        fig.update_layout(template=_shared_hover_template(hovertemplate.replace('{wilayah}', '%{text}')))
+        return fig
+
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    for name, rows in zip(names, np.split(np.arange(len(codes)), bounds)):
+        fig.add_trace(go.Scatter(
+            x=xs[rows], y=ys[rows],
+            customdata=extra[rows] if extra is not None else None,
+            mode=mode,
+            name=name,
+        ))
+    # One hovertemplate for every trace, through the layout template
+    fig.update_layout(template=_shared_hover_template(hovertemplate.replace('{wilayah}', '%{fullData.name}')))
+    return fig
@@ -0,0 +1,127 @@
+"""Background warming of the views and figures a user is likely to open next.
+
+After a page has rendered, ``app.py`` calls ``schedule`` with the
+session's province. One job then runs on a small shared thread pool:
+
+1. the province's materialized views (built if the data changed)
+2. the figures the page hinted at with ``hint`` while rendering, e.g. the
+   neighbouring tahun on the garis kemiskinan page
+3. every page module (imported if not yet loaded) and the figures it
+   draws with its default widget values (``prefetch_targets``)
+
+Figures go into ``figure_cache`` through ``warm``, which never evicts an
+entry and stops once the cached specs reach ``MAX_BYTES``. A new
+``schedule`` from the same session cancels the job still pending or
+running for it, so prefetching never queues up behind a user who clicks
+quickly. Set ``KEMISKINAN_PREFETCH=0`` to turn it off.
+"""
+import contextlib
+import contextvars
+import importlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+ENABLED = os.environ.get('KEMISKINAN_PREFETCH', '1') != '0'
+WORKERS = 1
+# Cap on the figure cache's specs that prefetching may fill
+MAX_BYTES = 16 * 2**20
+
+_executor = None
+# session id -> (cancel event, future) of its latest job
+_jobs = {}
+# Re-entrant: Future.cancel() runs the done callback, which takes it again
+_lock = threading.RLock()
+_hints = contextvars.ContextVar('kemiskinan_prefetch_hints', default=None)
+
+
+class Cancelled(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def collect():
+    """Collect the ``hint`` calls made while rendering a page; yields the list."""
+    hints = []
+    token = _hints.set(hints)
+    try:
+        yield hints
+    finally:
+        _hints.reset(token)
+
+
+def hint(page, widgets, build):
+    """Ask for a figure (``figure_cache`` key and builder) to be warmed after this render."""
+    hints = _hints.get()
+    if hints is not None:
+        hints.append((page, widgets, build))
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _run(provinsi, hints, cancelled):
+    import figure_cache
+    import materialize
+    from views import PAGES
+
+    def check():
+        if cancelled.is_set():
+            raise Cancelled
+
+    def warm(targets):
+        for page, widgets, build in targets:
+            check()
+            figure_cache.warm(page, widgets, build, max_bytes=MAX_BYTES)
+
+    # Best effort: a failing builder fails again, visibly, when the page opens it
+    try:
+        materialize.get_views(provinsi)
+        warm(hints)
+        for module_name in PAGES.values():
+            check()
+            module = importlib.import_module(module_name)
+            warm(module.prefetch_targets(provinsi))
+    except Cancelled:
+        pass
+
+
+def schedule(provinsi, hints=(), session=None):
+    """Start warming for ``provinsi`` in the background, cancelling the session's previous job."""
+    global _executor
+    if not ENABLED or provinsi is None:
+        return None
+    session = session if session is not None else _session_id()
+    cancelled = threading.Event()
+    with _lock:
+        _cancel(session)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='prefetch')
+        future = _executor.submit(_run, provinsi, list(hints), cancelled)
+        _jobs[session] = (cancelled, future)
+    future.add_done_callback(lambda done: _forget(session, done))
+    return future
+
+
+def _forget(session, future):
+    with _lock:
+        if session in _jobs and _jobs[session][1] is future:
+            del _jobs[session]
+
+
+def _cancel(session):
+    # Caller holds _lock
+    job = _jobs.pop(session, None)
+    if job is not None:
+        job[0].set()
+        job[1].cancel()
+
+
+def cancel(session=None):
+    """Cancel the pending or running job of ``session``."""
+    with _lock:
+        _cancel(session)
@@ -0,0 +1,264 @@
+"""Province as a dimension: province lists, per-province partitions and regions.
+
+Every dataset is split into one Arrow file per province under
+``.snapshots/provinsi/<provinsi>/<dataset>.arrow``, so loading (and
+forecasting) one province reads only that province's rows. The split is
+redone when the source CSV changes, like the full snapshots, except
+after ``ingest``, which appends a segment with the new rows to the
+provinces it added rows to (see ``snapshot.append_frame``). The
+manifest (``.snapshots/provinsi/<dataset>.json``) records the CSV
+version each province's file was written at and the years loaded;
+``province_version`` keys the views, panels and forecasts derived from a
+province on it.
+
+``penduduk`` and ``persentase_daerah`` carry ``bps_nama_provinsi``;
+``indeks`` and ``garis_kemiskinan`` do not, so their rows get the
+province of their kabupaten/kota in ``penduduk``. Validation drops rows
+of kabupaten/kota ``penduduk`` does not list; rows still without a
+province (``penduduk`` changed since) are left out of every partition
+and counted in the manifest's ``unassigned``. The province of a
+kabupaten/kota comes from the ``penduduk`` snapshot's region table, not
+from its rows.
+"""
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from data_loader import DATASETS, GARIS_KEMISKINAN, load_dataset
+from snapshot import (SNAPSHOT_DIR, append_frame, compact, concat_frames, constants, fill_constants, read_segments,
+                      region_table, snapshot_path, source_signature, to_frame, write_frame)
+
+PROVINCE = 'bps_nama_provinsi'
+REGION = 'bps_nama_kabupaten_kota'
+DEFAULT_PROVINCE = 'Aceh'
+
+PARTITION_DIR = os.path.join(SNAPSHOT_DIR, 'provinsi')
+# Bumped whenever the manifest layout changes so partitions are rebuilt
+PARTITION_FORMAT = 4
+
+# (dataset name, provinsi, columns) -> (source signature, DataFrame)
+_cache = {}
+# dataset name -> manifest of its current partitions
+_manifests = {}
+_lock = threading.Lock()
+
+
+def slug(provinsi):
+    return re.sub(r'[^a-z0-9]+', '_', provinsi.lower()).strip('_')
+
+
+def partition_path(name, provinsi):
+    return os.path.join(PARTITION_DIR, slug(provinsi), f'{name}.arrow')
+
+
+def _manifest_path(name):
+    return os.path.join(PARTITION_DIR, f'{name}.json')
+
+
+def region_provinces():
+    """Province of every kabupaten/kota listed in ``penduduk``."""
+    pairs = pd.DataFrame(list(region_table().values()), columns=[REGION, PROVINCE]).drop_duplicates(REGION)
+    return pd.Series(pairs[PROVINCE].to_numpy(), index=pairs[REGION].to_numpy())
+
+
+def province_of_rows(name, df):
+    """Province name of every row of dataset ``name`` (NaN where ``penduduk`` has no province)."""
+    if PROVINCE in df:
+        return df[PROVINCE].astype(str)
+    provinsi = constants(name).get(PROVINCE)
+    if provinsi is not None:
+        # Left out of the snapshot for holding one value
+        return pd.Series(provinsi, index=df.index, dtype=object)
+    # Mapped per category, not per row
+    return df[REGION].astype('category').map(region_provinces()).astype(object)
+
+
+def _read_manifest(name):
+    try:
+        with open(_manifest_path(name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _partition_frame(part, constant):
+    """One province's rows in the snapshot layout, without the snapshot's ``constant`` columns."""
+    part = compact(part, constant)[0]
+    # Keep only this province's names in the categoricals
+    for column in part.columns:
+        if isinstance(part[column].dtype, pd.CategoricalDtype):
+            part[column] = part[column].cat.remove_unused_categories()
+    return part
+
+
+def _years(df):
+    return sorted({int(tahun) for tahun in pd.unique(df['tahun'])})
+
+
+def _write_manifest(name, manifest):
+    with open(f'{_manifest_path(name)}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(f'{_manifest_path(name)}.tmp', _manifest_path(name))
+
+
+def build_partitions(name):
+    """Write one Arrow file per province for dataset ``name``; returns the manifest."""
+    signature = source_signature(name)
+    df = load_dataset(name)
+    constant = constants(name)
+    provinces = province_of_rows(name, df)
+    written = {}
+    # Rows without a province fall out of the groupby
+    for provinsi, rows in df.groupby(provinces.to_numpy(), sort=True).indices.items():
+        write_frame(partition_path(name, provinsi), _partition_frame(df.take(rows), constant), signature)
+        written[provinsi] = signature
+
+    manifest = {'format': PARTITION_FORMAT, 'version': signature, 'provinces': written, 'years': _years(df),
+                'constants': constant, 'unassigned': int(provinces.isna().sum())}
+    _write_manifest(name, manifest)
+    return manifest
+
+
+def append_partitions(name, rows, previous):
+    """Add clean ``rows``, just appended to the CSV of ``name``, to their provinces' partitions.
+
+    Each of those provinces gets a segment with its new rows (a new
+    province a file of its own) and the CSV's new signature as its
+    version; nothing already written is read. Partitions not written at
+    ``previous`` (the signature before the append) are rebuilt in full
+    instead, and so are all of them when the rows broke a column the
+    snapshot had as constant.
+    """
+    with _lock:
+        manifest = _read_manifest(name)
+        if (manifest is None or manifest.get('format') != PARTITION_FORMAT or manifest['version'] != previous
+                or manifest['constants'] != constants(name)):
+            return _manifest(name)
+        signature = source_signature(name)
+        provinces = province_of_rows(name, rows)
+        for provinsi, positions in rows.groupby(provinces.to_numpy(), sort=True).indices.items():
+            path = partition_path(name, provinsi)
+            part = _partition_frame(rows.take(positions), manifest['constants'])
+            if provinsi not in manifest['provinces']:
+                write_frame(path, part, signature)
+            elif append_frame(path, part, signature, manifest['provinces'][provinsi]) is None:
+                # Columns that no longer fit the file's schema: rewrite this province
+                write_frame(path, concat_frames(to_frame(read_segments(path)), part), signature)
+            manifest['provinces'][provinsi] = signature
+        manifest['version'] = signature
+        manifest['years'] = sorted(set(manifest['years']) | set(_years(rows)))
+        manifest['unassigned'] += int(provinces.isna().sum())
+        _write_manifest(name, manifest)
+        _manifests[name] = manifest
+        return manifest
+
+
+def _manifest(name):
+    """Partition manifest of ``name`` for its current CSV, building the partitions if needed.
+
+    Callers hold ``_lock``.
+    """
+    signature = source_signature(name)
+    manifest = _manifests.get(name)
+    if manifest is None or manifest['version'] != signature:
+        manifest = _read_manifest(name)
+        if manifest is None or manifest.get('format') != PARTITION_FORMAT or manifest['version'] != signature:
+            manifest = build_partitions(name)
+        _manifests[name] = manifest
+    return manifest
+
+
+def province_version(provinsi, names=None):
+    """Version of one province's rows in the given datasets (all when None).
+
+    A dataset's entry is the signature its CSV had when the province's
+    partition was last written (None when it has no rows), so an
+    ``ingest`` that adds rows to other provinces leaves it unchanged.
+    Files derived from a province's partitions are keyed by it.
+    """
+    version = {}
+    for name in sorted(names or DATASETS):
+        manifest = _manifests.get(name)
+        if manifest is None or manifest['version'] != source_signature(name):
+            try:
+                with _lock:
+                    manifest = _manifest(name)
+            except OSError:
+                # Snapshot directory not writable: the whole CSV is the version
+                version[name] = source_signature(name)
+                continue
+        version[name] = manifest['provinces'].get(provinsi)
+    return version
+
+
+def _read_partition(name, provinsi, columns):
+    try:
+        manifest = _manifest(name)
+    except OSError:
+        # Snapshot directory not writable: filter the shared frame instead
+        df = load_dataset(name)
+        rows = df[(province_of_rows(name, df) == provinsi).to_numpy()]
+        return (rows if columns is None else rows[list(columns)]).reset_index(drop=True)
+    constant = manifest['constants']
+    stored = None if columns is None else [column for column in columns if column not in constant]
+    if provinsi not in manifest['provinces']:
+        # No rows: an empty frame with the snapshot's columns, without reading any data
+        with pa.memory_map(snapshot_path(name)) as source:
+            schema = pa.ipc.open_file(source).schema
+        if stored is not None:
+            schema = pa.schema([schema.field(column) for column in stored], metadata=schema.metadata)
+        df = to_frame(schema.empty_table())
+    else:
+        df = to_frame(read_segments(partition_path(name, provinsi), stored))
+    return df if columns is None else fill_constants(name, df, columns, constant)
+
+
+def load_province(name, provinsi, columns=None):
+    """Rows of dataset ``name`` for one province, read from its partition only.
+
+    Shared between sessions like ``load_dataset``; treat as read-only.
+    """
+    version = source_signature(name)
+    key = (name, provinsi, tuple(columns) if columns is not None else None)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, _read_partition(name, provinsi, columns))
+            _cache[key] = cached
+        return cached[1]
+
+
+def loaded_years(name):
+    """Every tahun dataset ``name`` has rows for, from its partition manifest."""
+    with _lock:
+        return set(_manifest(name)['years'])
+
+
+def list_provinces():
+    """Every province with rows in any dataset, sorted by name."""
+    names = set()
+    with _lock:
+        for name in DATASETS:
+            try:
+                names.update(_manifest(name)['provinces'])
+            except OSError:
+                df = load_dataset(name)
+                names.update(province_of_rows(name, df).dropna().unique())
+    return sorted(names)
+
+
+def regions(provinsi, name=GARIS_KEMISKINAN):
+    """Kabupaten/kota of one province in dataset ``name``, in file order."""
+    return [str(region) for region in pd.unique(load_province(name, provinsi, columns=[REGION])[REGION])]
+
+
+if __name__ == '__main__':
+    for name in DATASETS:
+        print(f'{name}: {", ".join(build_partitions(name)["provinces"])}')
@@ -0,0 +1,104 @@
+"""Region and year index over a shared frame.
+
+The frame is sorted once by (kabupaten/kota, tahun) and offset arrays
+record where each region's rows start, so selecting a region is a slice
+instead of a boolean mask over the whole table. A second permutation
+orders the source rows by year for per-tahun slices.
+
+``get_region_index`` keeps one index per shared frame (the materialized
+views, the loaded datasets) for as long as that frame is alive, so every
+page and session selecting from it reuses the same offsets.
+"""
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+REGION = 'bps_nama_kabupaten_kota'
+YEAR = 'tahun'
+
+
+class RegionIndex:
+    def __init__(self, df, region_col=REGION, year_col=YEAR):
+        keys = df[region_col]
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            codes = keys.cat.codes.to_numpy()
+            names = keys.cat.categories
+        else:
+            codes, names = pd.factorize(keys, sort=True)
+
+        years = df[year_col].to_numpy()
+        order = np.lexsort((years, codes))
+        self.frame = df.take(order).reset_index(drop=True)
+
+        # Rows of region i are frame[region_offsets[i]:region_offsets[i + 1]];
+        # rows with a missing region (code -1) sort first and are skipped
+        self.region_offsets = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        self._region_pos = {str(name): i for i, name in enumerate(names)}
+
+        # Positions into the source frame ordered by year (stable, so each
+        # year keeps the file's row order), with offsets per distinct year
+        self._source = df
+        self._year_order = np.argsort(years, kind='stable')
+        self.years = np.unique(years)
+        self.year_offsets = np.append(np.searchsorted(years[self._year_order], self.years), len(years))
+        self._year_pos = {int(year): i for i, year in enumerate(self.years)}
+
+    @property
+    def regions(self):
+        """Region names that have at least one row."""
+        counts = np.diff(self.region_offsets)
+        return [name for name, i in self._region_pos.items() if counts[i] > 0]
+
+    def __contains__(self, name):
+        start, stop = self._bounds(name)
+        return stop > start
+
+    def _bounds(self, name):
+        i = self._region_pos.get(name)
+        if i is None:
+            return 0, 0
+        return self.region_offsets[i], self.region_offsets[i + 1]
+
+    def region(self, name):
+        """Rows of one region, ordered by year."""
+        start, stop = self._bounds(name)
+        return self.frame.iloc[start:stop]
+
+    def regions_frame(self, names):
+        """Rows of several regions, in the order given."""
+        bounds = [self._bounds(name) for name in names]
+        positions = np.concatenate([np.arange(start, stop) for start, stop in bounds] or [[]]).astype(np.intp)
+        return self.frame.take(positions)
+
+    def year(self, tahun):
+        """Rows of one year, in source order."""
+        i = self._year_pos.get(int(tahun))
+        if i is None:
+            return self._source.iloc[0:0]
+        return self._source.take(self._year_order[self.year_offsets[i]:self.year_offsets[i + 1]])
+
+
+# Process-wide: (id of the frame, region column) -> (weak reference to the frame, RegionIndex)
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_region_index(df, region_col=REGION):
+    """RegionIndex of a shared, read-only frame, built once per frame.
+
+    The entry goes when the frame is garbage collected (e.g. after its
+    views are rebuilt), so a stale index is never returned.
+    """
+    key = (id(df), region_col)
+    cached = _cache.get(key)
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+    with _lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0]() is not df:
+            cached = (weakref.ref(df), RegionIndex(df, region_col))
+            _cache[key] = cached
+            weakref.finalize(df, _cache.pop, key, None)
+        return cached[1]
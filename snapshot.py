@@ -0,0 +1,438 @@
+"""Columnar Arrow/Feather snapshots of the BPS CSV datasets.
+
+Each CSV is converted once into an uncompressed Arrow IPC file under
+``.snapshots/`` which can be memory-mapped and read column by column.
+The CSV is validated and cleaned on the way in (``validation.py``) and
+the report is written next to the snapshot as
+``<dataset>.validation.json``. The outlier scan is left out of that
+build, which is on the load path; ``load_report`` runs it on the clean
+snapshot the first time the report is asked for. The source CSV's mtime
+and size and the validation rules version are stored in the snapshot's
+schema metadata; a snapshot whose source or rules have changed is
+rebuilt on next use.
+
+Snapshots are compact (``compact``): fractional measures are float32,
+whole-number ones int32, and ``CONSTANT_COLUMNS`` holding one value for
+the whole file (``bps_nama_provinsi`` of a one-province export,
+``satuan``, ...) are left out and kept once in the schema metadata.
+``load_snapshot`` leaves them out of full reads and fills them in when
+asked for by name. ``benchmarks/memory_report.py`` measures the saving.
+
+``append_snapshot`` adds rows appended to the CSV (see ``ingest.py``) as
+a segment file next to the snapshot (``<dataset>.1.arrow``, ...) that
+holds only those rows; a segment records the signature of the file it
+extends, and readers concatenate the chain (``read_segments``). A full
+rebuild writes one file again. The snapshot of ``penduduk`` also keeps
+the code, name and province of every kabupaten/kota in its metadata
+(``region_table``), so validating and ingesting a file never loads the
+whole of ``penduduk``.
+
+A CSV larger than ``STREAM_BYTES`` is validated and written a chunk at a
+time (``stream_snapshot``, ``validation.validate_chunks``), one record
+batch per chunk, so building its snapshot never holds the whole file.
+
+Build every snapshot ahead of time with::
+
+    python snapshot.py
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+import validation
+from data_loader import BASE_DIR, DATASETS, PENDUDUK, dataset_path
+from streaming import CHUNK_ROWS
+
+SNAPSHOT_DIR = os.path.join(BASE_DIR, '.snapshots')
+_META_KEY = b'kemiskinan_source'
+_CONSTANTS_KEY = b'kemiskinan_constants'
+_PREVIOUS_KEY = b'kemiskinan_previous'
+_REGIONS_KEY = b'kemiskinan_regions'
+# Bumped whenever the snapshot layout changes; part of every dataset's version
+SNAPSHOT_FORMAT = 3
+# Columns left out of a snapshot when they hold a single value
+CONSTANT_COLUMNS = ['bps_kode_provinsi', 'bps_nama_provinsi', 'periode_bulan', 'satuan']
+# CSVs larger than this are validated and written a chunk at a time
+STREAM_BYTES = 256 * 2 ** 20
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f'{name}.arrow')
+
+
+def report_path(name):
+    return os.path.join(SNAPSHOT_DIR, f'{name}.validation.json')
+
+
+def source_signature(name):
+    st = os.stat(dataset_path(name))
+    return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'rules': validation.RULES_VERSION,
+            'format': SNAPSHOT_FORMAT}
+
+
+def data_version(names=None):
+    """Signatures of the given datasets (all when None), used to key derived files."""
+    return {name: source_signature(name) for name in sorted(names or DATASETS)}
+
+
+def _schema(path):
+    try:
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def _stored_metadata(path, key):
+    schema = _schema(path)
+    raw = (schema.metadata or {}).get(key) if schema is not None else None
+    return json.loads(raw) if raw else None
+
+
+def _stored_signature(path):
+    return _stored_metadata(path, _META_KEY)
+
+
+def _segment_path(path, k):
+    return f'{path[:-len(".arrow")]}.{k}.arrow'
+
+
+def segment_paths(path):
+    """The Arrow file ``path`` and the segments appended to it, oldest first.
+
+    A segment only counts when it extends the file before it, so the
+    leftovers of an older chain are never read.
+    """
+    paths = [path]
+    signature = _stored_signature(path)
+    while signature is not None:
+        candidate = _segment_path(path, len(paths))
+        if _stored_metadata(candidate, _PREVIOUS_KEY) != signature:
+            break
+        paths.append(candidate)
+        signature = _stored_signature(candidate)
+    return paths
+
+
+def read_segments(path, columns=None):
+    """``columns`` (all when None) of ``path`` and its segments as one memory-mapped table."""
+    tables = [feather.read_table(segment, columns=columns, memory_map=True) for segment in segment_paths(path)]
+    if len(tables) == 1:
+        return tables[0]
+    # The schemas differ only in their metadata
+    return pa.concat_tables([tables[0]] + [table.replace_schema_metadata(tables[0].schema.metadata)
+                                           for table in tables[1:]])
+
+
+def _with_metadata(schema, signature, metadata=None):
+    """``schema`` carrying ``signature`` and the JSON-able ``metadata`` ({key: value})."""
+    schema_metadata = dict(schema.metadata or {})
+    schema_metadata[_META_KEY] = json.dumps(signature).encode()
+    for key, value in (metadata or {}).items():
+        schema_metadata[key] = json.dumps(value).encode()
+    return schema.with_metadata(schema_metadata)
+
+
+def _drop_segments(path):
+    k = 1
+    while os.path.exists(_segment_path(path, k)):
+        os.remove(_segment_path(path, k))
+        k += 1
+
+
+def write_frame(path, df, signature, metadata=None):
+    """Write compact ``df`` as the Arrow file ``path`` with ``signature``, dropping its old segments.
+
+    ``metadata`` adds JSON-able schema metadata ({key: value}).
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = _with_metadata(table.schema, signature, metadata)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    feather.write_feather(table.replace_schema_metadata(schema.metadata), f'{path}.tmp', compression='uncompressed')
+    os.replace(f'{path}.tmp', path)
+    _drop_segments(path)
+    return path
+
+
+def append_frame(path, df, signature, previous, metadata=None):
+    """Append compact ``df`` to ``path`` as a new segment, written at ``signature``.
+
+    Returns None, writing nothing, when the chain's newest file was not
+    written at ``previous`` or ``df`` does not fit the file's schema.
+    """
+    paths = segment_paths(path)
+    base = _schema(path)
+    if _stored_signature(paths[-1]) != previous or base is None:
+        return None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False).cast(base)
+    except (ValueError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    # The base file's constants and region table describe the whole chain
+    schema = base.with_metadata({key: value for key, value in base.metadata.items()
+                                 if key not in (_CONSTANTS_KEY, _REGIONS_KEY)})
+    schema = _with_metadata(schema, signature, {_PREVIOUS_KEY: previous, **(metadata or {})})
+
+    segment = _segment_path(path, len(paths))
+    feather.write_feather(table.replace_schema_metadata(schema.metadata), f'{segment}.tmp',
+                          compression='uncompressed')
+    os.replace(f'{segment}.tmp', segment)
+    return segment
+
+
+def constants(name):
+    """Columns left out of the snapshot of ``name`` for holding one value: {column: value}."""
+    return _stored_metadata(snapshot_path(name), _CONSTANTS_KEY) or {}
+
+
+def _region_map(df, known=None):
+    """``known`` with the ``{code: [kabupaten/kota, provinsi]}`` of ``df``'s rows added (known codes keep theirs)."""
+    regions = dict(known or {})
+    code, region = validation.REGION_CODE, validation.REGION_NAME
+    pairs = df.drop_duplicates(code)
+    for key, name, provinsi in zip(pairs[code], pairs[region].astype(str), pairs['bps_nama_provinsi'].astype(str)):
+        regions.setdefault(str(key), [name, provinsi])
+    return regions
+
+
+def region_table(name=PENDUDUK):
+    """``{code: [kabupaten/kota, provinsi]}`` of dataset ``name``'s current snapshot, from its metadata."""
+    try:
+        if not is_fresh(name):
+            build_snapshot(name)
+    except OSError:
+        # Snapshot directory not writable: from the shared frame instead
+        from data_loader import load_dataset
+
+        return _region_map(load_dataset(name, columns=[validation.REGION_CODE, validation.REGION_NAME,
+                                                       'bps_nama_provinsi']))
+    return _stored_metadata(segment_paths(snapshot_path(name))[-1], _REGIONS_KEY) or {}
+
+
+def compact(df, constant=None):
+    """``(df in the snapshot layout, its constant columns as {column: value})``.
+
+    Fractional measures become float32 and whole-number ones int32 where
+    they fit. ``CONSTANT_COLUMNS`` holding one value are dropped, or,
+    when ``constant`` is given, exactly the columns it names.
+    """
+    if constant is None:
+        constant = {}
+        for column in CONSTANT_COLUMNS:
+            values = df[column] if column in df else None
+            if values is not None and len(values) and values.notna().all() and values.nunique() == 1:
+                value = values.iloc[0]
+                constant[column] = value.item() if isinstance(value, np.generic) else value
+    df = df.drop(columns=[column for column in constant if column in df])
+    dtypes = {}
+    for column in df.columns:
+        kind = df[column].dtype
+        if kind == np.float64:
+            dtypes[column] = np.float32
+        elif kind == np.int64 and (df.empty or np.iinfo(np.int32).min <= df[column].min() <= df[column].max()
+                                   <= np.iinfo(np.int32).max):
+            dtypes[column] = np.int32
+    return df.astype(dtypes), constant
+
+
+def fill_constants(name, df, columns, constant):
+    """``df`` with the ``columns`` it lacks taken from ``constant``, in the order of ``columns``."""
+    if not any(column in constant and column not in df for column in columns):
+        return df
+    filled = {}
+    for column in columns:
+        if column in df:
+            filled[column] = df[column]
+        elif DATASETS[name]['dtype'][column] == 'category':
+            filled[column] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [constant[column]])
+        else:
+            filled[column] = np.full(len(df), constant[column], dtype=DATASETS[name]['dtype'][column])
+    return pd.DataFrame(filled, index=df.index)
+
+
+def is_fresh(name):
+    return _stored_signature(segment_paths(snapshot_path(name))[-1]) == source_signature(name)
+
+
+def _write_snapshot(name, df, signature):
+    metadata = {}
+    if validation.REGION_CODE in df:
+        metadata[_REGIONS_KEY] = _region_map(df)
+    df, metadata[_CONSTANTS_KEY] = compact(df)
+    return write_frame(snapshot_path(name), df, signature, metadata)
+
+
+def stream_snapshot(name, target, signature, path=None, chunksize=CHUNK_ROWS):
+    """Validate a CSV laid out like ``name`` chunk by chunk and write its clean rows to ``target``.
+
+    The file is the one ``_write_snapshot`` writes for the whole frame,
+    with one record batch per chunk. Returns the validation report.
+    """
+    report, layout, chunks = validation.validate_chunks(name, path, chunksize)
+    constant = {column: value for column, value in layout['single'].items() if column in CONSTANT_COLUMNS}
+    metadata = {_CONSTANTS_KEY: constant}
+    if 'regions' in layout:
+        metadata[_REGIONS_KEY] = layout['regions']
+    # int64 columns stay int64 when some chunk's values would not fit int32
+    info = np.iinfo(np.int32)
+    wide = {column for column, (low, high) in layout['range'].items()
+            if DATASETS[name]['dtype'][column] == 'int64' and not info.min <= low <= high <= info.max}
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    writer = None
+    try:
+        for df in chunks():
+            table = pa.Table.from_pandas(compact(df, constant)[0], preserve_index=False)
+            if writer is None:
+                fields = [field.with_type(pa.int64()) if field.name in wide else field for field in table.schema]
+                schema = _with_metadata(pa.schema(fields, table.schema.metadata), signature, metadata)
+                writer = pa.ipc.new_file(f'{target}.tmp', schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(f'{target}.tmp', target)
+    _drop_segments(target)
+    return report
+
+
+def build_snapshot(name):
+    """Validate the CSV once and write the clean rows as an Arrow IPC snapshot, with its report."""
+    signature = source_signature(name)
+    if os.path.getsize(dataset_path(name)) > STREAM_BYTES:
+        path = snapshot_path(name)
+        report = stream_snapshot(name, path, signature)
+    else:
+        df, report = validation.validate(name, outliers=False)
+        path = _write_snapshot(name, df, signature)
+    _write_report(name, report)
+    return path
+
+
+def concat_frames(first, second):
+    """Rows of ``first`` then ``second``; categoricals stay categorical, with sorted categories."""
+    columns = {}
+    for column in first.columns:
+        if isinstance(first[column].dtype, pd.CategoricalDtype):
+            columns[column] = pd.api.types.union_categoricals([first[column], second[column]],
+                                                              sort_categories=True)
+        else:
+            columns[column] = np.concatenate([first[column].to_numpy(), second[column].to_numpy()])
+    return pd.DataFrame(columns)
+
+
+def _merge_reports(report, added):
+    """Report of a snapshot extended with the rows ``added`` describes."""
+    for key in ('rows_in', 'rows_out', 'dropped_invalid', 'dropped_unknown_regions',
+                'duplicates_exact', 'duplicates_conflicting'):
+        report[key] = report.get(key, 0) + added.get(key, 0)
+    for column, count in added['invalid_values'].items():
+        report['invalid_values'][column] = report['invalid_values'].get(column, 0) + count
+    for key in ('extra_columns', 'unknown_regions'):
+        report[key] = sorted(set(report.get(key, [])) | set(added.get(key, [])))
+    if 'renamed_regions' in added:
+        report['renamed_regions'] = dict(sorted({**report['renamed_regions'], **added['renamed_regions']}.items()))
+    report['conflicting_keys'] = (report['conflicting_keys'] + added['conflicting_keys'])[:validation.SAMPLE]
+    # Rescanned over every row on first use (see load_report)
+    report['outliers'] = None
+    return report
+
+
+def append_snapshot(name, rows, report, previous):
+    """Add clean ``rows``, just appended to the CSV of ``name``, to its snapshot and report.
+
+    The rows are written as a new segment; the rows already in the
+    snapshot are neither read nor validated again. ``previous`` is the
+    CSV's signature before the append; a snapshot not built from that
+    version is rebuilt in full instead. So is one whose constant columns
+    the rows break (a new province or unit): the whole snapshot is
+    rewritten with those columns stored.
+    """
+    path = snapshot_path(name)
+    if not os.path.exists(report_path(name)):
+        return build_snapshot(name)
+    with open(report_path(name), encoding='utf-8') as f:
+        stored = json.load(f)
+    constant = constants(name)
+    metadata = {}
+    if validation.REGION_CODE in rows:
+        metadata[_REGIONS_KEY] = _region_map(rows, _stored_metadata(segment_paths(path)[-1], _REGIONS_KEY))
+    segment = None
+    if all((rows[column].astype(object) == value).all() for column, value in constant.items()):
+        segment = append_frame(path, compact(rows, constant)[0], source_signature(name), previous, metadata)
+    if segment is None:
+        if _stored_signature(segment_paths(path)[-1]) != previous:
+            return build_snapshot(name)
+        # Read as stored: load_snapshot would rebuild it from the extended CSV
+        old = fill_constants(name, to_frame(read_segments(path)), list(DATASETS[name]['dtype']), constant)
+        segment = _write_snapshot(name, concat_frames(old, rows), source_signature(name))
+    _write_report(name, _merge_reports(stored, report))
+    return segment
+
+
+def _write_report(name, report):
+    with open(f'{report_path(name)}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    os.replace(f'{report_path(name)}.tmp', report_path(name))
+
+
+def load_report(name):
+    """The validation report of the current snapshot, rebuilding it if stale.
+
+    Outliers are scanned here, once per snapshot, not when it is built.
+    """
+    if not is_fresh(name) or not os.path.exists(report_path(name)):
+        build_snapshot(name)
+    with open(report_path(name), encoding='utf-8') as f:
+        report = json.load(f)
+    if report['outliers'] is None:
+        report['outliers'] = validation.find_outliers(name, load_snapshot(name, list(DATASETS[name]['dtype'])))
+        _write_report(name, report)
+    return report
+
+
+def to_frame(table):
+    """DataFrame over a memory-mapped Arrow table.
+
+    Numeric columns without nulls stay zero-copy views of the mapping (one
+    block per column), so processes reading the same file share its pages
+    through the OS page cache instead of each holding a copy. The arrays
+    are read-only, like every shared frame. Tables of several segments
+    are copied into one block per column; their categoricals, unified in
+    order of appearance, are sorted again as one file's would be.
+    """
+    df = table.to_pandas(split_blocks=True)
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.categories.is_monotonic_increasing:
+            df[column] = values.cat.reorder_categories(values.cat.categories.sort_values())
+    return df
+
+
+def load_snapshot(name, columns=None):
+    """Read ``columns`` from the snapshot, rebuilding it if stale.
+
+    All stored columns when ``columns`` is None; constant columns are only
+    there when asked for by name.
+    """
+    if not is_fresh(name):
+        build_snapshot(name)
+    constant = constants(name)
+    stored = None if columns is None else [column for column in columns if column not in constant]
+    df = to_frame(read_segments(snapshot_path(name), stored))
+    return df if columns is None else fill_constants(name, df, columns, constant)
+
+
+def build_all():
+    for name in DATASETS:
+        path = build_snapshot(name)
+        print(f'{name}: {os.path.relpath(path, BASE_DIR)}')
+        print(validation.summary(load_report(name)))
+
+
+if __name__ == '__main__':
+    build_all()
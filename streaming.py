@@ -0,0 +1,94 @@
+"""Chunked loading of BPS exports too large to read in one go.
+
+``read_chunks`` reads a CSV a fixed number of rows at a time; it is the
+reader behind ``validation.validate_chunks``, which ``snapshot`` uses to
+build the snapshot of a CSV larger than ``snapshot.STREAM_BYTES``, so
+peak memory depends on the chunk size, not on the file size.
+
+``iter_chunks`` reads a CSV laid out like one of the datasets in
+``DATASETS``, keeping only the needed columns and the rows of the
+requested province and tahun range. ``stream_state`` folds those chunks
+straight into the running sums kept by ``aggregates`` (per-tahun
+sums/counts and per-region trend sums)::
+
+    state, rows = stream_state(PENDUDUK, 'ekspor_nasional.csv', provinsi='Aceh', years=(2012, 2021))
+
+``indeks`` and ``garis_kemiskinan`` have no province column: ``iter_chunks``
+does not filter them by ``provinsi``, ``stream_state`` does so through
+the province of their kabupaten/kota.
+"""
+import pandas as pd
+
+from data_loader import DATASETS, dataset_path
+
+CHUNK_ROWS = 100_000
+
+
+def read_chunks(path, chunksize=CHUNK_ROWS, **options):
+    """Yield ``pd.read_csv(path, **options)`` as frames of at most ``chunksize`` rows.
+
+    A file without data rows yields one empty frame.
+    """
+    with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+        yield from reader
+
+
+def _province_filter(columns, provinsi):
+    """(column, value) to filter on: a name matches bps_nama_provinsi (any case), a number bps_kode_provinsi."""
+    if provinsi is None:
+        return None
+    column = 'bps_kode_provinsi' if isinstance(provinsi, int) else 'bps_nama_provinsi'
+    return (column, provinsi) if column in columns else None
+
+
+def iter_chunks(name, path=None, columns=None, provinsi=None, years=None, chunksize=CHUNK_ROWS):
+    """Yield filtered frames of at most ``chunksize`` rows from a CSV laid out like ``name``.
+
+    ``years`` is an inclusive ``(first, last)`` tahun range. Only ``columns``
+    (all when None) are returned.
+    """
+    spec = DATASETS[name]
+    province = _province_filter(spec['dtype'], provinsi)
+    wanted = list(columns) if columns is not None else list(spec['dtype'])
+    usecols = set(wanted) | {'tahun'} | ({province[0]} if province else set())
+    # Names stay plain strings per chunk: categories would differ between chunks
+    dtype = {column: ('object' if kind == 'category' else kind)
+             for column, kind in spec['dtype'].items() if column in usecols}
+
+    for chunk in read_chunks(path or dataset_path(name), chunksize, sep=spec['sep'], encoding=spec['encoding'],
+                             dtype=dtype, usecols=list(usecols)):
+        keep = None
+        if province:
+            values = chunk[province[0]]
+            keep = (values.str.casefold() == province[1].casefold()
+                    if isinstance(province[1], str) else values == province[1])
+        if years is not None:
+            in_range = chunk['tahun'].between(years[0], years[1])
+            keep = in_range if keep is None else keep & in_range
+        if keep is not None:
+            chunk = chunk[keep]
+        if len(chunk):
+            yield chunk[wanted]
+
+
+def stream_state(name, path=None, provinsi=None, years=None, chunksize=CHUNK_ROWS):
+    """Running-sum state (see ``aggregates``) of a CSV, built chunk by chunk.
+
+    Returns ``(state, rows)`` where ``rows`` is the number of rows kept.
+    """
+    # Imported here: aggregates builds on snapshot, which reads through this module
+    from aggregates import SPECS, accumulate
+    from provinces import PROVINCE, province_of_rows
+
+    region_col, measures = SPECS[name]
+    columns = ['tahun', region_col, *measures] + ([PROVINCE] if PROVINCE in DATASETS[name]['dtype'] else [])
+    state = {'version': None, 'provinces': {}}
+    rows = 0
+    for chunk in iter_chunks(name, path, columns, provinsi, years, chunksize):
+        provinces = province_of_rows(name, chunk)
+        if isinstance(provinsi, str) and PROVINCE not in chunk:
+            keep = (provinces.str.casefold() == provinsi.casefold()).to_numpy()
+            chunk, provinces = chunk[keep], provinces[keep]
+        accumulate(state, name, chunk, provinces)
+        rows += len(chunk)
+    return state, rows
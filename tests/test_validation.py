@@ -0,0 +1,60 @@
+import snapshot
+import validation
+from data_loader import GARIS_KEMISKINAN, PENDUDUK, PERSENTASE_DAERAH
+
+PERSENTASE_CSV = """bps_kode_provinsi;bps_nama_provinsi;tahun;bulan;daerah;persentase_penduduk_miskin;satuan
+11;Aceh;2023;Maret;perkotaan;10.4;persen
+11;Aceh;2023;Maret;perdesaan;16.9;persen
+51;Bali;2023;Maret;perkotaan;4.0;persen
+51;Bali;2023;Maret;perdesaan;4.8;persen
+"""
+
+PENDUDUK_CSV = """tahun,periode_bulan,bps_kode_provinsi,bps_nama_provinsi,bps_kode_kabupaten_kota,bps_nama_kabupaten_kota,bps_jumlah_penduduk,satuan,persentase_jumlah_penduduk_miskin
+2023,Maret,11,Aceh,1101,Kabupaten Simeulue,18.6,Ribu Jiwa,17.8
+2023,Maret,11,Aceh,1171,Kota Banda Aceh,17.4,Ribu Jiwa,6.8
+2023,Maret,51,Bali,5101,Kabupaten Jembrana,16.5,Ribu Jiwa,6.1
+2023,Maret,51,Bali,5171,Kota Denpasar,17.3,Ribu Jiwa,2.2
+"""
+
+
+def _write(tmp_path, text, name='data.csv'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_persentase_daerah_keys_include_province(tmp_path):
+    df, report = validation.validate(PERSENTASE_DAERAH, _write(tmp_path, PERSENTASE_CSV))
+    assert report['duplicates_conflicting'] == 0
+    assert report['rows_out'] == 4
+    assert sorted(df['bps_nama_provinsi'].astype(str).unique()) == ['Aceh', 'Bali']
+
+
+def test_persentase_daerah_conflict_within_province(tmp_path):
+    text = PERSENTASE_CSV + '51;Bali;2023;Maret;perkotaan;5.0;persen\n'
+    df, report = validation.validate(PERSENTASE_DAERAH, _write(tmp_path, text))
+    assert report['duplicates_conflicting'] == 1
+    assert report['conflicting_keys'][0]['bps_kode_provinsi'] == '51'
+    assert report['rows_out'] == 4
+
+
+def test_penduduk_two_provinces(tmp_path):
+    df, report = validation.validate(PENDUDUK, _write(tmp_path, PENDUDUK_CSV))
+    assert report['duplicates_conflicting'] == 0
+    assert report['rows_out'] == 4
+    assert df.groupby('bps_nama_provinsi', observed=True).size().to_dict() == {'Aceh': 2, 'Bali': 2}
+
+
+def test_names_listed_in_two_provinces_are_unknown(tmp_path, monkeypatch):
+    # The same name under two kabupaten/kota codes cannot be told apart by name-keyed files
+    regions = {'1101': ['Kabupaten Simeulue', 'Aceh'], '1172': ['Kota Baru', 'Aceh'], '5172': ['Kota Baru', 'Bali']}
+    monkeypatch.setattr(snapshot, 'region_table', lambda name=PENDUDUK: regions)
+    text = ('tahun;garis_kemiskinan;bps_nama_kabupaten_kota\n'
+            '2023;500000;Kabupaten Simeulue\n'
+            '2023;600000;Kota Baru\n'
+            '2022;550000;Kota Baru\n')
+    df, report = validation.validate(GARIS_KEMISKINAN, _write(tmp_path, text))
+    assert report['unknown_regions'] == ['Kota Baru']
+    assert report['dropped_unknown_regions'] == 2
+    assert report['duplicates_conflicting'] == 0
+    assert df['bps_nama_kabupaten_kota'].astype(str).tolist() == ['Kabupaten Simeulue']
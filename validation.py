@@ -0,0 +1,561 @@
+"""Validation and normalization of a BPS CSV, run once when its snapshot is built.
+
+``validate(name)`` reads the raw file and returns the clean frame and a
+report. Every check is vectorized over the whole file, and text columns
+are only cleaned per distinct value (they stay categorical throughout):
+
+* schema     headers are stripped of BOMs/whitespace and lower-cased; the
+             other delimiter is tried when the expected columns are not
+             found; missing columns raise ValueError, extra ones are dropped
+* dtypes     numbers are parsed (decimal commas accepted); rows whose key
+             or integer columns do not parse are dropped, unparseable
+             measures become NaN
+* keys       exact duplicate rows are dropped; rows repeating a key with
+             other values keep the first occurrence and are reported
+* names      kabupaten/kota names are canonicalized: by
+             ``bps_kode_kabupaten_kota`` where the file has it, otherwise
+             by matching a normalized spelling against ``penduduk``'s names;
+             rows of names it does not list (or lists in more than one
+             province) have no province and are dropped (reported)
+* outliers   measures more than ``OUTLIER_Z`` robust z-scores (the MAD of
+             their region's values) away from the rolling median of the
+             surrounding years are flagged in the report, not changed
+             (``find_outliers``; optional, see ``validate``)
+
+``validate_chunks`` runs the same checks on a file too large to hold in
+memory, reading it a chunk at a time (``streaming.read_chunks``): a first
+pass does the per-row checks and keeps one 64-bit hash of each row's key,
+so only rows whose key hash repeats are compared in full.
+
+``snapshot.build_snapshot`` writes the clean frame and the report (next
+to the snapshot, ``<dataset>.validation.json``), so runtime code never
+re-cleans; it skips the outlier scan, which ``snapshot.load_report``
+runs on first use. ``RULES_VERSION`` is part of every dataset's version:
+changing the rules rebuilds every snapshot and what is derived from them.
+"""
+import csv
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASETS, GARIS_KEMISKINAN, INDEKS, PENDUDUK, PERSENTASE_DAERAH, dataset_path
+from streaming import CHUNK_ROWS, read_chunks
+
+RULES_VERSION = 2
+
+REGION_CODE = 'bps_kode_kabupaten_kota'
+REGION_NAME = 'bps_nama_kabupaten_kota'
+
+# Columns identifying one observation. Every file may hold several
+# provinces; indeks and garis_kemiskinan carry no province or code, so
+# their names must be unique nationally (see _canonical_names).
+KEYS = {
+    PENDUDUK: ['tahun', 'periode_bulan', REGION_CODE],
+    PERSENTASE_DAERAH: ['tahun', 'bulan', 'bps_kode_provinsi', 'daerah'],
+    INDEKS: ['tahun', REGION_NAME],
+    GARIS_KEMISKINAN: ['tahun', REGION_NAME],
+}
+# Measures checked for outliers, with the columns grouping them
+MEASURES = {
+    PENDUDUK: ([REGION_CODE], ['bps_jumlah_penduduk', 'persentase_jumlah_penduduk_miskin']),
+    PERSENTASE_DAERAH: (['bps_nama_provinsi', 'daerah'], ['persentase_penduduk_miskin']),
+    INDEKS: ([REGION_NAME], ['indeks_kedalaman', 'indeks_keparahan_kemiskinan']),
+    GARIS_KEMISKINAN: ([REGION_NAME], ['garis_kemiskinan']),
+}
+OUTLIER_Z = 3.5
+# Years in the rolling median outliers are measured against
+OUTLIER_WINDOW = 5
+# Rows listed per problem in the report
+SAMPLE = 20
+
+
+def _read_options(name, path=None):
+    """``(source, delimiter, header renames, dtypes, read_csv options)`` of a file laid out like ``name``."""
+    spec = DATASETS[name]
+    source = path or dataset_path(name)
+    expected = set(spec['dtype'])
+    for sep in dict.fromkeys([spec['sep'], ';' if spec['sep'] == ',' else ',']):
+        with open(source, encoding=spec['encoding'], newline='') as f:
+            # pandas drops a leading BOM from the first column name, so do the same here
+            header = [column.replace('\ufeff', '') for column in next(csv.reader(f, delimiter=sep), [])]
+        normalized = [column.strip().lower() for column in header]
+        if expected <= set(normalized):
+            break
+    else:
+        missing = sorted(expected - set(normalized))
+        raise ValueError(f'{name}: missing columns {missing} (wrong delimiter or header?)')
+
+    rename = dict(zip(header, normalized))
+    dtype = {column: spec['dtype'][key] for column, key in rename.items() if key in spec['dtype']}
+    # Only empty cells are missing; other text ('NA', '-') is an invalid value to report
+    options = {'sep': sep, 'encoding': spec['encoding'], 'keep_default_na': False, 'na_values': ['']}
+    return source, sep, rename, dtype, options
+
+
+def read_raw(name, path=None):
+    """The file with normalized headers, and the delimiter that fit.
+
+    Columns come typed when every value parses as the dataset's dtype (the
+    usual case, left to the C parser); otherwise the file is read as text
+    and ``validate`` parses it column by column.
+    """
+    source, sep, rename, dtype, options = _read_options(name, path)
+    try:
+        raw = pd.read_csv(source, dtype=dtype, **options)
+    except (ValueError, TypeError):
+        # Some value does not parse as its column's dtype
+        raw = pd.read_csv(source, dtype=str, **options)
+    return raw.rename(columns=rename), sep
+
+
+def read_raw_chunks(name, path=None, typed=True, chunksize=CHUNK_ROWS):
+    """``read_raw`` a ``chunksize`` rows at a time; with ``typed=False`` every column is read as text.
+
+    A typed read raises ValueError or TypeError at the first chunk with a
+    value that does not parse.
+    """
+    source, _, rename, dtype, options = _read_options(name, path)
+    for raw in read_chunks(source, chunksize, dtype=dtype if typed else str, **options):
+        yield raw.rename(columns=rename)
+
+
+def _compact(codes, categories):
+    """Categorical of ``codes`` keeping only the categories some row uses, in order."""
+    used = np.zeros(len(categories) + 1, dtype=bool)
+    # Code -1 (missing) marks the extra last slot
+    used[codes] = True
+    if used[:-1].all():
+        return pd.Categorical.from_codes(codes, categories)
+    remap = np.cumsum(used[:-1]) - 1
+    return pd.Categorical.from_codes(np.append(remap, -1)[codes], categories[used[:-1]])
+
+
+def _recode(values, func):
+    """``values`` as a categorical with ``func`` applied to its distinct labels.
+
+    ``func`` takes and returns a Series of labels (vectorized); labels it
+    maps to the same value are merged and a NaN result makes the value
+    missing. Rows are only re-pointed to new codes, never re-hashed, and
+    categories no row uses are dropped.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    original = pd.Series(values.cat.categories.astype(object))
+    labels = func(original)
+    if labels.equals(original):
+        # Nothing to clean (the usual case): the codes stand
+        return pd.Series(_compact(values.cat.codes.to_numpy(), values.cat.categories),
+                         index=values.index, name=values.name)
+    codes, categories = pd.factorize(labels, sort=True)
+    # Code -1 (missing) picks the appended -1
+    recoded = np.append(codes, -1)[values.cat.codes.to_numpy()]
+    return pd.Series(_compact(recoded, categories), index=values.index, name=values.name)
+
+
+def _clean_text(values):
+    # Same as collapsing \s+ to one space and stripping, without a regex per label
+    return pd.Series([' '.join(value.split()) if isinstance(value, str) else value for value in values],
+                     index=values.index, dtype=object)
+
+
+def _to_number(values):
+    """Parse text numbers; decimal commas are accepted."""
+    parsed = pd.to_numeric(values, errors='coerce')
+    comma = parsed.isna() & values.notna()
+    if comma.any():
+        parsed[comma] = pd.to_numeric(values[comma].str.replace(',', '.', regex=False).str.strip(), errors='coerce')
+    return parsed
+
+
+def normalize_name(names):
+    """Spelling-insensitive key of kabupaten/kota names (case, spaces, 'Kab.')."""
+    key = pd.Series([' '.join(str(name).casefold().split()) for name in names], index=names.index, dtype=object)
+    return key.str.replace(r'^kab\.?\s', 'kabupaten ', regex=True)
+
+
+def _canonical_names():
+    """Normalized name -> kabupaten/kota name as spelled in ``penduduk``.
+
+    Names ``penduduk`` lists under more than one kabupaten/kota code (in
+    different provinces) are left out: a file keyed by name alone cannot
+    tell those regions apart, so their rows count as unknown.
+    """
+    from snapshot import region_table
+
+    # One entry per kabupaten/kota code, read from the snapshot's metadata
+    codes = pd.Series([region for region, _ in region_table(PENDUDUK).values()], dtype=object).value_counts()
+    names = pd.Series(codes.index[codes.to_numpy() == 1].astype(str))
+    return pd.Series(names.to_numpy(), index=normalize_name(names).to_numpy())
+
+
+def _canonicalize(name, df, report, canonical_names=None):
+    if REGION_CODE in df:
+        region_codes = df[REGION_CODE].to_numpy().astype(np.int64)
+        # One id per (code, name) pair
+        spellings = region_codes * (len(df[REGION_NAME].cat.categories) + 1) + df[REGION_NAME].cat.codes.to_numpy()
+        if len(pd.unique(spellings)) == len(pd.unique(region_codes)):
+            # One spelling per code (the usual case): nothing to rename
+            report['renamed_regions'] = {}
+            names = df[REGION_NAME]
+            df[REGION_NAME] = pd.Series(_compact(names.cat.codes.to_numpy(), names.cat.categories), index=df.index)
+            return df
+        # The most common spelling of each code wins
+        counts = df.groupby([REGION_CODE, REGION_NAME], observed=True).size().reset_index(name='n')
+        best = counts.sort_values('n', ascending=False, kind='stable').drop_duplicates(REGION_CODE)
+        pairs = counts.merge(best[[REGION_CODE, REGION_NAME]], on=REGION_CODE, suffixes=('', '_kanonik'))
+        renamed = pairs[pairs[REGION_NAME] != pairs[f'{REGION_NAME}_kanonik']]
+        report['renamed_regions'] = dict(sorted(zip(renamed[REGION_NAME].astype(str),
+                                                    renamed[f'{REGION_NAME}_kanonik'].astype(str))))
+        # Every row takes the name code of its kabupaten/kota code's best spelling
+        positions = pd.Index(best[REGION_CODE]).get_indexer(df[REGION_CODE])
+        codes = best[REGION_NAME].cat.codes.to_numpy()[positions]
+        df[REGION_NAME] = pd.Series(_compact(codes, best[REGION_NAME].cat.categories), index=df.index)
+        return df
+
+    if canonical_names is None:
+        canonical_names = _canonical_names()
+    found = {}
+
+    def canonical(labels):
+        mapped = normalize_name(labels).map(canonical_names)
+        found['unknown'] = labels[mapped.isna()]
+        mapped = mapped.fillna(labels)
+        found['renamed'] = dict(zip(labels[mapped != labels], mapped[mapped != labels]))
+        return mapped
+
+    # Only names of rows still kept are reported
+    names = df[REGION_NAME]
+    names = pd.Series(_compact(names.cat.codes.to_numpy(), names.cat.categories), index=df.index)
+    df[REGION_NAME] = _recode(names, canonical)
+    report['unknown_regions'] = sorted(found['unknown'].tolist())
+    report['renamed_regions'] = dict(sorted(found['renamed'].items()))
+    if report['unknown_regions']:
+        # Their province is unknown too, so no page could show them
+        unknown = df[REGION_NAME].isin(report['unknown_regions']).to_numpy()
+        report['dropped_unknown_regions'] = int(unknown.sum())
+        df = df[~unknown].copy()
+        names = df[REGION_NAME]
+        df[REGION_NAME] = pd.Series(_compact(names.cat.codes.to_numpy(), names.cat.categories), index=df.index)
+    return df
+
+
+def _rolling_median(values, starts, ends, window):
+    """Centred rolling median of ``values`` within each row's group ``[start, end)``, NaN ignored."""
+    half = window // 2
+    positions = np.arange(len(values))[:, None] + np.arange(-half, half + 1)[None, :]
+    inside = (positions >= starts[:, None]) & (positions < ends[:, None])
+    windows = np.where(inside, values[np.clip(positions, 0, len(values) - 1)], np.nan)
+    # NaN sorts last, so each row's median sits between its middle present values
+    windows.sort(axis=1)
+    count = (~np.isnan(windows)).sum(axis=1)
+    rows = np.arange(len(values))
+    lower = windows[rows, np.maximum(count - 1, 0) // 2]
+    upper = windows[rows, count // 2]
+    # Rows without values give NaN, which is never flagged
+    return np.where(count > 0, (lower + upper) / 2, np.nan)
+
+
+def find_outliers(name, df):
+    """Values far from their region's rolling median over time (Hampel rule, robust z)."""
+    group, measures = MEASURES[name]
+    if df.empty:
+        return []
+    df = df.sort_values(group + ['tahun'], kind='stable')
+    codes = df.groupby(group, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    first = np.r_[True, codes[1:] != codes[:-1]]
+    group_starts = np.flatnonzero(first)
+    row_group = np.cumsum(first) - 1
+    starts = group_starts[row_group]
+    ends = np.r_[group_starts[1:], len(codes)][row_group]
+
+    flagged = []
+    for column in measures:
+        values = df[column].to_numpy(dtype=float)
+        # Residuals against a centred rolling median, so long trends are not flagged
+        residual = values - _rolling_median(values, starts, ends, OUTLIER_WINDOW)
+        # Scaled by the spread of the region's values: residual MADs of smooth series are ~0
+        median = pd.Series(values).groupby(codes).transform('median').to_numpy()
+        mad = pd.Series(np.abs(values - median)).groupby(codes).transform('median').to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = 0.6745 * residual / mad
+        hits = np.flatnonzero((np.abs(z) > OUTLIER_Z) & (mad > 0))
+        rows = df[group + ['tahun', column]].iloc[hits]
+        for row, score in zip(rows.itertuples(index=False), z[hits]):
+            flagged.append({'column': column, 'group': ' '.join(map(str, row[:len(group)])),
+                            'tahun': int(row[-2]), 'value': float(row[-1]), 'z': round(float(score), 2)})
+    return flagged
+
+
+def _parse(df, spec):
+    """``(df, invalid value counts, rows to drop)``: text cleaned, numbers parsed; row by row, so per chunk too."""
+    invalid, drop = {}, pd.Series(False, index=df.index)
+    for column, kind in spec['dtype'].items():
+        if kind == 'category':
+            df[column] = _recode(df[column], _clean_text)
+            continue
+        if pd.api.types.is_numeric_dtype(df[column]):
+            # Parsed already by read_raw, so integer columns have no gaps
+            continue
+        parsed = _to_number(df[column])
+        bad = parsed.isna() & df[column].notna()
+        if bad.any():
+            invalid[column] = int(bad.sum())
+        if kind.startswith('int'):
+            # Integers cannot hold NaN: the row goes
+            drop |= parsed.isna()
+        df[column] = parsed
+    return df, invalid, drop
+
+
+def _key_sample(name, rows):
+    """Keys of the first ``SAMPLE`` conflicting ``rows``, as reported."""
+    spec = DATASETS[name]
+    keys = rows[KEYS[name]].head(SAMPLE)
+    # Integer keys are still float when a value failed to parse: report them as '2024', not '2024.0'
+    keys = keys.astype({column: 'Int64' for column in KEYS[name] if spec['dtype'][column].startswith('int')})
+    return keys.astype(str).to_dict('records')
+
+
+def validate(name, path=None, outliers=True):
+    """``(clean frame, report)`` for dataset ``name`` (its own CSV unless ``path`` is given).
+
+    With ``outliers=False`` the Hampel scan is skipped and the report's
+    ``outliers`` is None (see ``find_outliers``).
+    """
+    spec = DATASETS[name]
+    raw, sep = read_raw(name, path)
+    report = {'dataset': name, 'rules': RULES_VERSION, 'rows_in': len(raw), 'delimiter': sep,
+              'extra_columns': sorted(set(raw.columns) - set(spec['dtype']))}
+    df, report['invalid_values'], drop = _parse(raw[list(spec['dtype'])].copy(), spec)
+    report['dropped_invalid'] = int(drop.sum())
+    if report['dropped_invalid']:
+        df = df[~drop]
+
+    report['dropped_unknown_regions'] = 0
+    if REGION_NAME in df:
+        df = _canonicalize(name, df, report)
+
+    # A row repeating another exactly repeats its key too: the full-row scan is only needed then
+    conflicting = df.duplicated(KEYS[name])
+    report['duplicates_exact'] = 0
+    if conflicting.any():
+        exact = df.duplicated()
+        report['duplicates_exact'] = int(exact.sum())
+        df = df[~exact]
+        conflicting = df.duplicated(KEYS[name])
+    report['duplicates_conflicting'] = int(conflicting.sum())
+    report['conflicting_keys'] = []
+    if report['duplicates_conflicting']:
+        report['conflicting_keys'] = _key_sample(name, df[conflicting])
+        df = df[~conflicting]
+
+    df = df.astype({column: kind for column, kind in spec['dtype'].items() if df[column].dtype != kind})
+    df = df.reset_index(drop=True)
+    report['outliers'] = find_outliers(name, df) if outliers else None
+    report['rows_out'] = len(df)
+    return df, report
+
+
+def _clean_chunks(name, path, typed, chunksize, canonical_names):
+    """Yield ``(rows, report)`` per chunk after the checks of ``validate`` that look at one row at a time.
+
+    Types are parsed and cast, text cleaned and, in files without
+    kabupaten/kota codes, names matched against ``penduduk`` (rows of
+    unknown names dropped). Spellings by code and duplicates span chunks
+    and are left to ``validate_chunks``.
+    """
+    spec = DATASETS[name]
+    for raw in read_raw_chunks(name, path, typed, chunksize):
+        report = {'rows_in': len(raw), 'dropped_unknown_regions': 0}
+        df, report['invalid_values'], drop = _parse(raw[list(spec['dtype'])].copy(), spec)
+        report['dropped_invalid'] = int(drop.sum())
+        if report['dropped_invalid']:
+            df = df[~drop]
+        if REGION_NAME in df and REGION_CODE not in df:
+            df = _canonicalize(name, df, report, canonical_names)
+        df = df.astype({column: kind for column, kind in spec['dtype'].items() if df[column].dtype != kind})
+        yield df.reset_index(drop=True), report
+
+
+def _final_chunks(name, path, typed, chunksize, canonical_names, spellings):
+    """Yield ``(rows, position of the first)`` per chunk, kabupaten/kota named by code as in ``spellings``."""
+    start = 0
+    for df, _ in _clean_chunks(name, path, typed, chunksize, canonical_names):
+        if spellings is not None:
+            df[REGION_NAME] = pd.Categorical(df[REGION_CODE].map(spellings))
+        yield df, start
+        start += len(df)
+
+
+def _track(layout, df):
+    """Add the categories ``df`` uses, its integer ranges and which columns still hold one value to ``layout``."""
+    for column in df.columns:
+        values = df[column]
+        if values.empty:
+            continue
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = pd.unique(values.cat.codes.to_numpy())
+            layout['categories'].setdefault(column, set()).update(values.cat.categories[codes[codes >= 0]])
+        elif values.dtype.kind in 'iu':
+            low, high = layout['range'].get(column, (values.min(), values.max()))
+            layout['range'][column] = (int(min(low, values.min())), int(max(high, values.max())))
+        if column in layout['varied']:
+            continue
+        value = values.iloc[0]
+        value = value.item() if isinstance(value, np.generic) else value
+        if values.isna().any() or values.nunique() != 1 or layout['single'].setdefault(column, value) != value:
+            layout['varied'].add(column)
+            layout['single'].pop(column, None)
+
+
+def _best_spellings(counts):
+    """``(code -> most common spelling, {other spelling: best})`` from ``{(code, spelling): rows}``."""
+    counts = pd.DataFrame([(code, spelling, n) for (code, spelling), n in counts.items()],
+                          columns=[REGION_CODE, REGION_NAME, 'n'])
+    # Ordered as validate's groupby, so ties go the same way
+    counts = counts.sort_values([REGION_CODE, REGION_NAME], kind='stable')
+    best = counts.sort_values('n', ascending=False, kind='stable').drop_duplicates(REGION_CODE)
+    pairs = counts.merge(best[[REGION_CODE, REGION_NAME]], on=REGION_CODE, suffixes=('', '_kanonik'))
+    renamed = pairs[pairs[REGION_NAME] != pairs[f'{REGION_NAME}_kanonik']]
+    return (pd.Series(best[REGION_NAME].to_numpy(), index=best[REGION_CODE].to_numpy()),
+            dict(sorted(zip(renamed[REGION_NAME], renamed[f'{REGION_NAME}_kanonik']))))
+
+
+def _scan(name, path, typed, chunksize, canonical_names):
+    """First pass of ``validate_chunks``.
+
+    Returns the summed chunk reports, a key hash per row, the layout, the
+    spelling counts and the province of each code.
+    """
+    report = {'rows_in': 0, 'invalid_values': {}, 'dropped_invalid': 0, 'dropped_unknown_regions': 0,
+              'unknown_regions': set(), 'renamed_regions': {}}
+    layout = {'categories': {}, 'single': {}, 'varied': set(), 'range': {}}
+    hashes, spellings, provinces = [], {}, {}
+    for df, part in _clean_chunks(name, path, typed, chunksize, canonical_names):
+        for key in ('rows_in', 'dropped_invalid', 'dropped_unknown_regions'):
+            report[key] += part[key]
+        for column, count in part['invalid_values'].items():
+            report['invalid_values'][column] = report['invalid_values'].get(column, 0) + count
+        report['unknown_regions'].update(part.get('unknown_regions', []))
+        report['renamed_regions'].update(part.get('renamed_regions', {}))
+
+        hashes.append(pd.util.hash_pandas_object(df[KEYS[name]], index=False).to_numpy())
+        if REGION_CODE in df:
+            for (code, spelling), n in df.groupby([REGION_CODE, REGION_NAME], observed=True).size().items():
+                spellings[int(code), spelling] = spellings.get((int(code), spelling), 0) + int(n)
+            first = df.drop_duplicates(REGION_CODE)
+            for code, provinsi in zip(first[REGION_CODE], first['bps_nama_provinsi'].astype(str)):
+                provinces.setdefault(int(code), provinsi)
+        _track(layout, df)
+    return report, np.concatenate(hashes), layout, spellings, provinces
+
+
+def validate_chunks(name, path=None, chunksize=CHUNK_ROWS):
+    """``(report, layout, chunks)``: ``validate`` for a file read ``chunksize`` rows at a time.
+
+    ``chunks()`` yields the clean rows a chunk at a time, as ``validate``
+    would return them, and may be called more than once. ``layout``
+    describes all of them: ``categories`` sorts each categorical column's
+    values, ``single`` maps the columns holding one value to it, ``range``
+    gives each integer column's (min, max) and, for files with
+    kabupaten/kota codes, ``regions`` maps each code to its
+    [kabupaten/kota, provinsi]. Outliers are not scanned.
+
+    Besides a chunk, memory holds an 8-byte hash of each row's key. Rows
+    whose hash repeats are compared in full in a second pass, run only
+    when the file has some.
+    """
+    spec = DATASETS[name]
+    _, sep, rename, _, _ = _read_options(name, path)
+    canonical_names = _canonical_names() if REGION_NAME in spec['dtype'] and REGION_CODE not in spec['dtype'] else None
+    for typed in (True, False):
+        try:
+            scanned, hashes, layout, counts, provinces = _scan(name, path, typed, chunksize, canonical_names)
+            break
+        except (ValueError, TypeError):
+            # Some value does not parse as its column's dtype: read every chunk as text
+            if not typed:
+                raise
+
+    report = {'dataset': name, 'rules': RULES_VERSION, 'rows_in': scanned['rows_in'], 'delimiter': sep,
+              'extra_columns': sorted(set(rename.values()) - set(spec['dtype'])),
+              'invalid_values': scanned['invalid_values'], 'dropped_invalid': scanned['dropped_invalid'],
+              'dropped_unknown_regions': scanned['dropped_unknown_regions']}
+    spellings = None
+    if REGION_CODE in spec['dtype']:
+        spellings, report['renamed_regions'] = _best_spellings(counts)
+        layout['categories'][REGION_NAME] = set(spellings)
+        layout['single'].pop(REGION_NAME, None)
+        if len(layout['categories'][REGION_NAME]) == 1:
+            layout['single'][REGION_NAME] = spellings.iloc[0]
+    elif REGION_NAME in spec['dtype']:
+        report['unknown_regions'] = sorted(scanned['unknown_regions'])
+        report['renamed_regions'] = dict(sorted(scanned['renamed_regions'].items()))
+
+    def final_chunks():
+        return _final_chunks(name, path, typed, chunksize, canonical_names, spellings)
+
+    # Only rows sharing a key hash can be duplicates
+    repeated = np.flatnonzero(pd.Series(hashes).duplicated(keep=False).to_numpy())
+    rows_out = len(hashes)
+    del hashes
+    report['duplicates_exact'] = report['duplicates_conflicting'] = 0
+    report['conflicting_keys'] = []
+    dropped = np.empty(0, dtype=np.int64)
+    if len(repeated):
+        # Compare those rows in full, and take the layout again without the rows dropped
+        layout = {'categories': {}, 'single': {}, 'varied': set(), 'range': {}}
+        candidates = []
+        for df, start in final_chunks():
+            inside = repeated[(repeated >= start) & (repeated < start + len(df))] - start
+            if len(inside):
+                candidates.append(df.take(inside).set_axis(inside + start))
+            _track(layout, df.drop(index=inside))
+        rows = pd.concat(candidates)
+        rows = rows.astype({column: 'category' for column, kind in spec['dtype'].items() if kind == 'category'})
+        exact = rows.duplicated()
+        kept = rows[~exact]
+        conflicting = kept.duplicated(KEYS[name])
+        report['duplicates_exact'] = int(exact.sum())
+        report['duplicates_conflicting'] = int(conflicting.sum())
+        report['conflicting_keys'] = _key_sample(name, kept[conflicting])
+        _track(layout, kept[~conflicting])
+        dropped = np.sort(np.concatenate([rows.index[exact], kept.index[conflicting]]))
+    report['outliers'] = None
+    report['rows_out'] = rows_out - len(dropped)
+    del layout['varied']
+    layout['categories'] = {column: sorted(values) for column, values in layout['categories'].items()}
+    if REGION_CODE in spec['dtype']:
+        layout['regions'] = {str(code): [spellings[code], provinsi] for code, provinsi in provinces.items()}
+
+    def chunks():
+        for df, start in final_chunks():
+            inside = dropped[(dropped >= start) & (dropped < start + len(df))] - start
+            if len(inside):
+                df = df.drop(index=inside).reset_index(drop=True)
+            for column, categories in layout['categories'].items():
+                df[column] = df[column].cat.set_categories(categories)
+            yield df
+    return report, layout, chunks
+
+
+def summary(report):
+    """One line per finding of a report."""
+    lines = [f'{report["dataset"]}: {report["rows_in"]} -> {report["rows_out"]} baris '
+             f'(delimiter {report["delimiter"]!r})']
+    for key in ('extra_columns', 'invalid_values', 'renamed_regions', 'unknown_regions', 'conflicting_keys'):
+        if report.get(key):
+            lines.append(f'  {key}: {report[key]}')
+    for key in ('dropped_invalid', 'dropped_unknown_regions', 'duplicates_exact', 'duplicates_conflicting'):
+        if report.get(key):
+            lines.append(f'  {key}: {report[key]}')
+    for outlier in (report['outliers'] or [])[:SAMPLE]:
+        lines.append(f'  outlier {outlier["column"]} {outlier["group"]} {outlier["tahun"]}: '
+                     f'{outlier["value"]} (z={outlier["z"]})')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    for dataset in sys.argv[1:] or DATASETS:
+        print(summary(validate(dataset)[1]))
@@ -0,0 +1,13 @@
+"""Dashboard pages, one module per page.
+
+``app.py`` imports a page module only when it is selected in the
+sidebar, so each page's dependencies load on first use.
+"""
+
+# Sidebar label -> module with a render() function
+PAGES = {
+    "Jumlah Penduduk Miskin": "views.penduduk",
+    "Indeks Kedalaman dan Keparahan Kemiskinan": "views.indeks",
+    "Garis Kemiskinan per Kabupaten/Kota pada Tahun Terpilih": "views.garis_kemiskinan",
+    # "Garis Kemiskinan per Kabupaten pada Tahun Prediksi"
+}
@@ -0,0 +1,25 @@
+"""Sidebar widgets shared by every page."""
+import streamlit as st
+
+from instrumentation import stage
+from provinces import DEFAULT_PROVINCE, list_provinces
+
+
+def select_province():
+    """Province picked in the sidebar; the choice is kept when switching pages."""
+    options = list_provinces()
+    index = options.index(DEFAULT_PROVINCE) if DEFAULT_PROVINCE in options else 0
+    return st.sidebar.selectbox("Pilih Provinsi", options, index=index, key='provinsi')
+
+
+def show_chart(fig):
+    """``st.plotly_chart``, timed as the page's ``chart`` stage."""
+    with stage('chart'):
+        st.plotly_chart(fig)
+
+
+def neighbours(options, value):
+    """The options just before and after ``value``: the likely next picks."""
+    options = list(options)
+    i = options.index(value)
+    return options[max(0, i - 1):i] + options[i + 1:i + 2]
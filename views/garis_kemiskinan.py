@@ -0,0 +1,139 @@
+import functools
+
+import streamlit as st
+import plotly.express as px
+
+import figure_cache
+import materialize
+import plotting
+import prefetch
+import provinces
+from region_index import get_region_index
+from views.common import neighbours, select_province, show_chart
+
+
+def build_fig3(provinsi, tahun_terpilih):
+    data_year = materialize.for_year('garis_per_tahun', tahun_terpilih, provinsi)
+
+    fig3 = px.bar(data_year,
+                x='bps_nama_kabupaten_kota',
+                y='garis_kemiskinan',
+                title=f'Garis Kemiskinan per Kabupaten/Kota pada Tahun {tahun_terpilih}',
+                labels={'bps_nama_kabupaten_kota': 'Kabupaten/Kota', 'garis_kemiskinan': 'Garis Kemiskinan'},
+                height=600)
+
+    fig3.update_layout(xaxis_title='Kabupaten/Kota',
+                    yaxis_title='Garis Kemiskinan',
+                    xaxis_tickangle=-45)
+    return fig3
+
+
+def build_fig_prediksi(provinsi, selected_kabupatens):
+    # Trend predictions for every kabupaten/kota, precomputed in the materialized views;
+    # the region index slices out the selected ones
+    pred_index = get_region_index(materialize.view('garis_prediksi', provinsi))
+
+    # Creating an interactive line chart, one line per selected kabupaten/kota
+    selected_rows = pred_index.regions_frame(selected_kabupatens)
+    fig = plotting.region_lines(
+        selected_rows, 'tahun', 'garis_kemiskinan', 'bps_nama_kabupaten_kota',
+        hovertemplate="<b>{wilayah}</b><br>Tahun: %{x}<br>Garis Kemiskinan: Rp%{y:,.0f}<extra></extra>",
+        band=('garis_kemiskinan_bawah', 'garis_kemiskinan_atas')
+    )
+
+    # Enhancing the visualization
+    fig.update_layout(
+        width=1200,
+        height=600,
+        title="Prediksi Garis Kemiskinan per Kabupaten/Kota Tahun (2024-2028)",
+        xaxis_title='Tahun',
+        yaxis_title='Garis Kemiskinan (Rupiah)',
+        title_font_size=20,
+        xaxis_title_font_size=16,
+        yaxis_title_font_size=16,
+        legend_title_text='Kabupaten/Kota'
+    )
+    return fig
+
+
+def fig3_target(provinsi, tahun_terpilih):
+    """``(page, widgets, build)`` of the chart for one tahun, for ``figure_cache``."""
+    tahun_terpilih = int(tahun_terpilih)
+    return ('garis_kemiskinan', (provinsi, 'fig3', tahun_terpilih),
+            functools.partial(build_fig3, provinsi, tahun_terpilih))
+
+
+def fig_prediksi_target(provinsi, selected_kabupatens):
+    """``(page, widgets, build)`` of the prediction chart for the selected kabupaten/kota."""
+    selected_kabupatens = tuple(selected_kabupatens)
+    return ('garis_kemiskinan', (provinsi, 'prediksi', selected_kabupatens),
+            functools.partial(build_fig_prediksi, provinsi, selected_kabupatens))
+
+
+def prefetch_targets(provinsi):
+    """Figures this page draws with its default widget values."""
+    return [fig3_target(provinsi, materialize.view('garis_tahun', provinsi)['tahun'].iloc[0])]
+
+
+def export_targets(provinsi):
+    """Figures of every widget combination of this page (predictions: each kabupaten/kota and "Select All")."""
+    regions = provinces.regions(provinsi)
+    return ([fig3_target(provinsi, tahun) for tahun in materialize.view('garis_tahun', provinsi)['tahun']]
+            + [fig_prediksi_target(provinsi, [region]) for region in regions]
+            + [fig_prediksi_target(provinsi, regions)])
+
+
+def render():
+    provinsi = select_province()
+
+    st.write("### Garis Kemiskinan per Kabupaten/Kota Tahun (2010-2023)")
+
+    # Year choices and the rows of the selected year, from the materialized views
+    tahun_options = materialize.view('garis_tahun', provinsi)['tahun']
+    tahun_terpilih = st.selectbox("Pilih Tahun", options=tahun_options)
+
+    fig3 = figure_cache.get_figure(*fig3_target(provinsi, tahun_terpilih))
+    show_chart(fig3)
+    for tahun in neighbours(tahun_options, tahun_terpilih):
+        prefetch.hint(*fig3_target(provinsi, tahun))
+
+    st.write(f"""
+    <p style='text-indent: 20px; text-align: justify;'>
+    Garis kemiskinan menggambarkan batas minimum pendapatan atau konsumsi yang diperlukan untuk memenuhi kebutuhan dasar di setiap kabupaten/kota. Pada tahun yang terpilih, variasi garis kemiskinan di {provinsi} dapat dilihat melalui visualisasi ini. Data ini penting untuk mengidentifikasi wilayah yang membutuhkan perhatian khusus dalam program pengentasan kemiskinan.
+    </p>
+    """, unsafe_allow_html=True)
+
+    st.write("### Prediksi Garis Kemiskinan per Kabupaten/Kota Tahun (2024-2028)")
+    # Kabupaten/kota of the selected province, derived from the data
+    options = provinces.regions(provinsi)
+
+    # Add a "Select All" option at the beginning of the list
+    options = ["Select All"] + options
+
+    # Multiselect menu for selecting multiple kabupaten/kota
+    selected_kabupatens = st.multiselect('Pilih Kabupaten/Kota:', options)
+
+    # If "Select All" is chosen, display all kabupaten/kota
+    if "Select All" in selected_kabupatens:
+        selected_kabupatens = options[1:]  # Exclude the "Select All" option itself
+
+    # Trend predictions for every kabupaten/kota, precomputed in the materialized views
+    pred_index = get_region_index(materialize.view('garis_prediksi', provinsi))
+
+    for selected_kabupaten in selected_kabupatens:
+        # Check if there is data available for the selected kabupaten/kota
+        if selected_kabupaten not in pred_index:
+            st.warning(f"Tidak ada data untuk {selected_kabupaten}")
+
+    # Display the plot in Streamlit
+    if selected_kabupatens:
+        fig = figure_cache.get_figure(*fig_prediksi_target(provinsi, selected_kabupatens))
+        show_chart(fig)
+
+        st.write(f"""
+        <p style='text-indent: 20px; text-align: justify;'>
+        Untuk memprediksi dan memahami perubahan garis kemiskinan di setiap kabupaten/kota di {provinsi} dalam lima tahun mendatang (2024-2028), proses dimulai dengan pengumpulan data historis mengenai garis kemiskinan dari tahun-tahun sebelumnya. Dengan data ini, model regresi linear dibangun untuk masing-masing kabupaten/kota. Regresi linear, sebagai teknik statistik, memungkinkan kita memprediksi nilai garis kemiskinan di masa depan berdasarkan tren historis. Setelah model dilatih, prediksi nilai garis kemiskinan untuk tahun-tahun yang akan datang dihasilkan. Hasil prediksi ini disimpan dalam dictionary yang kemudian diubah menjadi DataFrame untuk memudahkan analisis lebih lanjut. DataFrame ini memungkinkan pembuatan visualisasi seperti grafik garis waktu yang menunjukkan perubahan garis kemiskinan dari tahun ke tahun dan peta tematik yang menggambarkan prediksi garis kemiskinan untuk setiap kabupaten/kota. Visualisasi ini membantu pembuat kebijakan dalam mengidentifikasi daerah yang mungkin memerlukan intervensi khusus dan merencanakan alokasi sumber daya yang lebih efisien, sehingga strategi pengentasan kemiskinan dapat disesuaikan dengan kebutuhan nyata di masing-masing wilayah.
+        </p>
+        """, unsafe_allow_html=True)
+    else:
+        st.warning("Silakan pilih setidaknya satu kabupaten/kota untuk melihat hasil prediksi.")
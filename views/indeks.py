@@ -0,0 +1,293 @@
+import functools
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+
+import figure_cache
+import materialize
+import plotting
+import prefetch
+from provinces import DEFAULT_PROVINCE
+from views.common import neighbours, select_province, show_chart
+
+TOP_N_OPTIONS = [3, 5, 10]
+
+
+def build_fig(provinsi):
+    # Yearly averages with percentage change from the previous year, and the
+    # predictions for 2024-2028, read from the materialized views
+    avg_data = materialize.view('indeks_tahunan', provinsi)
+    future_data = materialize.view('indeks_prediksi', provinsi)
+
+    # Combine past and predicted data for plotting
+    combined_data = pd.concat([avg_data, future_data])
+
+    # Create a figure for both historical data and predictions
+    fig = go.Figure()
+
+    # Add poverty depth index line (historical)
+    fig.add_trace(go.Scatter(
+        x=avg_data['tahun'], y=avg_data['indeks_kedalaman'],
+        mode='lines+markers+text',
+        name='Indeks Kedalaman (2005-2023)',
+        text=avg_data['indeks_kedalaman'].round(2),
+        textposition='top center',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Indeks Kedalaman: %{y:.2f}<br>'
+            'Indeks Keparahan: %{customdata[0]:.2f}<br>'
+            '<br>'
+            'Peningkatan Kedalaman: %{customdata[1]:.2f}%<br>'
+            '<extra></extra>'
+        ),
+        customdata=avg_data[['indeks_keparahan_kemiskinan', 'perc_change_kedalaman']].values
+    ))
+
+    # Add poverty severity index line (historical)
+    fig.add_trace(go.Scatter(
+        x=avg_data['tahun'], y=avg_data['indeks_keparahan_kemiskinan'],
+        mode='lines+markers+text',
+        name='Indeks Keparahan (2005-2023)',
+        text=avg_data['indeks_keparahan_kemiskinan'].round(2),
+        textposition='top center',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Indeks Keparahan: %{y:.2f}<br>'
+            'Indeks Kedalaman: %{customdata[1]:.2f}<br>'
+            '<br>'
+            'Peningkatan Keparahan: %{customdata[0]:.2f}%<br>'
+            '<extra></extra>'
+        ),
+        customdata=avg_data[['indeks_keparahan_kemiskinan', 'perc_change_keparahan']].values
+    ))
+
+    # Add poverty depth index line (predictions)
+    fig.add_trace(go.Scatter(
+        x=future_data['tahun'], y=future_data['indeks_kedalaman'],
+        mode='lines+markers+text',
+        name='Indeks Kedalaman (Prediksi 2024-2028)',
+        text=future_data['indeks_kedalaman'].round(2),
+        textposition='top center',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Indeks Kedalaman: %{y:.2f}<br>'
+            'Indeks Keparahan: %{customdata[0]:.2f}<br>'
+            '<extra></extra>'
+        ),
+        customdata=np.stack((future_data['indeks_keparahan_kemiskinan'], future_data['indeks_kedalaman']), axis=-1)
+    ))
+
+    # Add poverty severity index line (predictions)
+    fig.add_trace(go.Scatter(
+        x=future_data['tahun'], y=future_data['indeks_keparahan_kemiskinan'],
+        mode='lines+markers+text',
+        name='Indeks Keparahan (Prediksi 2024-2028)',
+        text=future_data['indeks_keparahan_kemiskinan'].round(2),
+        textposition='top center',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Indeks Keparahan: %{y:.2f}<br>'
+            'Indeks Kedalaman: %{customdata[1]:.2f}<br>'
+            '<extra></extra>'
+        ),
+        customdata=np.stack((future_data['indeks_keparahan_kemiskinan'], future_data['indeks_kedalaman']), axis=-1)
+    ))
+
+    # 95% prediction intervals around the predicted years
+    fig.add_trace(plotting.interval_band(future_data, 'tahun', 'indeks_kedalaman_bawah', 'indeks_kedalaman_atas',
+                                         name='Interval Prediksi 95% (Kedalaman)'))
+    fig.add_trace(plotting.interval_band(future_data, 'tahun', 'indeks_keparahan_kemiskinan_bawah',
+                                         'indeks_keparahan_kemiskinan_atas', name='Interval Prediksi 95% (Keparahan)'))
+
+    # Add a vertical line at the position 2023.5 to separate historical and predicted data
+    fig.add_shape(
+        dict(
+            type="line",
+            x0=2023.5,
+            y0=0,
+            x1=2023.5,
+            y1=max(combined_data['indeks_kedalaman'].max(), combined_data['indeks_keparahan_kemiskinan'].max()),
+            line=dict(color="Yellow", width=2, dash="dash"),
+        )
+    )
+
+    # Update layout to include titles and axis labels, with increased width
+    fig.update_layout(
+        title='Grafik Indeks Kedalaman dan Keparahan Kemiskinan (2005-2028)',
+        xaxis_title='Tahun',
+        yaxis_title='Nilai Indeks',
+        legend_title_text='Indeks',
+        height=500,
+        width=1800  
+    )
+    return fig
+
+
+def build_fig7(provinsi, top_n):
+    # Rows of the top N regions by mean poverty severity, in rank order
+    top_rows = materialize.top_n('indeks_per_wilayah', top_n, provinsi)
+
+    # One line per region, built from the long frame in one call
+    fig7 = plotting.region_lines(
+        top_rows, 'tahun', 'indeks_kedalaman', 'bps_nama_kabupaten_kota',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Kabupaten/Kota: {wilayah}<br>'
+            'Indeks Kedalaman: %{y:.2f}<br>'
+            'Indeks Keparahan: %{customdata[0]:.2f}<br>'
+            '<extra></extra>'
+        ),
+        customdata=['indeks_keparahan_kemiskinan']  # Hover data only
+    )
+
+    # Update layout to include titles and axis labels with larger size
+    fig7.update_layout(
+        title=f'Grafik Indeks Kedalaman dan Keparahan Kemiskinan (Top {top_n})',
+        xaxis_title='Tahun',
+        yaxis_title='Nilai Indeks',
+        legend_title_text='Kabupaten/Kota',
+        height=600,
+        width=1500
+    )
+
+    return fig7
+
+
+def build_fig_pred(provinsi):
+    future_data = materialize.view('indeks_prediksi', provinsi)
+
+    # Create a figure for the predictions
+    fig_pred = go.Figure()
+
+    # Add poverty depth index line (only for predicted years)
+    fig_pred.add_trace(go.Scatter(
+        x=future_data['tahun'], y=future_data['indeks_kedalaman'],
+        mode='lines+markers+text',
+        name='Indeks Kedalaman (Prediksi)',  
+        text=future_data['indeks_kedalaman'].round(2),
+        textposition='top center',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Indeks Kedalaman: %{y:.2f}<br>'
+            'Indeks Keparahan: %{customdata[0]:.2f}<br>'
+            '<extra></extra>'
+        ),
+        customdata=np.stack((future_data['indeks_keparahan_kemiskinan'], future_data['indeks_kedalaman']), axis=-1)
+    ))
+
+    # Add poverty severity index line (only for predicted years)
+    fig_pred.add_trace(go.Scatter(
+        x=future_data['tahun'], y=future_data['indeks_keparahan_kemiskinan'],
+        mode='lines+markers+text',
+        name='Indeks Keparahan (Prediksi)',  
+        text=future_data['indeks_keparahan_kemiskinan'].round(2),
+        textposition='top center',
+        hovertemplate=(
+            'Tahun: %{x}<br>'
+            'Indeks Keparahan: %{y:.2f}<br>'
+            'Indeks Kedalaman: %{customdata[1]:.2f}<br>'
+            '<extra></extra>'
+        ),
+        customdata=np.stack((future_data['indeks_keparahan_kemiskinan'], future_data['indeks_kedalaman']), axis=-1)
+    ))
+
+    # 95% prediction intervals of both indices
+    fig_pred.add_trace(plotting.interval_band(
+        future_data, 'tahun', 'indeks_kedalaman_bawah', 'indeks_kedalaman_atas',
+        name='Interval Prediksi 95% (Kedalaman)', color='rgba(99, 110, 250, 0.2)'))
+    fig_pred.add_trace(plotting.interval_band(
+        future_data, 'tahun', 'indeks_keparahan_kemiskinan_bawah', 'indeks_keparahan_kemiskinan_atas',
+        name='Interval Prediksi 95% (Keparahan)', color='rgba(239, 85, 59, 0.2)'))
+
+    # Update layout to include titles and axis labels
+    fig_pred.update_layout(
+        title='Prediksi Indeks Kedalaman dan Keparahan Kemiskinan (2024-2028)',
+        xaxis_title='Tahun',
+        yaxis_title='Nilai Indeks',
+        legend_title_text='Indeks'
+    )
+
+    return fig_pred
+
+
+def fig_target(provinsi):
+    """``(page, widgets, build)`` of the historical and predicted chart for ``figure_cache``."""
+    return 'indeks', (provinsi, 'fig'), functools.partial(build_fig, provinsi)
+
+
+def fig7_target(provinsi, top_n):
+    """``(page, widgets, build)`` of the top-N regions chart for ``figure_cache``."""
+    return 'indeks', (provinsi, 'fig7', top_n), functools.partial(build_fig7, provinsi, top_n)
+
+
+def fig_pred_target(provinsi):
+    """``(page, widgets, build)`` of the prediction chart for ``figure_cache``."""
+    return 'indeks', (provinsi, 'fig_pred'), functools.partial(build_fig_pred, provinsi)
+
+
+def prefetch_targets(provinsi):
+    """Figures this page draws with its default widget values."""
+    return [fig_target(provinsi), fig7_target(provinsi, TOP_N_OPTIONS[0]), fig_pred_target(provinsi)]
+
+
+def export_targets(provinsi):
+    """Figures of every widget combination of this page."""
+    return [fig_target(provinsi)] + [fig7_target(provinsi, n) for n in TOP_N_OPTIONS] + [fig_pred_target(provinsi)]
+
+
+def render():
+    provinsi = select_province()
+
+    st.write("### Indeks Kedalaman dan Keparahan Kemiskinan (2005-2028)")
+    show_chart(figure_cache.get_figure(*fig_target(provinsi)))
+
+
+    # The narrative describes the bundled Aceh figures
+    if provinsi == DEFAULT_PROVINCE:
+        st.write("""
+        <p style='text-indent: 30px; text-align: justify;'>
+        Visualisasi ini menampilkan perkembangan Indeks Kedalaman dan Keparahan Kemiskinan di Indonesia selama periode 2005 hingga 2023,
+        yang diwakili oleh total indeks yang dihitung dari penjumlahan antara indeks kedalaman dan keparahan kemiskinan setiap tahunnya. 
+        Secara umum, grafik menunjukkan adanya fluktuasi yang signifikan sepanjang periode ini. Pada tahun 2005, indeks total berada pada 
+        angka 5.98, mencerminkan tingkat kemiskinan yang cukup dalam dan parah di berbagai wilayah pada tahun tersebut. 
+        Setelah itu, terjadi penurunan yang cukup konsisten hingga tahun 2009, yang kemungkinan mencerminkan keberhasilan kebijakan penanggulangan 
+        kemiskinan atau perbaikan kondisi ekonomi pada masa itu. 
+        </p>
+
+        <p style='text-indent: 30px; text-align: justify;'>
+        Namun, setelah periode tersebut, terlihat adanya fluktuasi dalam indeks total, 
+        dengan beberapa tahun mencatat peningkatan yang mungkin disebabkan oleh kondisi sosial-ekonomi yang menantang atau perubahan dalam kebijakan
+        pemerintah. Kenaikan dan penurunan indeks ini mencerminkan dinamika kompleks dari kemiskinan di Indonesia, yang dipengaruhi oleh berbagai faktor 
+        seperti pertumbuhan ekonomi, kebijakan sosial, serta kejadian-kejadian global yang berdampak pada kesejahteraan masyarakat. 
+        Dengan memahami pola ini, para pembuat kebijakan dan pemangku kepentingan lainnya dapat lebih tepat dalam merumuskan strategi yang efektif untuk 
+        mengatasi kemiskinan di masa depan.
+        </p>
+        """, unsafe_allow_html=True)
+
+    st.write(f"### Indeks Kedalaman dan Keparahan Kemiskinan per Kabupaten/Kota")
+
+    # Select the number of top regions to display
+    top_n = st.selectbox("Pilih jumlah Kota/Kabupaten teratas:", TOP_N_OPTIONS, index=0)
+
+    # Show the new chart, from the shared figure cache when drawn before
+    fig7 = figure_cache.get_figure(*fig7_target(provinsi, top_n))
+    show_chart(fig7)
+    for option in neighbours(TOP_N_OPTIONS, top_n):
+        prefetch.hint(*fig7_target(provinsi, option))
+
+    fig_pred = figure_cache.get_figure(*fig_pred_target(provinsi))
+
+    st.write("### Prediksi Indeks Kedalaman dan Keparahan Kemiskinan (2024-2028)")
+    show_chart(fig_pred)
+
+    st.markdown("""
+    <p style='text-indent: 30px; text-align: justify;'>
+    Grafik diatas merupakan prediksi terhadap indeks kedalaman dan keparahan kemiskinan untuk tahun 2024 hingga 2028, dan menampilkan hasil prediksi tersebut dalam bentuk grafik interaktif. Pertama, data yang ada dikonversi menjadi tipe numerik untuk memastikan bahwa perhitungan dapat dilakukan tanpa kesalahan, khususnya pada kolom indeks_kedalaman, indeks_keparahan_kemiskinan, dan tahun. Data ini kemudian dikelompokkan berdasarkan tahun, dan rata-rata dari masing-masing indeks dihitung untuk setiap tahun, menghasilkan DataFrame baru yang berisi nilai rata-rata per tahun.
+    </p>
+
+    <p style='text-indent: 30px; text-align: justify;'>
+    Selanjutnya, dua model regresi linier dibangun menggunakan tahun sebagai variabel independen. Model pertama digunakan untuk memprediksi indeks_kedalaman, sementara model kedua digunakan untuk memprediksi indeks_keparahan_kemiskinan. Dengan menggunakan model ini, prediksi dilakukan untuk tahun-tahun mendatang (2024-2028), dan hasil prediksi tersebut disusun dalam sebuah DataFrame baru.
+    </p>
+    """, unsafe_allow_html=True)
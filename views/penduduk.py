@@ -0,0 +1,247 @@
+import functools
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+import downsample
+import figure_cache
+import materialize
+import plotting
+import prefetch
+from provinces import DEFAULT_PROVINCE
+from views.common import neighbours, select_province, show_chart
+
+CHART_JUMLAH = "Jumlah Penduduk Miskin Tahun (2012-2021)"
+CHART_PERSENTASE_DAERAH = "Rata-rata Persentase Penduduk Miskin Menurut Daerah (2001-2022)"
+
+
+# Top-N selector label -> number of kabupaten/kota (all when None)
+TOP_N_OPTIONS = {"3 Teratas": 3, "5 Teratas": 5, "10 Teratas": 10, "Semua": None}
+
+
+def build_fig2(provinsi, top_n_option):
+    # Rows of the top N kabupaten/kota by total jumlah penduduk (all when None)
+    filtered_data = materialize.top_n('penduduk_per_wilayah', TOP_N_OPTIONS[top_n_option], provinsi)
+    # Bounded number of points per line, whatever the number of periods
+    filtered_data = downsample.reduce(filtered_data, 'tahun', 'bps_jumlah_penduduk', 'bps_nama_kabupaten_kota')
+
+    fig2 = px.line(filtered_data, 
+                   x='tahun', 
+                   y='bps_jumlah_penduduk', 
+                   color='bps_nama_kabupaten_kota',
+                   title=f'Grafik Jumlah Penduduk Miskin per Kab/Kota Berdasarkan Tahun ({top_n_option})',
+                   labels={'bps_jumlah_penduduk': 'Jumlah Penduduk (Ribu Jiwa)', 'tahun': 'Tahun', 'bps_nama_kabupaten_kota': 'Kabupaten/Kota'},
+                   height=600)
+
+    fig2.update_traces(mode='lines+markers', marker=dict(size=6), line=dict(width=1))
+    fig2.update_layout(title={'x': 0.5, 'xanchor': 'center', 'yanchor': 'top'},
+                       xaxis_title='Tahun',
+                       yaxis_title='Jumlah Penduduk (Ribu Jiwa)')
+    return fig2
+
+
+def build_fig_jumlah(provinsi):
+    # Historical and predicted yearly data, read from the materialized views
+    data_grouped = materialize.view('penduduk_tahunan', provinsi).copy()
+    prediksi_df = materialize.view('penduduk_prediksi', provinsi).copy()
+
+    # Combine historical and prediction data, adding a column to indicate the data type
+    data_grouped['type'] = 'Actual'
+    prediksi_df['type'] = 'Predicted'
+    combined_df = pd.concat([data_grouped, prediksi_df], ignore_index=True)
+
+    # Visualization for both historical and prediction data with color distinction
+    fig = px.line(combined_df, 
+                x='tahun', 
+                y='bps_jumlah_penduduk', 
+                color='type',
+                title=f'Grafik Jumlah Penduduk Miskin dan Prediksi di {provinsi} (Hingga 2026)',
+                labels={'bps_jumlah_penduduk': 'Jumlah Penduduk (Ribu Jiwa)', 'tahun': 'Tahun', 'type': 'Data Type'},
+                height=500,
+                hover_data={'persentase_jumlah_penduduk_miskin': ':.2f'})
+
+    # Update traces to differentiate colors between actual and predicted data
+    fig.update_traces(mode='lines+markers', marker=dict(size=8))
+
+    # 95% prediction interval around the predicted years
+    fig.add_trace(plotting.interval_band(prediksi_df, 'tahun', 'bps_jumlah_penduduk_bawah', 'bps_jumlah_penduduk_atas'))
+
+    # Add a vertical line to separate actual and predicted data at 2021.5
+    fig.add_vline(x=2021.5, line_width=2, line_dash='dash', line_color='yellow')
+
+    fig.update_layout(title={'x': 0.5, 'xanchor': 'center', 'yanchor': 'top'},
+                    xaxis_title='Tahun',
+                    yaxis_title='Jumlah Penduduk (Ribu Jiwa)',
+                    xaxis=dict(tickformat='.0f'))
+    return fig
+
+
+def build_fig6(provinsi):
+    # Predicted years only, from the materialized views
+    prediksi_df = materialize.view('penduduk_prediksi', provinsi)
+
+    fig6 = px.line(prediksi_df, 
+                x='tahun', 
+                y='bps_jumlah_penduduk', 
+                title=f'Prediksi Jumlah Penduduk Miskin dan Persentase di {provinsi} (2022-2026)',
+                labels={'bps_jumlah_penduduk': 'Jumlah Penduduk (Ribu Jiwa)', 'tahun': 'Tahun'},
+                height=500,
+                hover_data={'persentase_jumlah_penduduk_miskin': ':.2f'})
+
+    fig6.update_traces(mode='lines+markers', marker=dict(size=8), line=dict(width=1))
+    fig6.add_trace(plotting.interval_band(prediksi_df, 'tahun', 'bps_jumlah_penduduk_bawah', 'bps_jumlah_penduduk_atas'))
+    fig6.update_layout(title={'x': 0.5, 'xanchor': 'center', 'yanchor': 'top'},
+                    xaxis_title='Tahun',
+                    yaxis_title='Jumlah Penduduk (Ribu Jiwa)',
+                    xaxis=dict(
+                        tickformat='.0f',
+                        tickmode='array',
+                        tickvals=[2022, 2023, 2024, 2025, 2026],
+                        range=[2021.5, 2026.5]
+                    ))
+    return fig6
+
+
+def build_fig4(provinsi):
+    # Average per daerah (2001-2022), from the materialized views
+    aggregated_data = materialize.view('persentase_daerah_rata2', provinsi)
+
+    fig4 = px.pie(
+        aggregated_data,
+        values='persentase_penduduk_miskin',
+        names='daerah',
+        title=f'Rata-rata Persentase Penduduk Miskin Menurut Daerah di Provinsi {provinsi} (2001-2022)',
+        labels={
+            'persentase_penduduk_miskin': 'Rata-rata Persentase Penduduk Miskin',
+            'daerah': 'Daerah'
+        },
+        hover_data={
+            'persentase_penduduk_miskin': ':.2f',
+        }
+    )
+    return fig4
+
+
+def fig_jumlah_target(provinsi):
+    """``(page, widgets, build)`` of the yearly total and forecast chart for ``figure_cache``."""
+    return 'penduduk', (provinsi, 'fig'), functools.partial(build_fig_jumlah, provinsi)
+
+
+def fig2_target(provinsi, top_n_option):
+    """``(page, widgets, build)`` of the per-kabupaten/kota chart for ``figure_cache``."""
+    return 'penduduk', (provinsi, 'fig2', top_n_option), functools.partial(build_fig2, provinsi, top_n_option)
+
+
+def fig6_target(provinsi):
+    """``(page, widgets, build)`` of the forecast chart for ``figure_cache``."""
+    return 'penduduk', (provinsi, 'fig6'), functools.partial(build_fig6, provinsi)
+
+
+def fig4_target(provinsi):
+    """``(page, widgets, build)`` of the per-daerah pie for ``figure_cache``."""
+    return 'penduduk', (provinsi, 'fig4'), functools.partial(build_fig4, provinsi)
+
+
+def prefetch_targets(provinsi):
+    """Figures this page draws with its default widget values."""
+    return [fig_jumlah_target(provinsi), fig2_target(provinsi, next(iter(TOP_N_OPTIONS))), fig6_target(provinsi)]
+
+
+def export_targets(provinsi):
+    """Figures of every widget combination of this page."""
+    return ([fig_jumlah_target(provinsi)]
+            + [fig2_target(provinsi, option) for option in TOP_N_OPTIONS]
+            + [fig6_target(provinsi), fig4_target(provinsi)])
+
+
+def render():
+    provinsi = select_province()
+    chart_option = st.sidebar.selectbox(
+        "Pilih Grafik yang Ingin Ditampilkan:",
+        options=[CHART_JUMLAH, CHART_PERSENTASE_DAERAH]
+    )
+
+    if chart_option == CHART_JUMLAH:
+        render_jumlah(provinsi)
+    elif chart_option == CHART_PERSENTASE_DAERAH:
+        render_persentase_daerah(provinsi)
+
+
+def render_jumlah(provinsi):
+    st.write(f"### Jumlah Penduduk Miskin {provinsi} Tahun (2012-2021)")
+    # The narrative describes the bundled Aceh figures
+    if provinsi == DEFAULT_PROVINCE:
+        st.markdown("""
+        <p style="text-align: justify; text-indent: 30px;">
+        Selama periode 2012 hingga 2021, terjadi fluktuasi dalam jumlah penduduk miskin di Aceh. 
+        Jumlah penduduk miskin tertinggi tercatat pada tahun 2012, yaitu sekitar 880,52 ribu jiwa, 
+        kemudian menurun secara bertahap hingga mencapai titik terendah pada tahun 2020 dengan jumlah 
+        sekitar 814.93 ribu jiwa. Namun, pada tahun 2021, terjadi peningkatan kembali menjadi sekitar 834,25 ribu jiwa.
+        </p>
+
+        <p style="text-align: justify; text-indent: 30px;">
+        Penurunan yang konsisten dari tahun 2013 hingga 2020 menunjukkan adanya perbaikan ekonomi atau 
+        efektivitas program pengentasan kemiskinan di Aceh selama periode tersebut. Namun, peningkatan pada tahun 2021 
+        mungkin terkait dengan faktor-faktor tertentu seperti pandemi COVID-19 atau kondisi ekonomi yang memburuk.
+        </p>
+
+        <p style="text-align: justify; text-indent: 30px;">
+        Visualisasi berikut akan menampilkan tren jumlah penduduk miskin dari tahun 2012 hingga 2021. 
+        Tren ini akan menunjukkan perubahan jumlah penduduk miskin setiap tahunnya.
+        </p>
+        """, unsafe_allow_html=True)
+
+    show_chart(figure_cache.get_figure(*fig_jumlah_target(provinsi)))
+
+    st.write("### Jumlah Penduduk Miskin per Kab/Kota Tahun (2012-2021)")
+    top_n_option = st.selectbox(
+        "Pilih Jumlah Kabupaten/Kota Teratas",
+        options=list(TOP_N_OPTIONS)
+    )
+
+    # Served from the shared figure cache when this option was drawn before
+    fig2 = figure_cache.get_figure(*fig2_target(provinsi, top_n_option))
+    show_chart(fig2)
+    for option in neighbours(TOP_N_OPTIONS, top_n_option):
+        prefetch.hint(*fig2_target(provinsi, option))
+
+    st.write(f"### Prediksi Jumlah Penduduk Miskin dan Persentase di {provinsi} (2022-2026)")
+    show_chart(figure_cache.get_figure(*fig6_target(provinsi)))
+
+    st.write(f"""
+    <p style='text-indent: 30px; text-align: justify;'>
+    Langkah utama yang digunakan untuk menganalisis dan memprediksi data penduduk dan persentase kemiskinan di {provinsi} dari tahun 2022 hingga 2026 adalah mengolah data dengan mengelompokkan berdasarkan tahun, kemudian menghitung total jumlah penduduk dan rata-rata persentase penduduk miskin per tahun. Selanjutnya, dua model regresi linier dibangun menggunakan tahun sebagai variabel independen; satu model untuk memprediksi jumlah penduduk dan satu lagi untuk memprediksi persentase kemiskinan. Setelah model dilatih dengan data historis, prediksi untuk tahun-tahun mendatang hingga 2026 dilakukan. Hasil prediksi menunjukkan tren perubahan jumlah penduduk miskin dan persentase kemiskinan, yang dapat digunakan untuk perencanaan dan evaluasi kebijakan pengentasan kemiskinan di {provinsi}.
+    </p>
+    """, unsafe_allow_html=True)
+
+
+def render_persentase_daerah(provinsi):
+    st.write(f"### Rata-rata Persentase Penduduk Miskin Menurut Daerah di Provinsi {provinsi} (2001-2022)")
+
+    show_chart(figure_cache.get_figure(*fig4_target(provinsi)))
+
+    # Narasi setelah grafik dengan indentasi dan justify (ditulis untuk data Aceh)
+    if provinsi == DEFAULT_PROVINCE:
+        st.markdown("""
+        <p style="text-align: justify; text-indent: 30px;">
+        Visualisasi ini menampilkan perubahan rata-rata persentase penduduk miskin di Provinsi Aceh dari tahun 2001 hingga 2022, dengan pembagian antara daerah perkotaan dan perdesaan. Data menunjukkan bahwa:
+        </p>
+        <ul style="text-align: justify; text-indent: 30px;">
+            <li><b>Daerah Perdesaan:</b>
+                <ul>
+                    <li>Secara konsisten, persentase penduduk miskin di daerah perdesaan lebih tinggi dibandingkan dengan perkotaan selama periode 2001-2022.</li>
+                    <li>Pie chart menunjukkan bahwa mayoritas penduduk miskin di Provinsi Aceh berada di daerah perdesaan. Hal ini tercermin dari ukuran segmen yang lebih besar, menandakan persentase yang lebih tinggi.</li>
+                </ul>
+            </li>
+            <li><b>Daerah Perkotaan:</b>
+                <ul>
+                    <li>Persentase penduduk miskin di perkotaan juga menunjukkan penurunan, pada tingkat yang lebih rendah dibandingkan perdesaan.</li>
+                    <li>Meskipun lebih kecil, segmen perkotaan juga memiliki kontribusi signifikan dalam jumlah penduduk miskin, tetapi tetap lebih rendah dibandingkan dengan perdesaan.</li>
+                </ul>
+            </li>
+        </ul>
+        <p style="text-align: justify; text-indent: 30px;">
+        Data ini menunjukkan adanya disparitas yang cukup signifikan antara daerah perkotaan dan perdesaan dalam hal kemiskinan. Meskipun terjadi penurunan secara keseluruhan di kedua daerah, daerah perdesaan cenderung memiliki persentase kemiskinan yang lebih tinggi sepanjang periode ini. Hal ini mungkin mencerminkan tantangan ekonomi yang lebih besar di daerah perdesaan dibandingkan dengan perkotaan.
+        </p>
+        """, unsafe_allow_html=True)